@@ -1,6 +1,7 @@
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.core.database import get_db
 from app.api.deps import get_current_admin_user
 from app.crud.company import company
@@ -101,7 +102,7 @@ async def create_or_update_company_with_images(
     if logo and logo.filename:
         # Delete old logo if exists
         if existing_company and getattr(existing_company, 'logo_url', None):
-            delete_image_file(str(existing_company.logo_url))
+            await run_in_threadpool(delete_image_file, str(existing_company.logo_url))
         
         logo_filename = await save_uploaded_image(logo, "company/logos")
         company_data["logo_url"] = f"/static/{logo_filename}"
@@ -112,7 +113,7 @@ async def create_or_update_company_with_images(
     if about_image and about_image.filename:
         # Delete old about image if exists
         if existing_company and getattr(existing_company, 'about_image_url', None):
-            delete_image_file(str(existing_company.about_image_url))
+            await run_in_threadpool(delete_image_file, str(existing_company.about_image_url))
         
         about_image_filename = await save_uploaded_image(about_image, "company/about")
         company_data["about_image_url"] = f"/static/{about_image_filename}"
@@ -151,7 +152,7 @@ async def update_company_logo(
     
     # Delete old logo if exists
     if getattr(company_info, 'logo_url', None):
-        delete_image_file(str(company_info.logo_url))
+        await run_in_threadpool(delete_image_file, str(company_info.logo_url))
     
     # Upload new logo
     logo_filename = await save_uploaded_image(logo, "company/logos")
@@ -180,7 +181,7 @@ async def update_company_about_image(
     
     # Delete old about image if exists
     if getattr(company_info, 'about_image_url', None):
-        delete_image_file(str(company_info.about_image_url))
+        await run_in_threadpool(delete_image_file, str(company_info.about_image_url))
     
     # Upload new about image
     about_image_filename = await save_uploaded_image(about_image, "company/about")
@@ -13,6 +13,8 @@ from app.schemas.contact import (
     ContactStats
 )
 from app.models.contact import Contact as ContactModel
+from app.core.pagination import CountMode
+from app.core.serialization import model_response
 from app.models.user import User
 from datetime import datetime
 import math
@@ -34,7 +36,9 @@ def get_contacts(
     start_date: datetime = Query(None, description="Filter contacts from this date"),
     end_date: datetime = Query(None, description="Filter contacts until this date"),
     order_by: str = Query("created_at", description="Field to order by"),
-    order_desc: bool = Query(True, description="Order in descending order")
+    order_desc: bool = Query(True, description="Order in descending order"),
+    cursor: str = Query(None, description="Cursor from next_cursor of the previous page"),
+    count: CountMode = Query(CountMode.WINDOW, description="How to compute the total: window, exact, estimated or none")
 ) -> Any:
     """
     Retrieve contacts with filtering and pagination.
@@ -49,24 +53,26 @@ def get_contacts(
         start_date=start_date,
         end_date=end_date,
         order_by=order_by,
-        order_desc=order_desc
+        order_desc=order_desc,
+        cursor=cursor,
+        count_mode=count
     )
     
-    items, total = contact.get_contacts(db, filters=filters)
+    result = contact.get_page(db, filters=filters)
     
-    pages = math.ceil(total / limit) if total > 0 else 0
+    total = result.total
+    pages = (math.ceil(total / limit) if total > 0 else 0) if total is not None else None
     page = (skip // limit) + 1 if limit > 0 else 1
     
-    # Convert SQLAlchemy models to dict for Pydantic
-    items_dict = [ContactSchema.from_orm(item) for item in items]
-    
-    return ContactListResponse(
-        items=items_dict,
+    return model_response(ContactListResponse, dict(
+        items=result.items,
         total=total,
         page=page,
-        size=len(items),
-        pages=pages
-    )
+        size=len(result.items),
+        pages=pages,
+        next_cursor=result.next_cursor,
+        total_is_estimate=result.total_is_estimate
+    ))
 
 
 @router.post("/", response_model=ContactSchema)
@@ -102,7 +108,7 @@ def get_unread_contacts(
     """
     Retrieve unread contacts.
     """
-    return contact.get_unread_contacts(db, limit=limit)
+    return model_response(List[ContactSchema], contact.get_unread_contacts(db, limit=limit))
 
 
 @router.get("/pending-replies", response_model=List[ContactSchema])
@@ -114,7 +120,7 @@ def get_pending_replies(
     """
     Retrieve contacts pending replies.
     """
-    return contact.get_pending_replies(db, limit=limit)
+    return model_response(List[ContactSchema], contact.get_pending_replies(db, limit=limit))
 
 
 @router.get("/search", response_model=List[ContactSchema])
@@ -127,7 +133,7 @@ def search_contacts(
     """
     Search contacts by name, email, company, or subject.
     """
-    return contact.search_contacts(db, query=q, limit=limit)
+    return model_response(List[ContactSchema], contact.search_contacts(db, query=q, limit=limit))
 
 
 @router.get("/recent", response_model=List[ContactSchema])
@@ -140,7 +146,7 @@ def get_recent_contacts(
     """
     Get contacts from the last N days.
     """
-    return contact.get_recent_contacts(db, days=days)
+    return model_response(List[ContactSchema], contact.get_recent_contacts(db, days=days))
 
 
 @router.get("/by-company/{company_name}", response_model=List[ContactSchema])
@@ -153,7 +159,7 @@ def get_contacts_by_company(
     """
     Get all contacts from a specific company.
     """
-    return contact.get_by_company(db, company_name=company_name)
+    return model_response(List[ContactSchema], contact.get_by_company(db, company_name=company_name))
 
 
 @router.get("/{contact_id}", response_model=ContactSchema)
@@ -1,7 +1,9 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Response, status, UploadFile, File, Form
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.core.database import get_db
+from app.core.pagination import set_next_cursor
 from app.api.deps import get_current_user, get_current_admin_user
 from app.models.user import User
 from app.models.hero_banner import HeroBanner
@@ -19,8 +21,10 @@ router = APIRouter()
 
 @router.get("/", response_model=List[HeroBannerResponse])
 def get_hero_banners(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     active_only: bool = False,
     db: Session = Depends(get_db)
 ):
@@ -28,7 +32,8 @@ def get_hero_banners(
     if active_only:
         banners = hero_banner_crud.get_active_banners(db)
     else:
-        banners = hero_banner_crud.get_multi(db, skip=skip, limit=limit)
+        banners = hero_banner_crud.get_multi(db, skip=skip, limit=limit, cursor=cursor)
+        set_next_cursor(response, hero_banner_crud.get_keyset().next_cursor(banners, limit))
     return banners
 
 
@@ -143,7 +148,7 @@ async def update_banner_image(
     old_image_url = getattr(banner, 'image_url', None)
     if old_image_url:
         old_image_path = old_image_url.replace("/static/", "")
-        delete_image_file(old_image_path)
+        await run_in_threadpool(delete_image_file, old_image_path)
     
     # Upload new background image
     image_path = await save_uploaded_image(background_image, "hero-banners")
@@ -173,7 +178,7 @@ async def delete_banner_image(
     current_image_url = getattr(banner, 'image_url', None)
     if current_image_url:
         image_path = current_image_url.replace("/static/", "")
-        delete_image_file(image_path)
+        await run_in_threadpool(delete_image_file, image_path)
         
         # Remove image URL from database
         update_data = {"image_url": None}
@@ -195,6 +200,11 @@ def reorder_banners(
 ):
     """Reorder hero banners (admin only)"""
     updated_banners = hero_banner_crud.reorder_banners(db, reorder_data.banner_ids)
+    if updated_banners is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="banner_ids must not contain duplicates"
+        )
     return updated_banners
 
 
@@ -212,11 +222,11 @@ def delete_hero_banner(
             detail="Hero banner not found"
         )
     
-    # Delete background image file if exists
     current_image_url = getattr(banner, 'image_url', None)
+    hero_banner_crud.remove(db=db, id=banner_id)
+    
+    # Delete background image file if exists, now that the banner is gone
     if current_image_url:
         image_path = current_image_url.replace("/static/", "")
         delete_image_file(image_path)
-    
-    hero_banner_crud.remove(db=db, id=banner_id)
     return {"message": "Hero banner deleted successfully"}
@@ -0,0 +1,54 @@
+import os
+import posixpath
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from PIL import features
+from app.core.conditional import is_not_modified
+from app.core.config import settings
+from app.core.static_files import IMMUTABLE_PREFIXES, accepts
+from app.core.storage import IMMUTABLE_CACHE_CONTROL
+from app.services.image_transform import MAX_DIMENSION, Transform, resolve_source, transform_cache
+
+router = APIRouter()
+
+
+def negotiate_format(accept_header: str) -> str:
+    """Best output format the client accepts"""
+    if accepts(accept_header, "image/avif") and features.check("avif"):
+        return "avif"
+    if accepts(accept_header, "image/webp"):
+        return "webp"
+    return "jpeg"
+
+
+@router.get("/{path:path}")
+async def get_transformed_image(
+    path: str,
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, le=MAX_DIMENSION),
+    h: Optional[int] = Query(None, ge=1, le=MAX_DIMENSION),
+    fit: str = Query("inside", regex="^(inside|contain|cover|fill)$"),
+    fmt: Optional[str] = Query(None, regex="^(jpeg|webp|avif|png)$"),
+    q: int = Query(80, ge=1, le=100)
+):
+    """Resized / cropped / re-encoded image from upload storage (public)"""
+    source = await resolve_source(path)
+    # URLs name the source by path: only content-addressed blobs never change under theirs
+    immutable = posixpath.normpath(path.lstrip("/")).startswith(IMMUTABLE_PREFIXES)
+    headers = {
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else f"public, max-age={settings.static_max_age}"
+    }
+    if fmt is None:
+        fmt = negotiate_format(request.headers.get("accept", ""))
+        headers["Vary"] = "Accept"
+    elif fmt == "avif" and not features.check("avif"):
+        raise HTTPException(status_code=400, detail="AVIF output is not supported on this server")
+
+    transform = Transform(width=w, height=h, fit=fit, format=fmt, quality=q)
+    cached_path = await transform_cache.get(source, transform)
+    # Cache entries are named after the source content and the parameters
+    headers["ETag"] = f'"{os.path.splitext(os.path.basename(cached_path))[0]}"'
+    if is_not_modified(request, headers["ETag"], None):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(cached_path, media_type=transform.media_type, headers=headers)
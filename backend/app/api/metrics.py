@@ -0,0 +1,102 @@
+from typing import Any
+from fastapi import APIRouter, Depends
+from app.api.deps import get_current_admin_user
+from app.core.cache import response_cache
+from app.core.compression import compression_stats
+from app.core.config import settings
+from app.core.image_workers import image_workers
+from app.core.pool import async_pool_telemetry, sync_pool_telemetry
+from app.core.replicas import replica_router
+from app.core.storage import storage
+from app.core.static_files import hot_files
+from app.services.image_transform import transform_cache
+from app.services.view_counter import view_counter
+from app.models.user import User
+
+router = APIRouter()
+
+
+@router.get("/cache")
+def get_cache_stats(
+    current_user: User = Depends(get_current_admin_user)
+) -> Any:
+    """Get response cache hit ratio, size and eviction counters (admin only)"""
+    return response_cache.stats()
+
+
+@router.post("/cache/clear")
+def clear_cache(
+    current_user: User = Depends(get_current_admin_user)
+) -> Any:
+    """Drop all cached responses (admin only)"""
+    response_cache.clear()
+    return {"message": "Response cache cleared"}
+
+
+@router.get("/pool")
+def get_pool_stats(
+    current_user: User = Depends(get_current_admin_user)
+) -> Any:
+    """Get connection pool configuration, checkout latency and connection lifetimes (admin only)"""
+    return {
+        "config": {
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout,
+            "pool_recycle": settings.db_pool_recycle,
+            "pool_pre_ping": settings.db_pool_pre_ping,
+            "statement_timeout_ms": settings.db_statement_timeout_ms,
+        },
+        "engines": {
+            telemetry.name: telemetry.stats()
+            for telemetry in [sync_pool_telemetry, async_pool_telemetry, *replica_router.telemetries()]
+        },
+    }
+
+
+@router.get("/replicas")
+def get_replica_stats(
+    current_user: User = Depends(get_current_admin_user)
+) -> Any:
+    """Get read replica health, lag and routing counters (admin only)"""
+    return replica_router.stats()
+
+
+@router.get("/images")
+def get_image_worker_stats(
+    current_user: User = Depends(get_current_admin_user)
+) -> Any:
+    """Get image processing queue depth, rejections and per-job timings (admin only)"""
+    return image_workers.stats()
+
+
+@router.get("/image-cache")
+def get_image_cache_stats(
+    current_user: User = Depends(get_current_admin_user)
+) -> Any:
+    """Get /img transform cache and local source copy sizes, hit ratio and eviction counters (admin only)"""
+    return {**transform_cache.stats(), "source_copies": storage.copies.stats()}
+
+
+@router.get("/static")
+def get_static_stats(
+    current_user: User = Depends(get_current_admin_user)
+) -> Any:
+    """Get /static hot-file memory cache size and hit ratio (admin only)"""
+    return hot_files.stats()
+
+
+@router.get("/compression")
+def get_compression_stats(
+    current_user: User = Depends(get_current_admin_user)
+) -> Any:
+    """Get response compression ratios and CPU time per route and encoding (admin only)"""
+    return compression_stats.stats()
+
+
+@router.get("/views")
+def get_view_counter_stats(
+    current_user: User = Depends(get_current_admin_user)
+) -> Any:
+    """Get buffered news view counts, flush timings and dropped views (admin only)"""
+    return view_counter.stats()
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 from datetime import datetime, timezone
 import os
@@ -13,9 +14,16 @@ from app.models.news import News
 from app.schemas.news import (
     NewsCreate, NewsUpdate, NewsResponse, NewsListResponse, NewsStatsResponse,
     AnnouncementCreate, AnnouncementUpdate, AnnouncementResponse, AnnouncementListResponse,
-    NewsImageUpdate
+    NewsImageUpdate, NewsViewBucketResponse, NewsBulkAction, NewsBulkResult
 )
 from app.crud.news import news
+from app.crud.news_views import news_views
+from app.crud.tag import tag
+from app.schemas.tag import TagResponse
+from app.core.pagination import CountMode
+from app.core.compression import compression
+from app.core.serialization import model_response
+from app.services.view_counter import view_counter
 from app.utils.file_upload import save_uploaded_image, delete_image_file
 from app.utils.document_upload import save_uploaded_document, delete_document_file, get_document_url
 import json
@@ -29,7 +37,31 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(DOCUMENTS_DIR, exist_ok=True)
 
 
+def _response_dict(item: News) -> dict:
+    """Loaded columns plus the attachments JSON, for responses with computed fields"""
+    item_dict = item.__dict__.copy()
+    item_dict['attachments'] = item.attachments
+    return item_dict
+
+
+def _attachment_values(file_info: dict) -> dict:
+    """news_attachments row for a stored document"""
+    return {
+        "id": str(uuid.uuid4()),
+        "original_filename": file_info["filename"],
+        "saved_filename": file_info["saved_filename"],
+        "file_path": file_info["file_path"],
+        "file_size": file_info["file_size"],
+        "file_type": file_info["file_type"],
+        "file_extension": file_info["file_extension"],
+        "sha256": file_info["sha256"],
+        "uploaded_at": datetime.now(timezone.utc),
+        "download_url": get_document_url(file_info["file_path"])
+    }
+
+
 @router.get("/", response_model=NewsListResponse)
+@compression()
 def get_news_list(
     *,
     db: Session = Depends(get_db),
@@ -42,37 +74,36 @@ def get_news_list(
     is_featured: Optional[bool] = Query(None, description="Filter by featured status"),
     order_by: str = Query("created_at", description="Field to order by"),
     order_desc: bool = Query(True, description="Order in descending order"),
+    cursor: Optional[str] = Query(None, description="Cursor from next_cursor of the previous page"),
+    count: CountMode = Query(CountMode.WINDOW, description="How to compute the total: window, exact, estimated or none"),
+    tags: Optional[List[str]] = Query(None, description="Filter by tags (repeat the parameter)"),
+    tag_match: str = Query("any", regex="^(any|all)$", description="Match any or all of the tags"),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get news list with filters and pagination
     """
-    news_items = news.get_multi_with_filters(
+    result = news.get_page_with_filters(
         db=db,
         skip=skip,
         limit=limit,
+        cursor=cursor,
+        count_mode=count,
         search=search,
         category=category,
         author=author,
         is_published=is_published,
         is_featured=is_featured,
+        tags=tags,
+        match_all_tags=tag_match == "all",
         order_by=order_by,
         order_desc=order_desc
     )
     
-    total = news.count_with_filters(
-        db=db,
-        search=search,
-        category=category,
-        author=author,
-        is_published=is_published,
-        is_featured=is_featured
-    )
-    
     # Add computed fields for announcements
     response_items = []
-    for item in news_items:
-        item_dict = item.__dict__.copy()
+    for item in result.items:
+        item_dict = _response_dict(item)
         if getattr(item, 'category', '') == 'announcement':
             # Add is_expired field for announcements
             if getattr(item, 'expires_at', None):
@@ -81,13 +112,15 @@ def get_news_list(
                 item_dict['is_expired'] = False
         response_items.append(item_dict)
     
-    return NewsListResponse(
+    return model_response(NewsListResponse, dict(
         items=response_items,
-        total=total,
+        total=result.total,
         page=skip // limit + 1,
         size=limit,
-        pages=(total + limit - 1) // limit
-    )
+        pages=result.pages(limit),
+        next_cursor=result.next_cursor,
+        total_is_estimate=result.total_is_estimate
+    ))
 
 
 @router.get("/stats", response_model=NewsStatsResponse)
@@ -103,6 +136,19 @@ def get_news_stats(
     return NewsStatsResponse(**stats)
 
 
+@router.get("/tags", response_model=List[TagResponse])
+def get_news_tags(
+    *,
+    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get tags with their article counts, most used first
+    """
+    return model_response(List[TagResponse], tag.get_cloud(db, limit=limit, published_only=False))
+
+
 @router.get("/featured", response_model=List[NewsResponse])
 def get_featured_news(
     *,
@@ -113,7 +159,7 @@ def get_featured_news(
     Get featured news (public endpoint)
     """
     featured_news = news.get_featured(db=db, limit=limit)
-    return featured_news
+    return model_response(List[NewsResponse], featured_news)
 
 
 @router.get("/latest", response_model=List[NewsResponse])
@@ -127,7 +173,7 @@ def get_latest_news(
     Get latest published news (public endpoint)
     """
     latest_news = news.get_latest(db=db, limit=limit, category=category)
-    return latest_news
+    return model_response(List[NewsResponse], latest_news)
 
 
 @router.get("/announcements", response_model=AnnouncementListResponse)
@@ -161,20 +207,20 @@ def get_announcements(
     # Add computed is_expired field
     response_items = []
     for item in announcements:
-        item_dict = item.__dict__.copy()
+        item_dict = _response_dict(item)
         if getattr(item, 'expires_at', None):
             item_dict['is_expired'] = datetime.now(timezone.utc) > getattr(item, 'expires_at')
         else:
             item_dict['is_expired'] = False
         response_items.append(item_dict)
     
-    return AnnouncementListResponse(
+    return model_response(AnnouncementListResponse, dict(
         items=response_items,
         total=total,
         page=skip // limit + 1,
         size=limit,
         pages=(total + limit - 1) // limit
-    )
+    ))
 
 
 @router.get("/{news_id}", response_model=NewsResponse)
@@ -193,7 +239,7 @@ def get_news_by_id(
         raise HTTPException(status_code=404, detail="News not found")
     
     if increment_views:
-        db_news = news.increment_views(db=db, news_id=news_id)
+        view_counter.record(news_id)
     
     return db_news
 
@@ -214,11 +260,31 @@ def get_news_by_slug(
     
     # Only increment views for published news
     if increment_views and getattr(db_news, 'is_published', False):
-        db_news = news.increment_views(db=db, news_id=getattr(db_news, 'id'))
+        view_counter.record(getattr(db_news, 'id'))
     
     return db_news
 
 
+@router.get("/{news_id}/views", response_model=List[NewsViewBucketResponse])
+def get_news_view_history(
+    *,
+    db: Session = Depends(get_db),
+    news_id: int,
+    granularity: str = Query("day", regex="^(hour|day|month)$", description="Bucket size"),
+    since: Optional[datetime] = Query(None, description="First bucket start (UTC)"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the view history of a news article; hours roll up into days and days into months as they age
+    """
+    if not news.get(db=db, id=news_id):
+        raise HTTPException(status_code=404, detail="News not found")
+    if since is not None and since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    buckets = news_views.get_history(db, news_id=news_id, granularity=granularity, since=since)
+    return model_response(List[NewsViewBucketResponse], buckets)
+
+
 @router.post("/", response_model=NewsResponse)
 def create_news(
     *,
@@ -257,7 +323,7 @@ def create_announcement(
     db_announcement = news.create_with_slug_check(db=db, obj_in=announcement_in)
     
     # Add computed is_expired field
-    response_dict = db_announcement.__dict__.copy()
+    response_dict = _response_dict(db_announcement)
     if getattr(db_announcement, 'expires_at', None):
         response_dict['is_expired'] = datetime.now(timezone.utc) > getattr(db_announcement, 'expires_at')
     else:
@@ -306,7 +372,7 @@ def update_announcement(
     db_announcement = news.update(db=db, db_obj=db_announcement, obj_in=announcement_in)
     
     # Add computed is_expired field
-    response_dict = db_announcement.__dict__.copy()
+    response_dict = _response_dict(db_announcement)
     if getattr(db_announcement, 'expires_at', None):
         response_dict['is_expired'] = datetime.now(timezone.utc) > getattr(db_announcement, 'expires_at')
     else:
@@ -315,6 +381,37 @@ def update_announcement(
     return response_dict
 
 
+@router.post("/bulk", response_model=NewsBulkResult)
+def bulk_news_action(
+    *,
+    db: Session = Depends(get_db),
+    bulk_in: NewsBulkAction,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Publish, unpublish, feature, unfeature, stick, unstick or delete many articles at once,
+    chosen by id or by the news list filters
+    """
+    criteria = news.filter_criteria(**bulk_in.filter.criteria_filters()) if bulk_in.filter else None
+    if bulk_in.action == "delete":
+        if criteria is not None:
+            # Filter deletes are confirmed by count, and never remove more than confirmed
+            matching = news.count_with_filters(db=db, **bulk_in.filter.criteria_filters())
+            if matching != bulk_in.expected_count:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"The filter matches {matching} articles, not expected_count={bulk_in.expected_count}"
+                )
+        result = news.bulk_remove(db=db, ids=bulk_in.ids, criteria=criteria, limit=bulk_in.expected_count)
+        for image_url in result.image_urls:
+            delete_image_file(image_url)
+        for document_path in result.document_paths:
+            delete_document_file(document_path)
+    else:
+        result = news.bulk_update(db=db, action=bulk_in.action, ids=bulk_in.ids, criteria=criteria)
+    return NewsBulkResult(action=result.action, matched=result.matched, affected=result.affected)
+
+
 @router.delete("/{news_id}")
 def delete_news(
     *,
@@ -329,21 +426,19 @@ def delete_news(
     if not db_news:
         raise HTTPException(status_code=404, detail="News not found")
     
-    # Delete associated image file if exists
-    if getattr(db_news, 'featured_image_url', None):
-        delete_image_file(getattr(db_news, 'featured_image_url'))
-    
-    # Delete associated document attachments if exist
-    current_attachments = getattr(db_news, 'attachments', None)
-    if current_attachments:
-        try:
-            attachments_list = json.loads(current_attachments)
-            for attachment in attachments_list:
-                delete_document_file(attachment.get("file_path", ""))
-        except:
-            pass  # If JSON parsing fails, continue with deletion
+    image_url = getattr(db_news, 'featured_image_url', None)
+    document_paths = [attachment.file_path for attachment in db_news.attachment_items]
     
+    # Files are released only once the row delete has committed
     news.remove(db=db, id=news_id)
+    
+    # Delete associated image file if exists
+    if image_url:
+        delete_image_file(image_url)
+    
+    # Release associated documents; their rows went with the news row
+    for document_path in document_paths:
+        delete_document_file(document_path)
     return {"message": "News deleted successfully"}
 
 
@@ -376,7 +471,7 @@ async def upload_news_image(
         
         # Delete old image if exists
         if getattr(db_news, 'featured_image_url', None):
-            delete_image_file(getattr(db_news, 'featured_image_url'))
+            await run_in_threadpool(delete_image_file, getattr(db_news, 'featured_image_url'))
         
         # Update news with new image URL
         image_update = NewsImageUpdate(featured_image_url=file_url)
@@ -384,6 +479,8 @@ async def upload_news_image(
         
         return db_news
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload image: {str(e)}")
 
@@ -407,41 +504,19 @@ async def upload_news_document(
     try:
         file_info = await save_uploaded_document(file, "news/documents")
         
-        # Get current attachments
-        current_attachments = getattr(db_news, 'attachments', None)
-        attachments_list = []
-        if current_attachments:
-            try:
-                attachments_list = json.loads(current_attachments)
-            except:
-                attachments_list = []
-        
-        # Add new attachment
-        new_attachment = {
-            "id": str(uuid.uuid4()),
-            "original_filename": file_info["filename"],
-            "saved_filename": file_info["saved_filename"],
-            "file_path": file_info["file_path"],
-            "file_size": file_info["file_size"],
-            "file_type": file_info["file_type"],
-            "file_extension": file_info["file_extension"],
-            "uploaded_at": datetime.now(timezone.utc).isoformat(),
-            "download_url": get_document_url(file_info["file_path"])
-        }
-        
-        attachments_list.append(new_attachment)
-        
-        # Update news with new attachments
-        setattr(db_news, 'attachments', json.dumps(attachments_list))
-        db.commit()
-        db.refresh(db_news)
+        # One row per attachment, so concurrent uploads cannot drop each other's
+        new_attachment = news.add_attachments(
+            db=db, news_id=news_id, attachments=[_attachment_values(file_info)]
+        )[0]
         
         return {
             "message": "Document uploaded successfully",
-            "attachment": new_attachment,
-            "total_attachments": len(attachments_list)
+            "attachment": new_attachment.to_dict(),
+            "total_attachments": news.count_attachments(db=db, news_id=news_id)
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload document: {str(e)}")
 
@@ -460,15 +535,7 @@ def get_news_attachments(
     if not db_news:
         raise HTTPException(status_code=404, detail="News not found")
     
-    current_attachments = getattr(db_news, 'attachments', None)
-    if not current_attachments:
-        return []
-    
-    try:
-        attachments_list = json.loads(current_attachments)
-        return attachments_list
-    except:
-        return []
+    return [attachment.to_dict() for attachment in db_news.attachment_items]
 
 
 @router.delete("/{news_id}/attachments/{attachment_id}")
@@ -486,44 +553,18 @@ def delete_news_attachment(
     if not db_news:
         raise HTTPException(status_code=404, detail="News not found")
     
-    current_attachments = getattr(db_news, 'attachments', None)
-    if not current_attachments:
+    attachment = news.remove_attachment(db=db, news_id=news_id, attachment_id=attachment_id)
+    if not attachment:
         raise HTTPException(status_code=404, detail="Attachment not found")
     
-    try:
-        attachments_list = json.loads(current_attachments)
-        
-        # Find and remove the attachment
-        attachment_to_delete = None
-        updated_attachments = []
-        
-        for attachment in attachments_list:
-            if attachment.get("id") == attachment_id:
-                attachment_to_delete = attachment
-            else:
-                updated_attachments.append(attachment)
-        
-        if not attachment_to_delete:
-            raise HTTPException(status_code=404, detail="Attachment not found")
-        
-        # Delete the physical file
-        delete_document_file(attachment_to_delete.get("file_path", ""))
-        
-        # Update the database
-        setattr(db_news, 'attachments', json.dumps(updated_attachments))
-        db.commit()
-        db.refresh(db_news)
-        
-        return {
-            "message": "Attachment deleted successfully",
-            "deleted_attachment": attachment_to_delete["original_filename"],
-            "remaining_attachments": len(updated_attachments)
-        }
-        
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=500, detail="Invalid attachments data")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to delete attachment: {str(e)}")
+    # Release the file only after the row is gone
+    delete_document_file(attachment.file_path)
+    
+    return {
+        "message": "Attachment deleted successfully",
+        "deleted_attachment": attachment.original_filename,
+        "remaining_attachments": news.count_attachments(db=db, news_id=news_id)
+    }
 
 
 @router.post("/{news_id}/upload-multiple-documents", response_model=dict)
@@ -544,36 +585,13 @@ async def upload_multiple_news_documents(
     if len(files) > 10:  # Limit to 10 files at once
         raise HTTPException(status_code=400, detail="Maximum 10 files allowed per upload")
     
-    # Get current attachments
-    current_attachments = getattr(db_news, 'attachments', None)
-    attachments_list = []
-    if current_attachments:
-        try:
-            attachments_list = json.loads(current_attachments)
-        except:
-            attachments_list = []
-    
-    uploaded_files = []
+    new_attachments = []
     failed_files = []
     
     for file in files:
         try:
             file_info = await save_uploaded_document(file, "news/documents")
-            
-            new_attachment = {
-                "id": str(uuid.uuid4()),
-                "original_filename": file_info["filename"],
-                "saved_filename": file_info["saved_filename"],
-                "file_path": file_info["file_path"],
-                "file_size": file_info["file_size"],
-                "file_type": file_info["file_type"],
-                "file_extension": file_info["file_extension"],
-                "uploaded_at": datetime.now(timezone.utc).isoformat(),
-                "download_url": get_document_url(file_info["file_path"])
-            }
-            
-            attachments_list.append(new_attachment)
-            uploaded_files.append(new_attachment)
+            new_attachments.append(_attachment_values(file_info))
             
         except Exception as e:
             failed_files.append({
@@ -581,16 +599,17 @@ async def upload_multiple_news_documents(
                 "error": str(e)
             })
     
-    # Update news with new attachments
-    setattr(db_news, 'attachments', json.dumps(attachments_list))
-    db.commit()
-    db.refresh(db_news)
+    # All stored files are inserted in one transaction
+    uploaded_files = [
+        attachment.to_dict()
+        for attachment in news.add_attachments(db=db, news_id=news_id, attachments=new_attachments)
+    ]
     
     return {
         "message": f"Uploaded {len(uploaded_files)} files successfully",
         "uploaded_files": uploaded_files,
         "failed_files": failed_files,
-        "total_attachments": len(attachments_list)
+        "total_attachments": news.count_attachments(db=db, news_id=news_id)
     }
 
 
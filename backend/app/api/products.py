@@ -1,14 +1,20 @@
+import asyncio
+import logging
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Response, status, UploadFile, File, Form
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.core.database import get_db
+from app.core.pagination import set_next_cursor
 from app.api.deps import get_current_user, get_current_admin_user
 from app.models.user import User
 from app.models.product import Product
-from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse
+from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse, ProductImageResponse, GalleryOrder, ProductReorderRequest
 from app.crud.product import product
 from app.utils.file_upload import save_uploaded_image, delete_image_file, get_image_url
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -46,12 +52,15 @@ async def test_form_data(
 
 @router.get("/", response_model=List[ProductResponse])
 def get_products(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """Get all products (public endpoint)"""
-    products = product.get_multi(db, skip=skip, limit=limit)
+    products = product.get_multi(db, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, product.get_keyset().next_cursor(products, limit))
     return products
 
 
@@ -81,6 +90,22 @@ def create_product(
     return product_obj
 
 
+@router.post("/reorder", response_model=List[ProductResponse])
+def reorder_products(
+    reorder_data: ProductReorderRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Set product order positions from the given id order (admin only)"""
+    products = product.reorder_products(db=db, product_ids=reorder_data.product_ids)
+    if products is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="product_ids must not contain duplicates"
+        )
+    return products
+
+
 @router.put("/{product_id}", response_model=ProductResponse)
 def update_product(
     product_id: int,
@@ -112,7 +137,15 @@ def delete_product(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
+
+    image_urls = [product_obj.image_url] if product_obj.image_url else []
+    image_urls += [image.image_url for image in product_obj.gallery]
+
+    # Gallery rows go with the product; files are released once the delete has committed
     product.remove(db=db, id=product_id)
+
+    for image_url in image_urls:
+        delete_image_file(image_url.replace("/static/", ""))
     return {"message": "Product deleted successfully"}
 
 
@@ -134,23 +167,11 @@ async def create_product_with_image(
 ):
     """Create a new product with image upload (admin only)"""
     try:
-        print(f"DEBUG: Received product creation request from user: {current_user.email}")
-        print(f"DEBUG: Product name: {name}")
-        print(f"DEBUG: Has image: {image is not None}")
-        print(f"DEBUG: Image filename: {image.filename if image else 'None'}")
-        print(f"DEBUG: Price: {price}, Type: {type(price)}")
-        print(f"DEBUG: is_featured: {is_featured}, Type: {type(is_featured)}")
-        print(f"DEBUG: is_active: {is_active}, Type: {type(is_active)}")
-        print(f"DEBUG: order_position: {order_position}, Type: {type(order_position)}")
-        
         image_url = None
         if image and image.filename:
-            print("DEBUG: Processing image upload...")
             # Upload and save image
             image_path = await save_uploaded_image(image, "products")
             image_url = get_image_url(image_path)
-            print(f"DEBUG: Image saved to: {image_path}")
-            print(f"DEBUG: Image URL: {image_url}")
         
         # Handle price conversion - convert empty string to None
         price_value = None
@@ -178,17 +199,14 @@ async def create_product_with_image(
             order_position=order_position
         )
         
-        print(f"DEBUG: ProductCreate data: {product_data}")
-        
         product_obj = product.create(db=db, obj_in=product_data)
-        print(f"DEBUG: Product created successfully with ID: {product_obj.id}")
         return product_obj
         
+    except HTTPException:
+        # Keeps the image pool's 429 (with Retry-After) and 504, and the price 422
+        raise
     except Exception as e:
-        print(f"ERROR: Failed to create product: {str(e)}")
-        print(f"ERROR: Exception type: {type(e)}")
-        import traceback
-        print(f"ERROR: Traceback: {traceback.format_exc()}")
+        logger.exception("Failed to create product")
         raise HTTPException(
             status_code=400,
             detail=f"Failed to create product: {str(e)}"
@@ -214,7 +232,7 @@ async def update_product_image(
     old_image_url = getattr(product_obj, 'image_url', None)
     if old_image_url:
         old_image_path = old_image_url.replace("/static/", "")
-        delete_image_file(old_image_path)
+        await run_in_threadpool(delete_image_file, old_image_path)
     
     # Upload new image
     image_path = await save_uploaded_image(image, "products")
@@ -226,6 +244,21 @@ async def update_product_image(
     return product_obj
 
 
+@router.get("/{product_id}/gallery", response_model=List[ProductImageResponse])
+def get_product_gallery(
+    product_id: int,
+    db: Session = Depends(get_db)
+):
+    """Get gallery images in display order (public endpoint)"""
+    product_obj = product.get(db=db, id=product_id)
+    if not product_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+    return product_obj.gallery
+
+
 @router.post("/{product_id}/gallery", response_model=ProductResponse)
 async def add_gallery_image(
     product_id: int,
@@ -245,17 +278,95 @@ async def add_gallery_image(
     image_path = await save_uploaded_image(image, "products/gallery")
     image_url = get_image_url(image_path)
     
-    # Add to gallery_images (assuming it's a JSON array or comma-separated string)
-    current_gallery = getattr(product_obj, 'gallery_images', None) or ""
-    if current_gallery:
-        new_gallery = f"{current_gallery},{image_url}"
-    else:
-        new_gallery = image_url
+    # Appended as its own row; other gallery images are not rewritten
+    product.add_gallery_images(db=db, product_id=product_id, image_urls=[image_url])
+    return product.get(db=db, id=product_id)
+
+
+@router.post("/{product_id}/gallery/batch")
+async def add_gallery_images(
+    product_id: int,
+    images: List[UploadFile] = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Add several images to the product gallery, processed concurrently (admin only)"""
+    product_obj = product.get(db=db, id=product_id)
+    if not product_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
     
-    # Update product with new gallery
-    update_data = {"gallery_images": new_gallery}
-    product_obj = product.update(db=db, db_obj=product_obj, obj_in=update_data)
-    return product_obj
+    if len(images) > 10:  # Limit to 10 files at once
+        raise HTTPException(status_code=400, detail="Maximum 10 images allowed per upload")
+    
+    # Renditions are rendered by the image worker pool, so uploads proceed in parallel
+    results = await asyncio.gather(
+        *(save_uploaded_image(image, "products/gallery") for image in images),
+        return_exceptions=True
+    )
+    
+    image_urls = []
+    failed_files = []
+    for image, result in zip(images, results):
+        if isinstance(result, BaseException):
+            detail = result.detail if isinstance(result, HTTPException) else str(result)
+            failed_files.append({"filename": image.filename, "error": detail})
+        else:
+            image_urls.append(get_image_url(result))
+    
+    # Stored images keep the order they were sent in
+    added = product.add_gallery_images(db=db, product_id=product_id, image_urls=image_urls)
+    
+    return {
+        "message": f"Uploaded {len(added)} images successfully",
+        "uploaded_images": [ProductImageResponse.model_validate(image) for image in added],
+        "failed_files": failed_files
+    }
+
+
+@router.put("/{product_id}/gallery/order", response_model=List[ProductImageResponse])
+def reorder_gallery(
+    product_id: int,
+    order: GalleryOrder,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Reorder the product gallery; image_ids must list every gallery image (admin only)"""
+    product_obj = product.get(db=db, id=product_id)
+    if not product_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
+    gallery = product.reorder_gallery(db=db, product_id=product_id, image_ids=order.image_ids)
+    if gallery is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="image_ids must contain each gallery image of this product exactly once"
+        )
+    return gallery
+
+
+@router.delete("/{product_id}/gallery/{image_id}")
+async def delete_gallery_image(
+    product_id: int,
+    image_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Delete a single gallery image (admin only)"""
+    image = product.remove_gallery_image(db=db, product_id=product_id, image_id=image_id)
+    if not image:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Gallery image not found"
+        )
+    
+    # Release the file only after the row is gone
+    await run_in_threadpool(delete_image_file, image.image_url.replace("/static/", ""))
+    return {"message": "Gallery image deleted successfully"}
 
 
 @router.delete("/{product_id}/image")
@@ -276,7 +387,7 @@ async def delete_product_image(
     current_image_url = getattr(product_obj, 'image_url', None)
     if current_image_url:
         image_path = current_image_url.replace("/static/", "")
-        delete_image_file(image_path)
+        await run_in_threadpool(delete_image_file, image_path)
         
         # Remove image URL from database
         update_data = {"image_url": None}
@@ -304,18 +415,11 @@ async def clear_product_gallery(
             detail="Product not found"
         )
     
-    # Delete all gallery image files if they exist
-    current_gallery = getattr(product_obj, 'gallery_images', None)
-    if current_gallery:
-        gallery_urls = current_gallery.split(',')
+    # Delete the rows, then release the files they referenced
+    gallery_urls = product.clear_gallery(db=db, product_id=product_id)
+    if gallery_urls:
         for url in gallery_urls:
-            if url.strip():
-                image_path = url.strip().replace("/static/", "")
-                delete_image_file(image_path)
-        
-        # Clear gallery from database
-        update_data = {"gallery_images": None}
-        product.update(db=db, db_obj=product_obj, obj_in=update_data)
+            await run_in_threadpool(delete_image_file, url.replace("/static/", ""))
         
         return {"message": "Product gallery cleared successfully"}
     else:
@@ -1,7 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.replicas import get_read_db, get_async_read_db
+from app.core.cache import CachedRoute
+from app.core.conditional import check_collection_async, check_item_async
+from app.core.pagination import set_next_cursor
+from app.core.compression import compression
+from app.core.serialization import model_response
+from app.models.hero_banner import HeroBanner
+from app.models.team import TeamMember
+from app.models.company import Company
+from app.models.product import Product
+from app.models.service import Service
+from app.models.news import News
 from app import crud
 from app.services.public.hero_banner_service import PublicHeroBannerService
 from app.services.public.team_service import PublicTeamService
@@ -9,6 +23,15 @@ from app.services.public.product_service import PublicProductService
 from app.services.public.service_service import PublicServiceService
 from app.services.public.news_service import PublicNewsService
 from app.services.public.search_service import PublicSearchService
+from app.services.view_counter import view_counter
+from app.services.public.async_services import (
+    AsyncPublicHeroBannerService,
+    AsyncPublicTeamService,
+    AsyncPublicCompanyService,
+    AsyncPublicProductService,
+    AsyncPublicServiceService,
+    AsyncPublicNewsService
+)
 from app.schemas import (
     hero_banner as hero_banner_schemas,
     team as team_schemas,
@@ -16,224 +39,446 @@ from app.schemas import (
     product as product_schemas,
     service as service_schemas,
     news as news_schemas,
+    tag as tag_schemas,
     contact as contact_schemas
 )
 
-router = APIRouter()
+
+
+class PublicCachedRoute(CachedRoute):
+    """Cache public GET responses, invalidated by writes to the tables they read"""
+    cache_tags = {
+        "hero-banners": ["hero_banners"],
+        "team": ["team_members"],
+        "company": ["company_info"],
+        "products": ["products"],
+        "services": ["services"],
+        "news": ["news"],
+        "announcements": ["news"],
+        "tags": ["tags"],
+        "search": ["news", "products", "services"],
+    }
+
+
+router = APIRouter(route_class=PublicCachedRoute)
 
 # Hero Banners - Public endpoints
 @router.get("/hero-banners", response_model=List[hero_banner_schemas.HeroBanner])
-def get_public_hero_banners(
+async def get_public_hero_banners(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get published hero banners for public website"""
-    hero_banners = PublicHeroBannerService.get_active_banners(db, skip=skip, limit=limit)
-    return hero_banners
+    not_modified = await check_collection_async(
+        request, response, db, HeroBanner, PublicHeroBannerService.active_banners_criteria()
+    )
+    if not_modified:
+        return not_modified
+    hero_banners = await AsyncPublicHeroBannerService.get_active_banners(db, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, PublicHeroBannerService.active_banners_keyset().next_cursor(hero_banners, limit))
+    return model_response(List[hero_banner_schemas.HeroBanner], hero_banners, response)
 
 @router.get("/hero-banners/{banner_id}", response_model=hero_banner_schemas.HeroBanner)
-def get_public_hero_banner(
+async def get_public_hero_banner(
+    request: Request,
+    response: Response,
     banner_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get a specific hero banner by ID - only if active"""
-    hero_banner = PublicHeroBannerService.get_banner_by_id(db, banner_id)
+    not_modified = await check_item_async(
+        request, response, db, HeroBanner, PublicHeroBannerService.banner_by_id_criteria(banner_id)
+    )
+    if not_modified:
+        return not_modified
+    hero_banner = await AsyncPublicHeroBannerService.get_banner_by_id(db, banner_id)
     if not hero_banner:
         raise HTTPException(status_code=404, detail="Hero banner not found")
     return hero_banner
 
 @router.get("/hero-banners/featured/main", response_model=hero_banner_schemas.HeroBanner)
-def get_featured_hero_banner(db: Session = Depends(get_db)):
+async def get_featured_hero_banner(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db)
+):
     """Get the main featured hero banner for homepage"""
-    hero_banner = PublicHeroBannerService.get_featured_banner(db)
+    not_modified = await check_collection_async(
+        request, response, db, HeroBanner, PublicHeroBannerService.active_banners_criteria()
+    )
+    if not_modified:
+        return not_modified
+    hero_banner = await AsyncPublicHeroBannerService.get_featured_banner(db)
     if not hero_banner:
         raise HTTPException(status_code=404, detail="No featured banner available")
     return hero_banner
 
 # Team - Public endpoints
 @router.get("/team", response_model=List[team_schemas.TeamMember])
-def get_team_members(
+async def get_team_members(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get active team members for public display"""
-    team_members = PublicTeamService.get_active_members(db, skip=skip, limit=limit)
-    return team_members
+    not_modified = await check_collection_async(
+        request, response, db, TeamMember, PublicTeamService.active_members_criteria()
+    )
+    if not_modified:
+        return not_modified
+    team_members = await AsyncPublicTeamService.get_active_members(db, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, PublicTeamService.active_members_keyset().next_cursor(team_members, limit))
+    return model_response(List[team_schemas.TeamMember], team_members, response)
 
 @router.get("/team/{member_id}", response_model=team_schemas.TeamMember)
-def get_public_team_member(
+async def get_public_team_member(
+    request: Request,
+    response: Response,
     member_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get a specific team member by ID - only if active"""
-    team_member = PublicTeamService.get_member_by_id(db, member_id)
+    not_modified = await check_item_async(
+        request, response, db, TeamMember, PublicTeamService.member_by_id_criteria(member_id)
+    )
+    if not_modified:
+        return not_modified
+    team_member = await AsyncPublicTeamService.get_member_by_id(db, member_id)
     if not team_member:
         raise HTTPException(status_code=404, detail="Team member not found")
     return team_member
 
 @router.get("/team/department/{department}", response_model=List[team_schemas.TeamMember])
-def get_team_by_department(
+async def get_team_by_department(
+    request: Request,
+    response: Response,
     department: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get active team members by department"""
-    team_members = PublicTeamService.get_members_by_department(db, department, skip=skip, limit=limit)
-    return team_members
+    not_modified = await check_collection_async(
+        request, response, db, TeamMember, PublicTeamService.department_criteria(department)
+    )
+    if not_modified:
+        return not_modified
+    team_members = await AsyncPublicTeamService.get_members_by_department(
+        db, department, skip=skip, limit=limit, cursor=cursor
+    )
+    set_next_cursor(response, PublicTeamService.department_keyset().next_cursor(team_members, limit))
+    return model_response(List[team_schemas.TeamMember], team_members, response)
 
 # Company - Public endpoints
 @router.get("/company", response_model=company_schemas.Company)
-def get_public_company_info(db: Session = Depends(get_db)):
+async def get_public_company_info(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db)
+):
     """Get company information for public website"""
-    company = crud.company.get_company_info(db)
+    not_modified = await check_collection_async(
+        request, response, db, Company, []
+    )
+    if not_modified:
+        return not_modified
+    company = await AsyncPublicCompanyService.get_company_info(db)
     if not company:
         raise HTTPException(status_code=404, detail="Company information not found")
     return company
 
 # Products - Public endpoints
 @router.get("/products", response_model=List[product_schemas.Product])
-def get_public_products(
+async def get_public_products(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
     category: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get published products for public website"""
-    if category:
-        products = PublicProductService.get_products_by_category(db, category=category, skip=skip, limit=limit)
-    else:
-        products = PublicProductService.get_active_products(db, skip=skip, limit=limit)
-    return products
+    not_modified = await check_collection_async(
+        request, response, db, Product, PublicProductService.active_products_criteria(category)
+    )
+    if not_modified:
+        return not_modified
+    products = await AsyncPublicProductService.get_active_products(
+        db, category=category, skip=skip, limit=limit, cursor=cursor
+    )
+    set_next_cursor(response, PublicProductService.active_products_keyset().next_cursor(products, limit))
+    return model_response(List[product_schemas.Product], products, response)
 
 @router.get("/products/{product_id}", response_model=product_schemas.Product)
-def get_public_product(
+async def get_public_product(
+    request: Request,
+    response: Response,
     product_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get a specific product by ID"""
-    product = PublicProductService.get_product_by_id(db, product_id)
+    not_modified = await check_item_async(
+        request, response, db, Product, PublicProductService.product_by_id_criteria(product_id)
+    )
+    if not_modified:
+        return not_modified
+    product = await AsyncPublicProductService.get_product_by_id(db, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
 
 @router.get("/products/featured", response_model=List[product_schemas.Product])
-def get_featured_products(
+async def get_featured_products(
+    request: Request,
+    response: Response,
     limit: int = Query(6, ge=1, le=50),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get featured products for homepage"""
-    products = PublicProductService.get_featured_products(db, limit=limit)
-    return products
+    not_modified = await check_collection_async(
+        request, response, db, Product, PublicProductService.featured_products_criteria()
+    )
+    if not_modified:
+        return not_modified
+    products = await AsyncPublicProductService.get_featured_products(db, limit=limit)
+    return model_response(List[product_schemas.Product], products, response)
 
 # Services - Public endpoints
 @router.get("/services", response_model=List[service_schemas.ServiceResponse])
-def get_public_services(
+async def get_public_services(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
     category: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get published services for public website"""
-    if category:
-        services = PublicServiceService.get_services_by_category(db, category=category, skip=skip, limit=limit)
-    else:
-        services = PublicServiceService.get_published_services(db, skip=skip, limit=limit)
-    return services
+    not_modified = await check_collection_async(
+        request, response, db, Service, PublicServiceService.published_services_criteria(category)
+    )
+    if not_modified:
+        return not_modified
+    services = await AsyncPublicServiceService.get_published_services(
+        db, category=category, skip=skip, limit=limit, cursor=cursor
+    )
+    set_next_cursor(response, PublicServiceService.published_services_keyset().next_cursor(services, limit))
+    return model_response(List[service_schemas.ServiceResponse], services, response)
 
 @router.get("/services/{service_id}", response_model=service_schemas.ServiceResponse)
-def get_public_service(
+async def get_public_service(
+    request: Request,
+    response: Response,
     service_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get a specific service by ID"""
-    service = PublicServiceService.get_service_by_id(db, service_id)
+    not_modified = await check_item_async(
+        request, response, db, Service, PublicServiceService.service_by_id_criteria(service_id)
+    )
+    if not_modified:
+        return not_modified
+    service = await AsyncPublicServiceService.get_service_by_id(db, service_id)
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
     return service
 
 @router.get("/services/featured", response_model=List[service_schemas.ServiceResponse])
-def get_featured_services(
+async def get_featured_services(
+    request: Request,
+    response: Response,
     limit: int = Query(6, ge=1, le=50),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get featured services for homepage"""
-    services = PublicServiceService.get_featured_services(db, limit=limit)
-    return services
+    not_modified = await check_collection_async(
+        request, response, db, Service, PublicServiceService.featured_services_criteria()
+    )
+    if not_modified:
+        return not_modified
+    services = await AsyncPublicServiceService.get_featured_services(db, limit=limit)
+    return model_response(List[service_schemas.ServiceResponse], services, response)
 
 # News - Public endpoints
 @router.get("/news", response_model=List[news_schemas.NewsResponse])
-def get_public_news(
+async def get_public_news(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
     category: Optional[str] = None,
-    db: Session = Depends(get_db)
+    tags: Optional[List[str]] = Query(None, description="Only articles with these tags (repeat the parameter)"),
+    tag_match: str = Query("any", regex="^(any|all)$", description="Match any or all of the tags"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get published news articles for public website"""
-    news_items = PublicNewsService.get_published_news(db, skip=skip, limit=limit, category=category)
-    return news_items
+    match_all_tags = tag_match == "all"
+    not_modified = await check_collection_async(
+        request, response, db, News, PublicNewsService.published_news_criteria(category, tags, match_all_tags)
+    )
+    if not_modified:
+        return not_modified
+    news_items = await AsyncPublicNewsService.get_published_news(
+        db, skip=skip, limit=limit, category=category, cursor=cursor, tags=tags, match_all_tags=match_all_tags
+    )
+    set_next_cursor(response, PublicNewsService.published_news_keyset().next_cursor(news_items, limit))
+    return model_response(List[news_schemas.NewsResponse], news_items, response)
+
+@router.get("/news/trending", response_model=List[news_schemas.NewsResponse])
+async def get_trending_news(
+    response: Response,
+    limit: int = Query(10, ge=1, le=50),
+    category: Optional[str] = Query(None),
+    hours: int = Query(settings.trending_window_hours, ge=1, le=settings.views_hourly_retention_hours),
+    half_life_hours: float = Query(settings.trending_half_life_hours, ge=0, description="0 ranks by plain view counts"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Most viewed news of the last ``hours`` hours, recent views weighted more"""
+    news_items = await AsyncPublicNewsService.get_trending_news(
+        db, window_hours=hours, half_life_hours=half_life_hours, limit=limit, category=category
+    )
+    return model_response(List[news_schemas.NewsResponse], news_items, response)
 
 @router.get("/news/{news_id}", response_model=news_schemas.NewsResponse)
-def get_public_news_item(
+async def get_public_news_item(
+    request: Request,
+    response: Response,
     news_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get a specific news article by ID"""
-    news_item = PublicNewsService.get_news_by_id(db, news_id)
+    not_modified = await check_item_async(
+        request, response, db, News, PublicNewsService.news_by_id_criteria(news_id)
+    )
+    if not_modified:
+        return not_modified
+    news_item = await AsyncPublicNewsService.get_news_by_id(db, news_id)
     if not news_item:
         raise HTTPException(status_code=404, detail="News article not found")
     return news_item
 
+@router.post("/news/{news_id}/view", status_code=204, response_class=Response)
+async def record_news_view(news_id: int, db: AsyncSession = Depends(get_async_read_db)):
+    """Count a view of a published news article or announcement; buffered and written in the background"""
+    # Drafts have no public page, so their counts must not feed trending or the view history
+    if not await AsyncPublicNewsService.is_viewable(db, news_id):
+        raise HTTPException(status_code=404, detail="News article not found")
+    view_counter.record(news_id)
+    return Response(status_code=204)
+
 @router.get("/news/latest", response_model=List[news_schemas.NewsResponse])
-def get_latest_news(
+async def get_latest_news(
+    request: Request,
+    response: Response,
     limit: int = Query(5, ge=1, le=20),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get latest news articles for homepage"""
-    news_items = PublicNewsService.get_latest_news(db, limit=limit)
-    return news_items
+    not_modified = await check_collection_async(
+        request, response, db, News, PublicNewsService.published_news_criteria()
+    )
+    if not_modified:
+        return not_modified
+    news_items = await AsyncPublicNewsService.get_latest_news(db, limit=limit)
+    return model_response(List[news_schemas.NewsResponse], news_items, response)
 
 @router.get("/news/featured", response_model=List[news_schemas.NewsResponse])
-def get_featured_news(
+async def get_featured_news(
+    request: Request,
+    response: Response,
     limit: int = Query(3, ge=1, le=10),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get featured news articles for homepage"""
-    news_items = PublicNewsService.get_featured_news(db, limit=limit)
-    return news_items
+    not_modified = await check_collection_async(
+        request, response, db, News, PublicNewsService.featured_news_criteria()
+    )
+    if not_modified:
+        return not_modified
+    news_items = await AsyncPublicNewsService.get_featured_news(db, limit=limit)
+    return model_response(List[news_schemas.NewsResponse], news_items, response)
+
+# Tags - Public endpoints
+@router.get("/tags", response_model=List[tag_schemas.TagCloudEntry])
+async def get_tag_cloud(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Tag cloud of published news, from counts maintained on write"""
+    tags = await AsyncPublicNewsService.get_tag_cloud(db, limit=limit)
+    return model_response(
+        List[tag_schemas.TagCloudEntry],
+        [{"name": tag.name, "slug": tag.slug, "count": tag.published_count} for tag in tags],
+        response
+    )
 
 # Announcements - Public endpoints
 @router.get("/announcements", response_model=List[news_schemas.NewsResponse])
-def get_public_announcements(
+async def get_public_announcements(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get published announcements for public website"""
-    announcements = PublicNewsService.get_announcements(db, skip=skip, limit=limit, include_expired=False)
-    return announcements
+    not_modified = await check_collection_async(
+        request, response, db, News, PublicNewsService.announcements_criteria(include_expired=False)
+    )
+    if not_modified:
+        return not_modified
+    announcements = await AsyncPublicNewsService.get_announcements(
+        db, skip=skip, limit=limit, include_expired=False, cursor=cursor
+    )
+    set_next_cursor(response, PublicNewsService.announcements_keyset().next_cursor(announcements, limit))
+    return model_response(List[news_schemas.NewsResponse], announcements, response)
 
 @router.get("/announcements/{announcement_id}", response_model=news_schemas.NewsResponse)
-def get_public_announcement(
+async def get_public_announcement(
+    request: Request,
+    response: Response,
     announcement_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get a specific announcement by ID"""
-    announcement = PublicNewsService.get_announcement_by_id(db, announcement_id)
+    not_modified = await check_item_async(
+        request, response, db, News, PublicNewsService.announcement_by_id_criteria(announcement_id)
+    )
+    if not_modified:
+        return not_modified
+    announcement = await AsyncPublicNewsService.get_announcement_by_id(db, announcement_id)
     if not announcement:
         raise HTTPException(status_code=404, detail="Announcement not found")
     return announcement
 
 @router.get("/announcements/recent", response_model=List[news_schemas.NewsResponse])
-def get_recent_announcements(
+async def get_recent_announcements(
+    request: Request,
+    response: Response,
     limit: int = Query(5, ge=1, le=20),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get recent announcements for homepage banner"""
-    announcements = PublicNewsService.get_announcements(db, skip=0, limit=limit, include_expired=False)
-    return announcements
+    not_modified = await check_collection_async(
+        request, response, db, News, PublicNewsService.announcements_criteria(include_expired=False)
+    )
+    if not_modified:
+        return not_modified
+    announcements = await AsyncPublicNewsService.get_announcements(db, skip=0, limit=limit, include_expired=False)
+    return model_response(List[news_schemas.NewsResponse], announcements, response)
 
 # Contact form submission - Public endpoint
 @router.post("/contact", response_model=contact_schemas.Contact)
@@ -255,13 +500,15 @@ def submit_contact_form(
 
 # Search endpoints
 @router.get("/search")
+@compression()
 def public_search(
     q: str = Query(..., min_length=1),
     content_type: str = Query("all", regex="^(all|news|products|services)$"),
+    skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Search across all public content"""
     return PublicSearchService.search_all_content(
-        db, query=q, content_type=content_type, limit=limit
+        db, query=q, content_type=content_type, limit=limit, skip=skip
     )
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 from app.api import auth, products, hero_banners, company, team, users, services, news, contacts
-from app.api import public
+from app.api import public, metrics
 
 api_router = APIRouter()
 
@@ -21,3 +21,6 @@ api_router.include_router(contacts.router, prefix="/contacts", tags=["contacts"]
 
 # Public API routes (no authentication required)
 api_router.include_router(public.router, prefix="/public", tags=["public"])  # type: ignore
+
+# Operational metrics (admin only)
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
@@ -1,16 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Form
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional, Dict, Any
 import json
 import math
 from decimal import Decimal
 
-from app.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, get_async_db
+from app.core.pagination import CountMode
+from app.core.serialization import FastJSONResponse
 from app.api.deps import get_current_user
 from app.models.user import User
 from app.models.service import Service
-from app.crud.service import service_crud
-from app.schemas.service import ServiceCreate, ServiceUpdate
+from app.crud.service import service_crud, async_service_crud
+from app.schemas.service import ServiceCreate, ServiceUpdate, ServiceResponse, ServiceReorderRequest
 from app.utils.file_upload import save_uploaded_image, delete_image_file
 
 router = APIRouter()
@@ -24,55 +28,54 @@ async def get_services(
     category: Optional[str] = Query(None),
     is_active: Optional[bool] = Query(None),
     is_featured: Optional[bool] = Query(None),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Cursor from next_cursor of the previous page"),
+    count: CountMode = Query(CountMode.WINDOW, description="How to compute the total: window, exact, estimated or none"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all services with filters and pagination"""
-    # Get services with filters
-    services = service_crud.get_multi_with_filters(
-        db=db,
+    # Get services and their total count without blocking the event loop
+    result = await db.run_sync(
+        service_crud.get_page_with_filters,
         skip=skip,
         limit=limit,
+        cursor=cursor,
+        count_mode=count,
         search=search,
         category=category,
         is_active=is_active,
         is_featured=is_featured
     )
+    total = result.total
     
-    # Get total count
-    total = service_crud.get_count_with_filters(
-        db=db,
-        search=search,
-        category=category,
-        is_active=is_active,
-        is_featured=is_featured
-    )
-    
-    return {
-        "services": services,
+    # Rows are encoded directly, skipping the jsonable_encoder pass
+    return FastJSONResponse({
+        "services": result.items,
         "total": total,
         "page": skip // limit + 1,
         "size": limit,
-        "pages": math.ceil(total / limit) if total > 0 else 0
-    }
+        "pages": (math.ceil(total / limit) if total > 0 else 0) if total is not None else None,
+        "next_cursor": result.next_cursor,
+        "total_is_estimate": result.total_is_estimate
+    })
 
 
 @router.get("/featured")
 async def get_featured_services(
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get featured services"""
-    services = service_crud.get_featured(db=db, limit=limit)
-    return services
+    services = await db.run_sync(service_crud.get_featured, limit=limit)
+    return FastJSONResponse(services)
 
 
 @router.get("/{service_id}")
 async def get_service(
     service_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific service"""
-    service = service_crud.get(db=db, id=service_id)
+    service = await async_service_crud.get(db=db, id=service_id)
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
     return service
@@ -185,6 +188,21 @@ async def create_service_with_image(
     return service
 
 
+@router.post("/reorder", response_model=List[ServiceResponse])
+def reorder_services(
+    reorder_data: ServiceReorderRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Set service order positions so services list in the given id order"""
+    if not getattr(current_user, 'is_superuser', False) and getattr(current_user, 'role', '') != "admin":
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    services = service_crud.reorder_services(db=db, service_ids=reorder_data.service_ids)
+    if services is None:
+        raise HTTPException(status_code=400, detail="service_ids must not contain duplicates")
+    return services
+
+
 @router.put("/{service_id}")
 async def update_service(
     service_id: int,
@@ -236,7 +254,7 @@ async def update_service(
         # Delete old image if exists
         image_url = getattr(service, 'image_url', None)
         if image_url:
-            delete_image_file(image_url)
+            await run_in_threadpool(delete_image_file, image_url)
         
         # Upload new image
         image_path = await save_uploaded_image(image, subfolder="services")
@@ -268,14 +286,15 @@ async def delete_service(
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
     
-    # Delete image if exists
     image_url = getattr(service, 'image_url', None)
-    if image_url:
-        delete_image_file(image_url)
     
     # Delete service (use remove method from the base class)
     service_crud.remove(db=db, id=service_id)
     
+    # Delete image if exists, now that no row points at it
+    if image_url:
+        await run_in_threadpool(delete_image_file, image_url)
+    
     return {"message": "Service deleted successfully"}
 
 
@@ -299,7 +318,7 @@ async def update_service_image(
     # Delete old image if exists
     image_url = getattr(service, 'image_url', None)
     if image_url:
-        delete_image_file(image_url)
+        await run_in_threadpool(delete_image_file, image_url)
     
     # Upload new image
     image_path = await save_uploaded_image(image, subfolder="services")
@@ -329,7 +348,7 @@ async def delete_service_image(
     # Delete image if exists
     image_url = getattr(service, 'image_url', None)
     if image_url:
-        delete_image_file(image_url)
+        await run_in_threadpool(delete_image_file, image_url)
     
     # Update service to remove image URL
     updated_service = service_crud.update_image(db=db, service_id=service_id, image_url=None)
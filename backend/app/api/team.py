@@ -1,6 +1,7 @@
 from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.core.database import get_db
 from app.api.deps import get_current_admin_user
 from app.crud.team import team_member
@@ -177,7 +178,7 @@ async def update_team_member_with_image(
     if image and image.filename:
         # Delete old image if exists
         if existing_member.image_url is not None:
-            delete_image_file(str(existing_member.image_url))
+            await run_in_threadpool(delete_image_file, str(existing_member.image_url))
         
         image_filename = await save_uploaded_image(image, "team")
         member_data["image_url"] = f"/static/{image_filename}"
@@ -208,7 +209,7 @@ async def delete_team_member_image(
         )
     
     if member.image_url is not None:
-        delete_image_file(str(member.image_url))
+        await run_in_threadpool(delete_image_file, str(member.image_url))
         team_member.update(db=db, db_obj=member, obj_in={"image_url": None})
     
     return {"message": "Image deleted successfully"}
@@ -231,11 +232,12 @@ def delete_team_member(
             detail="Team member not found"
         )
     
-    # Delete associated image if exists
-    if member.image_url is not None:
-        delete_image_file(str(member.image_url))
-    
+    image_url = member.image_url
     team_member.remove(db=db, id=member_id)
+    
+    # Delete associated image if exists, now that the member is gone
+    if image_url is not None:
+        delete_image_file(str(image_url))
     return {"message": "Team member deleted successfully"}
 
 
@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app.core.database import get_db
+from app.core.compression import compression
 from app.api.deps import get_current_user
 from app.crud.user import user_crud
 from app.schemas.user import UserCreate, UserResponse, UserUpdate
@@ -12,6 +13,7 @@ router = APIRouter()
 
 
 @router.get("/", response_model=List[UserResponse])
+@compression()
 def get_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
@@ -70,17 +72,7 @@ def get_user_stats(
             detail="Not enough permissions"
         )
     
-    total_users = db.query(User).count()
-    active_users = db.query(User).filter(User.is_active == True).count()
-    inactive_users = db.query(User).filter(User.is_active == False).count()
-    admin_users = db.query(User).filter(User.role == "admin").count()
-    
-    return {
-        "total_users": total_users,
-        "active_users": active_users,
-        "inactive_users": inactive_users,
-        "admin_users": admin_users
-    }
+    return user_crud.get_stats(db)
 
 
 @router.post("/", response_model=UserResponse)
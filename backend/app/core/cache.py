@@ -0,0 +1,376 @@
+"""
+Response cache for public read endpoints.
+
+Entries are keyed by route and query parameters and tagged with the tables
+they were built from. Each tag carries a generation counter that is bumped
+whenever a committed transaction touches that table, so stale entries are
+never served and simply age out of the backend.
+
+The backend also remembers when each tag was last bumped. A response read
+from a replica that may still lag that write (``request.state.replica_max_lag``,
+set by the read-session dependencies) is not stored, so another worker
+cannot fill the fresh generation with data from before the write.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.conditional import is_not_modified, parse_http_date
+from app.core.config import settings
+
+# Response headers replayed from the cache; anything per-client (set-cookie) is never stored
+CACHED_HEADERS = ("etag", "last-modified", "cache-control", "vary", "content-encoding", "x-next-cursor")
+
+
+@dataclass
+class CachedResponse:
+    status_code: int
+    body: bytes
+    media_type: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    def dumps(self) -> str:
+        return json.dumps({
+            "status_code": self.status_code,
+            "body": self.body.decode("utf-8"),
+            "media_type": self.media_type,
+            "headers": self.headers,
+        })
+
+    @classmethod
+    def loads(cls, raw: str) -> "CachedResponse":
+        data = json.loads(raw)
+        return cls(
+            status_code=data["status_code"],
+            body=data["body"].encode("utf-8"),
+            media_type=data.get("media_type"),
+            headers=data.get("headers") or {},
+        )
+
+
+class CacheBackend:
+    """Storage interface used by ResponseCache"""
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: CachedResponse, ttl: int) -> None:
+        raise NotImplementedError
+
+    def get_generations(self, tags: Sequence[str]) -> List[int]:
+        raise NotImplementedError
+
+    def bump_generation(self, tag: str) -> None:
+        """Advance the tag's generation and record when it happened"""
+        raise NotImplementedError
+
+    def get_invalidated_at(self, tags: Sequence[str]) -> List[float]:
+        """Wall-clock time of each tag's last bump, 0 if never bumped"""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def size(self) -> int:
+        raise NotImplementedError
+
+
+class LRUCacheBackend(CacheBackend):
+    """In-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, CachedResponse]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._invalidated_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: CachedResponse, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_generations(self, tags: Sequence[str]) -> List[int]:
+        with self._lock:
+            return [self._generations.get(tag, 0) for tag in tags]
+
+    def bump_generation(self, tag: str) -> None:
+        with self._lock:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+            self._invalidated_at[tag] = time.time()
+
+    def get_invalidated_at(self, tags: Sequence[str]) -> List[float]:
+        with self._lock:
+            return [self._invalidated_at.get(tag, 0.0) for tag in tags]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Shared cache backend so all workers see the same entries and invalidations"""
+
+    def __init__(self, url: str, prefix: str = "cms:cache:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("cache_backend 'redis' requires the 'redis' package to be installed")
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        raw = self._client.get(self.prefix + key)
+        if raw is None:
+            return None
+        return CachedResponse.loads(raw.decode("utf-8"))
+
+    def set(self, key: str, value: CachedResponse, ttl: int) -> None:
+        self._client.set(self.prefix + key, value.dumps(), ex=ttl)
+
+    def get_generations(self, tags: Sequence[str]) -> List[int]:
+        if not tags:
+            return []
+        values = self._client.mget([f"{self.prefix}gen:{tag}" for tag in tags])
+        return [int(value) if value is not None else 0 for value in values]
+
+    def bump_generation(self, tag: str) -> None:
+        pipeline = self._client.pipeline()
+        pipeline.incr(f"{self.prefix}gen:{tag}")
+        pipeline.set(f"{self.prefix}gen:{tag}:at", time.time())
+        pipeline.execute()
+
+    def get_invalidated_at(self, tags: Sequence[str]) -> List[float]:
+        if not tags:
+            return []
+        values = self._client.mget([f"{self.prefix}gen:{tag}:at" for tag in tags])
+        return [float(value) if value is not None else 0.0 for value in values]
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter(match=f"{self.prefix}*"):
+            if b":gen:" not in key:
+                self._client.delete(key)
+
+    def size(self) -> int:
+        return sum(
+            1 for key in self._client.scan_iter(match=f"{self.prefix}*")
+            if b":gen:" not in key
+        )
+
+
+class ResponseCache:
+    """Tag-invalidated response cache with hit/miss accounting"""
+
+    def __init__(self, backend: CacheBackend, ttl: int = 300, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.stale_skips = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def build_key(self, path: str, params: Iterable[Tuple[str, str]], tags: Sequence[str]) -> str:
+        """Build a cache key from the route, its query params and the current tag generations"""
+        query = "&".join(f"{name}={value}" for name, value in sorted(params))
+        generations = self.backend.get_generations(tags)
+        stamp = ",".join(f"{tag}:{gen}" for tag, gen in zip(tags, generations))
+        return f"{path}?{query}|{stamp}"
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: CachedResponse) -> None:
+        self.backend.set(key, value, self.ttl)
+        with self._lock:
+            self.stores += 1
+
+    def invalidated_within(self, tags: Sequence[str], seconds: float) -> bool:
+        """Whether any of the tables was written in the last ``seconds``, by any worker"""
+        cutoff = time.time() - seconds
+        return any(at > cutoff for at in self.backend.get_invalidated_at(tags))
+
+    def skip_stale(self) -> None:
+        with self._lock:
+            self.stale_skips += 1
+
+    def invalidate(self, *tags: str) -> None:
+        """Invalidate every entry built from any of the given tables"""
+        for tag in tags:
+            self.backend.bump_generation(tag)
+        with self._lock:
+            self.invalidations += len(tags)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "ttl_seconds": self.ttl,
+            "max_entries": getattr(self.backend, "max_entries", None),
+            "size": self.backend.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "stale_skips": self.stale_skips,
+            "evictions": getattr(self.backend, "evictions", 0),
+            "expirations": getattr(self.backend, "expirations", 0),
+            "invalidations": self.invalidations,
+        }
+
+
+def _create_backend() -> CacheBackend:
+    if settings.cache_backend == "redis":
+        if not settings.cache_redis_url:
+            raise RuntimeError("cache_redis_url must be set when cache_backend is 'redis'")
+        return RedisCacheBackend(settings.cache_redis_url)
+    return LRUCacheBackend(max_entries=settings.cache_max_entries)
+
+
+response_cache = ResponseCache(
+    _create_backend(),
+    ttl=settings.cache_ttl_seconds,
+    enabled=settings.cache_enabled
+)
+
+
+class CachedRoute(APIRoute):
+    """
+    Route class that serves GET responses from the response cache.
+    Subclasses map the first matching path segment to the tables it reads.
+    """
+    cache_tags: Dict[str, List[str]] = {}
+
+    def _tags_for_path(self) -> List[str]:
+        for segment in self.path.strip("/").split("/"):
+            if segment in self.cache_tags:
+                return self.cache_tags[segment]
+        return []
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        tags = self._tags_for_path()
+        if not tags:
+            return handler
+
+        async def cached_handler(request: Request) -> Response:
+            if request.method != "GET" or not response_cache.enabled:
+                return await handler(request)
+
+            key = response_cache.build_key(request.url.path, request.query_params.multi_items(), tags)
+            cached = response_cache.get(key)
+            if cached is not None:
+                etag = cached.headers.get("etag")
+                last_modified = parse_http_date(cached.headers.get("last-modified"))
+                if etag and is_not_modified(request, etag, last_modified):
+                    headers = {
+                        name: value for name, value in cached.headers.items()
+                        if name in ("etag", "last-modified", "cache-control")
+                    }
+                    return Response(status_code=304, headers={**headers, "X-Cache": "HIT"})
+                return Response(
+                    content=cached.body,
+                    status_code=cached.status_code,
+                    media_type=cached.media_type,
+                    headers={**cached.headers, "X-Cache": "HIT"},
+                )
+
+            response = await handler(request)
+            replica_max_lag = getattr(request.state, "replica_max_lag", None)
+            if replica_max_lag and response_cache.invalidated_within(tags, replica_max_lag):
+                # Read from a replica that may not have the latest write yet
+                response_cache.skip_stale()
+            elif response.status_code == 200 and getattr(response, "body", None) is not None:
+                headers = {
+                    name: value for name, value in response.headers.items()
+                    if name in CACHED_HEADERS
+                }
+                response_cache.set(key, CachedResponse(
+                    status_code=response.status_code,
+                    body=bytes(response.body),
+                    media_type=response.media_type,
+                    headers=headers,
+                ))
+            response.headers["X-Cache"] = "MISS"
+            return response
+
+        return cached_handler
+
+
+# Write-through invalidation: remember which tables a transaction touched and
+# bump their generations once it commits.
+
+def _pending_tables(session: Session) -> set:
+    return session.info.setdefault("cache_invalidate", set())
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session, flush_context):
+    tables = _pending_tables(session)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            tables.add(table.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_tables(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            _pending_tables(orm_execute_state.session).add(mapper.local_table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_tables(session):
+    tables = session.info.pop("cache_invalidate", None)
+    if tables:
+        response_cache.invalidate(*sorted(tables))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_tables(session):
+    session.info.pop("cache_invalidate", None)
@@ -0,0 +1,294 @@
+"""
+Response compression.
+
+Compressible responses (JSON, text, ...) of at least ``compression_minimum_size``
+bytes are encoded with brotli or gzip, preferring brotli when the client
+accepts it and the ``brotli`` package is installed. Bodies up to
+``compression_stream_threshold`` are compressed in one piece and keep a
+``Content-Length``; larger or unknown-length bodies are compressed chunk by
+chunk as they pass through, so they are never buffered. The CPU time spent
+compressing is recorded per route and encoding next to the bytes saved.
+
+``compression_enabled`` is the default for every route; an endpoint decorated
+with ``@compression(...)`` overrides it. The policy lives on the endpoint
+function, so it also applies to responses served from the response cache.
+"""
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.pool import Timings
+from app.core.static_files import accepts
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+}
+
+
+@dataclass(frozen=True)
+class CompressionPolicy:
+    enabled: bool = True
+    minimum_size: Optional[int] = None
+
+
+def compression(enabled: bool = True, minimum_size: Optional[int] = None) -> Callable[[Callable], Callable]:
+    """Endpoint decorator overriding the compression default for that route"""
+    policy = CompressionPolicy(enabled=enabled, minimum_size=minimum_size)
+
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.compression_policy = policy
+        return endpoint
+
+    return decorator
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";")[0].strip().lower()
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES or media_type.endswith("+json")
+
+
+def _brotli() -> Any:
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+class GzipEncoder:
+    def __init__(self, level: int):
+        # wbits=31 writes the gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, quality: int):
+        self._compressor = _brotli().Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionStats:
+    """Bytes in/out and compression CPU time per route and encoding"""
+
+    SKIP_REASONS = ("not_accepted", "policy", "not_compressible", "already_encoded", "below_threshold")
+
+    def __init__(self):
+        self.skipped = dict.fromkeys(self.SKIP_REASONS, 0)
+        self._routes: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def skip(self, reason: str) -> None:
+        with self._lock:
+            self.skipped[reason] += 1
+
+    def record(self, route: str, encoding: str, bytes_in: int, bytes_out: int, cpu_seconds: float) -> None:
+        with self._lock:
+            entry = self._routes.setdefault(route, {}).setdefault(
+                encoding, {"bytes_in": 0, "bytes_out": 0, "cpu": Timings()}
+            )
+            entry["bytes_in"] += bytes_in
+            entry["bytes_out"] += bytes_out
+            entry["cpu"].add(cpu_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            routes: Dict[str, Dict[str, Any]] = {}
+            bytes_in = bytes_out = 0
+            cpu_seconds = 0.0
+            for route, encodings in sorted(self._routes.items()):
+                for encoding, entry in encodings.items():
+                    bytes_in += entry["bytes_in"]
+                    bytes_out += entry["bytes_out"]
+                    cpu_seconds += entry["cpu"].total
+                    routes.setdefault(route, {})[encoding] = {
+                        "bytes_in": entry["bytes_in"],
+                        "bytes_out": entry["bytes_out"],
+                        "ratio": round(entry["bytes_out"] / entry["bytes_in"], 4) if entry["bytes_in"] else 0.0,
+                        "cpu": entry["cpu"].summary(),
+                    }
+            return {
+                "totals": {
+                    "bytes_in": bytes_in,
+                    "bytes_out": bytes_out,
+                    "saved_bytes": bytes_in - bytes_out,
+                    "ratio": round(bytes_out / bytes_in, 4) if bytes_in else 0.0,
+                    "cpu_ms": round(cpu_seconds * 1000, 3),
+                },
+                "skipped": dict(self.skipped),
+                "routes": routes,
+            }
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with brotli or gzip"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        enabled: bool = True,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        exclude_paths: Sequence[str] = (),
+        stream_threshold: int = 1048576,
+        stats: Optional[CompressionStats] = None
+    ):
+        self.app = app
+        self.enabled = enabled
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.exclude_paths = tuple(exclude_paths)
+        self.stream_threshold = stream_threshold
+        self.stats = stats or CompressionStats()
+        self.encodings: List[str] = (["br"] if _brotli() is not None else []) + ["gzip"]
+
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        for encoding in self.encodings:
+            if accepts(accept_encoding, encoding):
+                return encoding
+        return None
+
+    def encoder(self, encoding: str) -> Any:
+        if encoding == "br":
+            return BrotliEncoder(self.brotli_quality)
+        return GzipEncoder(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        encoding = self.negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            self.stats.skip("not_accepted")
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, CompressingSender(self, scope, send, encoding).send)
+
+
+class CompressingSender:
+    """Per-response send wrapper that decides on the first body message"""
+
+    def __init__(self, middleware: CompressionMiddleware, scope: Scope, send: Send, encoding: str):
+        self.middleware = middleware
+        self.scope = scope
+        self._send = send
+        self.encoding = encoding
+        self.start_message: Optional[Message] = None
+        self.encoder: Any = None
+        self.passthrough = False
+        self.streaming = False
+        self.buffer: List[bytes] = []
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    def _route(self) -> str:
+        endpoint = self.scope.get("endpoint")
+        return getattr(endpoint, "__name__", None) or "unrouted"
+
+    def _policy(self) -> CompressionPolicy:
+        policy = getattr(self.scope.get("endpoint"), "compression_policy", None)
+        return policy or CompressionPolicy(enabled=self.middleware.enabled)
+
+    def _skip_reason(self, headers: Headers, body: bytes, more_body: bool) -> Optional[str]:
+        policy = self._policy()
+        if not policy.enabled:
+            return "policy"
+        if self.start_message["status"] < 200 or self.start_message["status"] in (204, 206, 304):
+            return "not_compressible"
+        if not is_compressible(headers.get("content-type", "")):
+            return "not_compressible"
+        if "content-encoding" in headers:
+            return "already_encoded"
+        minimum_size = self.middleware.minimum_size if policy.minimum_size is None else policy.minimum_size
+        size = len(body) if not more_body else int(headers.get("content-length", minimum_size))
+        if size < minimum_size:
+            return "below_threshold"
+        return None
+
+    def _compress(self, data: bytes, finish: bool) -> bytes:
+        started = time.thread_time()
+        output = self.encoder.compress(data) if data else b""
+        if finish:
+            output += self.encoder.finish()
+        self.cpu_seconds += time.thread_time() - started
+        self.bytes_in += len(data)
+        self.bytes_out += len(output)
+        return output
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.encoder is None:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            reason = self._skip_reason(headers, body, more_body)
+            if reason is not None:
+                self.middleware.stats.skip(reason)
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            self.encoder = self.middleware.encoder(self.encoding)
+            headers["content-encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # The encoded body is a different byte sequence
+                headers["etag"] = f"W/{etag}"
+            length = headers.get("content-length")
+            if more_body and (length is None or int(length) > self.middleware.stream_threshold):
+                # Large or unknown length: compress as the body streams through
+                self.streaming = True
+                del headers["content-length"]
+                await self._send(self.start_message)
+
+        if self.streaming:
+            body = self._compress(body, finish=not more_body)
+            if body or not more_body:
+                await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+        else:
+            # Small enough to collect, so the compressed body keeps a Content-Length
+            self.buffer.append(body)
+            if more_body:
+                return
+            body = self._compress(b"".join(self.buffer), finish=True)
+            self.buffer = []
+            MutableHeaders(raw=self.start_message["headers"])["content-length"] = str(len(body))
+            await self._send(self.start_message)
+            await self._send({"type": "http.response.body", "body": body, "more_body": False})
+
+        if not more_body:
+            self.middleware.stats.record(
+                self._route(), self.encoding, self.bytes_in, self.bytes_out, self.cpu_seconds
+            )
+
+
+compression_stats = CompressionStats()
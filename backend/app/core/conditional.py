@@ -0,0 +1,168 @@
+"""
+Conditional GET support (ETag / Last-Modified) for public content endpoints.
+
+Validators are computed with a single aggregate query over the same filters
+the endpoint uses, so a 304 never loads ORM rows. Note that SQLite stamps
+rows with second precision, so two writes within the same second share a
+version there; PostgreSQL timestamps are microsecond precise and the ETag
+keeps that precision. Last-Modified and If-Modified-Since only carry whole
+seconds, so those are compared at second precision.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional, Sequence, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+CACHE_CONTROL = "no-cache"
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _to_second(value: datetime) -> datetime:
+    """HTTP dates have whole-second precision"""
+    return _as_utc(value).replace(microsecond=0)
+
+
+def _make_etag(*parts: Any) -> str:
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _version_column(model):
+    """Rows are only stamped with updated_at after their first update"""
+    return func.coalesce(model.updated_at, model.created_at)
+
+
+def _collection_statement(model, criteria: Sequence):
+    return select(func.max(_version_column(model)), func.count(model.id)).where(*criteria)
+
+
+def _collection_result(request: Request, row) -> Tuple[str, Optional[datetime]]:
+    last_modified, count = row
+    last_modified = _as_utc(last_modified)
+    etag = _make_etag(request.url.path, request.url.query, last_modified, count)
+    return etag, last_modified
+
+
+def _item_statement(model, criteria: Sequence):
+    return select(model.id, _version_column(model)).where(*criteria).limit(1)
+
+
+def _item_result(request: Request, row) -> Optional[Tuple[str, Optional[datetime]]]:
+    if row is None:
+        return None
+    row_id, version = row
+    last_modified = _as_utc(version)
+    etag = _make_etag(request.url.path, row_id, last_modified)
+    return etag, last_modified
+
+
+def collection_validators(
+    db: Session, request: Request, model, criteria: Sequence
+) -> Tuple[str, Optional[datetime]]:
+    """ETag and Last-Modified for a list endpoint: max(updated_at) plus row count"""
+    return _collection_result(request, db.execute(_collection_statement(model, criteria)).one())
+
+
+def item_validators(
+    db: Session, request: Request, model, criteria: Sequence
+) -> Optional[Tuple[str, Optional[datetime]]]:
+    """ETag and Last-Modified for a detail endpoint, or None if the row is not visible"""
+    return _item_result(request, db.execute(_item_statement(model, criteria)).first())
+
+
+def parse_http_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return _as_utc(parsedate_to_datetime(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_not_modified(request: Request, etag: Optional[str], last_modified: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since when no ETag was sent"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if not etag:
+            return False
+        # Weak comparison: compressed responses carry the ETag as W/"..."
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in candidates or etag.removeprefix("W/") in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    since = parse_http_date(if_modified_since)
+    if since is not None and last_modified is not None:
+        return _to_second(last_modified) <= since
+    return False
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_to_second(last_modified), usegmt=True)
+    return headers
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    validators: Tuple[str, Optional[datetime]]
+) -> Optional[Response]:
+    """
+    Attach validators to the outgoing response.
+    Returns a 304 response when the client copy is still fresh, otherwise None.
+    """
+    etag, last_modified = validators
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def check_collection(
+    request: Request, response: Response, db: Session, model, criteria: Sequence
+) -> Optional[Response]:
+    """Conditional GET for a list endpoint"""
+    return conditional_response(request, response, collection_validators(db, request, model, criteria))
+
+
+def check_item(
+    request: Request, response: Response, db: Session, model, criteria: Sequence
+) -> Optional[Response]:
+    """Conditional GET for a detail endpoint; missing rows fall through to the normal 404"""
+    validators = item_validators(db, request, model, criteria)
+    if validators is None:
+        return None
+    return conditional_response(request, response, validators)
+
+
+async def check_collection_async(
+    request: Request, response: Response, db: AsyncSession, model, criteria: Sequence
+) -> Optional[Response]:
+    """Conditional GET for a list endpoint served from an async session"""
+    row = (await db.execute(_collection_statement(model, criteria))).one()
+    return conditional_response(request, response, _collection_result(request, row))
+
+
+async def check_item_async(
+    request: Request, response: Response, db: AsyncSession, model, criteria: Sequence
+) -> Optional[Response]:
+    """Conditional GET for a detail endpoint served from an async session"""
+    row = (await db.execute(_item_statement(model, criteria))).first()
+    validators = _item_result(request, row)
+    if validators is None:
+        return None
+    return conditional_response(request, response, validators)
@@ -1,9 +1,11 @@
 from functools import lru_cache
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./cms.db"
+    async_database_url: Optional[str] = None  # derived from database_url when unset
     secret_key: str = "your-secret-key-here-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
@@ -23,9 +25,91 @@ class Settings(BaseSettings):
     db_password: str = "password"
     db_name: str = "cms_db"
     
+    # Connection pool settings (ignored for in-memory SQLite)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30  # seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # seconds; -1 disables recycling
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 0  # PostgreSQL only; 0 disables
+    
+    # Read replicas for public GET traffic (same URL format as database_url)
+    database_replica_urls: List[str] = []
+    replica_max_lag_seconds: float = 5.0
+    replica_health_check_interval: float = 10.0
+    replica_health_check_timeout: float = 2.0
+    
     # Upload settings
     max_file_size: int = 5242880  # 5MB
     upload_folder: str = "uploads"
+    upload_chunk_size: int = 262144  # 256KB read/write chunks for streamed uploads
+    
+    # Image processing pool (0 workers = single background thread)
+    image_workers: int = 2
+    image_queue_depth: int = 8  # jobs waiting beyond the busy workers before 429
+    image_job_timeout: float = 60.0
+    
+    # Responsive renditions written for every uploaded image
+    image_variant_widths: List[int] = [320, 640, 1280, 2048]
+    image_variant_formats: List[str] = ["jpeg", "webp"]  # avif is used when Pillow supports it
+    
+    # On-the-fly /img transforms
+    image_cache_dir: str = "cache/images"
+    image_cache_max_bytes: int = 268435456  # 256MB
+    
+    # Where uploads are stored: local (upload_folder) or s3 (any S3-compatible service)
+    storage_backend: str = "local"
+    storage_s3_bucket: Optional[str] = None
+    storage_s3_prefix: str = ""
+    storage_s3_endpoint_url: Optional[str] = None  # e.g. http://localhost:9000 for MinIO
+    storage_s3_region: Optional[str] = None
+    storage_s3_access_key: Optional[str] = None
+    storage_s3_secret_key: Optional[str] = None
+    storage_public_url: Optional[str] = None  # CDN/bucket URL; /static redirects to presigned URLs when unset
+    storage_presign_expires: int = 3600
+    storage_cache_dir: str = "cache/storage"  # local copies of remote files for /img
+    storage_cache_max_bytes: int = 1073741824  # 1GB
+    
+    # Serving uploads from /static (local storage)
+    static_max_age: int = 3600  # Cache-Control max-age for paths that are not content-addressed
+    static_precompress: bool = True  # write .br/.gz siblings of compressible documents on upload
+    static_precompress_min_size: int = 1024
+    static_hot_cache_max_bytes: int = 8388608  # 8MB of small files kept in memory
+    static_hot_file_max_size: int = 65536
+    
+    # Response compression (brotli needs the brotli package; gzip is always available)
+    compression_enabled: bool = True  # default for routes without their own policy
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_stream_threshold: int = 1048576  # larger bodies are compressed while streaming
+    compression_exclude_paths: List[str] = ["/static", "/uploads", "/img"]  # served with their own encodings
+    
+    # JSON responses
+    json_backend: str = "orjson"  # orjson, stdlib
+    
+    # Response cache settings
+    cache_enabled: bool = True
+    cache_backend: str = "memory"  # memory, redis
+    cache_redis_url: Optional[str] = None
+    cache_max_entries: int = 1024
+    cache_ttl_seconds: int = 300
+    
+    # Dashboard statistics: keep counters in the stats_summary table
+    stats_materialized: bool = False
+    
+    # News view counting: buffered per worker and flushed in batches
+    views_flush_interval: float = 5.0  # seconds between flushes
+    views_shards: int = 16
+    views_max_pending_keys: int = 100000  # distinct news ids buffered before views are dropped
+    views_rollup_interval: float = 3600.0  # seconds between bucket rollups
+    views_hourly_retention_hours: int = 168  # then rolled up into days
+    views_daily_retention_days: int = 90  # then rolled up into months
+    views_monthly_retention_months: int = 24  # then deleted; 0 keeps them forever
+    
+    # Trending news: views in hourly buckets, decayed by age
+    trending_window_hours: int = 72
+    trending_half_life_hours: float = 24.0
     
     class Config:
         env_file = ".env"
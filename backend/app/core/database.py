@@ -1,18 +1,84 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from app.core.config import settings
+from app.core.pool import PoolTelemetry, async_pool_telemetry, sync_pool_telemetry, timed_pool_class
+
+# Async drivers for the synchronous URLs we support
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+psycopg",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """Same database addressed through its async driver"""
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f"No async driver configured for '{url.drivername}'")
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def get_async_database_url() -> str:
+    """Async counterpart of database_url unless one is configured explicitly"""
+    return settings.async_database_url or to_async_url(settings.database_url)
+
+
+def get_engine_options(url: str, telemetry: PoolTelemetry, is_async: bool = False) -> dict:
+    """Pool and connection arguments from settings for the given URL"""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory databases live in a single connection; keep the dialect's pool
+        return {}
+    if url.get_backend_name() == "sqlite" and is_async:
+        # aiosqlite runs a thread per connection; keep one per session like the dialect default
+        return {"poolclass": timed_pool_class(NullPool, telemetry)}
+
+    base = AsyncAdaptedQueuePool if is_async else QueuePool
+    options = {
+        "poolclass": timed_pool_class(base, telemetry),
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if url.get_backend_name() == "postgresql" and settings.db_statement_timeout_ms:
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+    return options
+
 
 # Create SQLAlchemy engine  
 engine = create_engine(
     settings.database_url,
     # No need for check_same_thread with PostgreSQL
-    echo=False  # Set to True to see SQL queries in logs
+    echo=False,  # Set to True to see SQL queries in logs
+    **get_engine_options(settings.database_url, sync_pool_telemetry)
 )
+sync_pool_telemetry.instrument(engine)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for routes that should not block the event loop
+async_engine = create_async_engine(
+    get_async_database_url(),
+    echo=False,
+    **get_engine_options(get_async_database_url(), async_pool_telemetry, is_async=True)
+)
+async_pool_telemetry.instrument(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Create Base class
 Base = declarative_base()
 
@@ -24,3 +90,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
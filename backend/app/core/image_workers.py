@@ -0,0 +1,144 @@
+"""
+Worker pool for CPU-heavy image processing.
+
+Pillow decoding, resampling and encoding run in a process pool so they never
+hold the event loop or the GIL of the serving worker. Jobs beyond
+``image_workers + image_queue_depth`` in flight are rejected with 429 so a
+burst of uploads queues a bounded amount of work instead of piling up.
+"""
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.pool import Timings
+
+
+def _run_job(func: Callable, args: tuple) -> tuple:
+    """Runs in the worker: returns the result with wall-clock start and end"""
+    started = time.time()
+    result = func(*args)
+    return result, started, time.time()
+
+
+def _warm_up() -> None:
+    """No-op job that makes the executor start a worker process"""
+
+
+class ImageWorkerPool:
+    """Bounded process pool with per-job queue wait and run time metrics"""
+
+    def __init__(self, workers: int, queue_depth: int, timeout: float):
+        self.workers = workers
+        self.capacity = max(workers, 1) + queue_depth
+        self.timeout = timeout
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.queue_wait = Timings()
+        self.run_time: Dict[str, Timings] = {}
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.workers > 0:
+                # spawn keeps the app's threads and open connections out of the workers
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image")
+        return self._executor
+
+    def _reserve(self) -> None:
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=429,
+                    detail="Image processing is busy, please retry shortly.",
+                    headers={"Retry-After": "5"}
+                )
+            self.in_flight += 1
+            self.submitted += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """Run ``func(*args)`` in the pool; raises 429 when the queue is full"""
+        self._reserve()
+        submitted = time.time()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), _run_job, func, args
+            )
+        except Exception:
+            self._release()
+            raise
+        # The slot is held until the job really finishes, even after a timeout
+        future.add_done_callback(lambda _: self._release())
+        try:
+            result, started, finished = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timed_out += 1
+            raise HTTPException(status_code=504, detail="Image processing timed out.")
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+
+        with self._lock:
+            self.completed += 1
+            self.queue_wait.add(max(started - submitted, 0.0))
+            self.run_time.setdefault(func.__name__, Timings()).add(finished - started)
+        return result
+
+    def start(self) -> None:
+        """Start the worker processes in the background so the first upload does not pay for it"""
+        if self.workers > 0:
+            executor = self._get_executor()
+            for _ in range(self.workers):
+                executor.submit(_warm_up)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "executor": "process" if self.workers > 0 else "thread",
+                "capacity": self.capacity,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "queue_wait": self.queue_wait.summary(),
+                "run_time": {name: timings.summary() for name, timings in self.run_time.items()},
+            }
+
+
+image_workers = ImageWorkerPool(
+    workers=settings.image_workers,
+    queue_depth=settings.image_queue_depth,
+    timeout=settings.image_job_timeout
+)
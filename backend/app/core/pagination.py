@@ -0,0 +1,213 @@
+"""
+Keyset (cursor) pagination.
+
+A cursor encodes the sort key values of the last row of a page plus its id,
+so the next page is fetched with an index-friendly ``WHERE key > last`` instead
+of an ``OFFSET`` that has to walk every skipped row. Cursors are signed with
+the application secret and bound to the ordering they were issued for, so
+clients cannot forge or replay them against a different sort.
+
+NULLs always sort last, and on SQLite datetimes are compared at second
+precision because server-side timestamps there are stored without fractions.
+"""
+import base64
+import hashlib
+import hmac
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import Response
+from sqlalchemy import DateTime, Select, and_, func, literal, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query
+
+from app.core.config import settings
+
+
+class CountMode(str, Enum):
+    """How list endpoints compute their total"""
+    WINDOW = "window"
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
+class InvalidCursorError(ValueError):
+    """Raised for cursors that are malformed, tampered with or issued for another ordering"""
+
+
+def _sign(payload: bytes) -> str:
+    key = hashlib.sha256(f"cursor:{settings.secret_key}".encode("utf-8")).digest()
+    digest = hmac.new(key, payload, hashlib.sha256).digest()[:16]
+    return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def _dump_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    return value
+
+
+def _load_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        if "dec" in value:
+            return Decimal(value["dec"])
+        raise InvalidCursorError("Invalid cursor")
+    return value
+
+
+def encode_cursor(signature: str, values: Sequence[Any]) -> str:
+    payload = json.dumps(
+        {"s": signature, "v": [_dump_value(value) for value in values]},
+        separators=(",", ":")
+    ).encode("utf-8")
+    return f"{base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')}.{_sign(payload)}"
+
+
+def decode_cursor(cursor: str, signature: str) -> List[Any]:
+    try:
+        body, mac = cursor.split(".", 1)
+        payload = _b64decode(body)
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Invalid cursor")
+    if not hmac.compare_digest(mac, _sign(payload)):
+        raise InvalidCursorError("Invalid cursor")
+    try:
+        data = json.loads(payload)
+        values = [_load_value(value) for value in data["v"]]
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursorError("Invalid cursor")
+    if data.get("s") != signature:
+        raise InvalidCursorError("Cursor does not match the requested ordering")
+    return values
+
+
+class Keyset:
+    """
+    Ordering of a list query by one or more columns with ``id`` as tiebreaker.
+    ``keys`` are (column, descending) pairs.
+    """
+
+    def __init__(self, model, *keys: Tuple[Any, bool]):
+        self.model = model
+        id_column = getattr(model, "id")
+        self.keys = []
+        for column, descending in keys:
+            if column is not id_column and all(column is not seen for seen, _ in self.keys):
+                self.keys.append((column, descending))
+        last_desc = self.keys[0][1] if self.keys else False
+        self.keys.append((id_column, last_desc))
+
+    @classmethod
+    def for_column(cls, model, order_by: Optional[str], order_desc: bool = True) -> "Keyset":
+        """Keyset on a column named by the client, falling back to id for unknown names"""
+        if not order_by or order_by not in model.__table__.columns:
+            return cls(model, (getattr(model, "id"), order_desc))
+        return cls(model, (getattr(model, order_by), order_desc))
+
+    @property
+    def signature(self) -> str:
+        return ",".join(
+            f"{column.key}:{'desc' if descending else 'asc'}" for column, descending in self.keys
+        )
+
+    @staticmethod
+    def _expression(expression, dialect: str):
+        if dialect == "sqlite" and isinstance(expression.type, DateTime):
+            return func.datetime(expression)
+        return expression
+
+    def order_by(self, dialect: str) -> list:
+        clauses = []
+        for column, descending in self.keys:
+            expression = self._expression(column, dialect)
+            clause = expression.desc() if descending else expression.asc()
+            clauses.append(clause.nulls_last())
+        return clauses
+
+    def after(self, values: Sequence[Any], dialect: str):
+        """Predicate selecting the rows that sort after the given key values"""
+        if len(values) != len(self.keys):
+            raise InvalidCursorError("Invalid cursor")
+        alternatives = []
+        equal_prefix = []
+        for (column, descending), value in zip(self.keys, values):
+            expression = self._expression(column, dialect)
+            if value is None:
+                # NULLs sort last: nothing comes after them except ties
+                equal_prefix.append(expression.is_(None))
+                continue
+            value = self._expression(literal(value, type_=column.type), dialect)
+            beyond = expression < value if descending else expression > value
+            alternatives.append(and_(*equal_prefix, or_(beyond, expression.is_(None))))
+            equal_prefix.append(expression == value)
+        return or_(*alternatives)
+
+    def values_for(self, obj: Any) -> List[Any]:
+        return [getattr(obj, column.key) for column, _ in self.keys]
+
+    def cursor_for(self, obj: Any) -> str:
+        return encode_cursor(self.signature, self.values_for(obj))
+
+    def next_cursor(self, items: Sequence[Any], limit: int) -> Optional[str]:
+        """Cursor for the page after ``items``, or None if this was the last page"""
+        if not items or len(items) < limit:
+            return None
+        return self.cursor_for(items[-1])
+
+    def apply(self, query: Query, cursor: Optional[str] = None, dialect: Optional[str] = None) -> Query:
+        """
+        Order the query (or 2.0 style select) and, when a cursor is given,
+        restrict it to the rows after it
+        """
+        if dialect is None:
+            dialect = query.session.get_bind().dialect.name
+        if cursor:
+            query = query.filter(self.after(decode_cursor(cursor, self.signature), dialect))
+        return query.order_by(*self.order_by(dialect))
+
+    def paginate(
+        self, query: Query, *, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> List[Any]:
+        """Fetch one page; a cursor takes precedence over skip"""
+        query = self.apply(query, cursor)
+        if not cursor and skip:
+            query = query.offset(skip)
+        return query.limit(limit).all()
+
+    async def paginate_async(
+        self,
+        db: AsyncSession,
+        statement: Select,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> List[Any]:
+        """Async counterpart of paginate for select() statements"""
+        statement = self.apply(statement, cursor, dialect=db.bind.dialect.name)
+        if not cursor and skip:
+            statement = statement.offset(skip)
+        result = await db.execute(statement.limit(limit))
+        return list(result.scalars().all())
+
+
+def set_next_cursor(response: Response, cursor: Optional[str]) -> None:
+    """Expose the next page cursor of a bare list response as a header"""
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
@@ -0,0 +1,185 @@
+"""
+Connection pool telemetry.
+
+Records how long requests wait for a pooled connection, how often the pool
+runs into its overflow, how long connections stay checked out and how long
+they live before being closed, so worker counts and pool sizes can be tuned
+against the database's connection limit.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Sequence, Type
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool
+
+# Number of recent samples kept for percentiles
+SAMPLE_SIZE = 1000
+
+
+class Timings:
+    """Count, total and max of a duration plus a window of recent samples"""
+
+    def __init__(self, sample_size: int = SAMPLE_SIZE):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=sample_size)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    @staticmethod
+    def _percentile(ordered: Sequence[float], fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+        to_ms = lambda seconds: round(seconds * 1000, 3)
+        return {
+            "count": self.count,
+            "avg_ms": to_ms(self.total / self.count) if self.count else 0.0,
+            "p50_ms": to_ms(self._percentile(ordered, 0.5)) if ordered else 0.0,
+            "p95_ms": to_ms(self._percentile(ordered, 0.95)) if ordered else 0.0,
+            "p99_ms": to_ms(self._percentile(ordered, 0.99)) if ordered else 0.0,
+            "max_ms": to_ms(self.max),
+        }
+
+
+class PoolTelemetry:
+    """Checkout wait, overflow and connection lifetime counters for one engine"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine: Optional[Engine] = None
+        self.checkout_wait = Timings()
+        self.hold_time = Timings()
+        self.lifetime = Timings()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.overflow_checkouts = 0
+        self.peak_checked_out = 0
+        self.peak_overflow = 0
+        self.connections_opened = 0
+        self.connections_closed = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkout_wait.add(seconds)
+            if timed_out:
+                self.checkout_timeouts += 1
+
+    def instrument(self, engine: Engine) -> None:
+        """Attach pool event listeners to a (sync) engine"""
+        self.engine = engine
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "close", self._on_close)
+        event.listen(engine, "close_detached", self._on_close_detached)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        connection_record.info["opened_at"] = time.monotonic()
+        with self._lock:
+            self.connections_opened += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.monotonic()
+        pool = self.engine.pool if self.engine is not None else None
+        overflow = max(_call(pool, "overflow"), 0)
+        with self._lock:
+            self.checkouts += 1
+            if overflow:
+                self.overflow_checkouts += 1
+            self.peak_overflow = max(self.peak_overflow, overflow)
+            self.peak_checked_out = max(self.peak_checked_out, _call(pool, "checkedout"))
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        if connection_record is None:
+            return
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            with self._lock:
+                self.hold_time.add(time.monotonic() - checked_out_at)
+
+    def _closed(self, opened_at: Optional[float]) -> None:
+        with self._lock:
+            self.connections_closed += 1
+            if opened_at is not None:
+                self.lifetime.add(time.monotonic() - opened_at)
+
+    def _on_close(self, dbapi_connection, connection_record):
+        self._closed(connection_record.info.get("opened_at"))
+
+    def _on_close_detached(self, dbapi_connection):
+        self._closed(None)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        pool = self.engine.pool if self.engine is not None else None
+        with self._lock:
+            return {
+                "pool_class": type(pool).__name__ if pool is not None else None,
+                "size": _call(pool, "size"),
+                "checked_in": _call(pool, "checkedin"),
+                "checked_out": _call(pool, "checkedout"),
+                "overflow": max(_call(pool, "overflow"), 0),
+                "peak_checked_out": self.peak_checked_out,
+                "peak_overflow": self.peak_overflow,
+                "checkouts": self.checkouts,
+                "overflow_checkouts": self.overflow_checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "checkout_wait": self.checkout_wait.summary(),
+                "hold_time": self.hold_time.summary(),
+                "connections_opened": self.connections_opened,
+                "connections_closed": self.connections_closed,
+                "invalidations": self.invalidations,
+                "connection_lifetime": self.lifetime.summary(),
+            }
+
+
+def _call(pool: Optional[Pool], method: str) -> int:
+    """Pool gauge if the pool implementation has it, else 0"""
+    getter = getattr(pool, method, None)
+    if getter is None:
+        return 0
+    value = getter()
+    return value if isinstance(value, int) else 0
+
+
+def timed_pool_class(base: Type[Pool], telemetry: PoolTelemetry) -> Type[Pool]:
+    """
+    Subclass of ``base`` that times every checkout, including the wait for a
+    free connection, which pool events alone cannot observe
+    """
+
+    class TimedPool(base):
+        def connect(self):
+            started = time.perf_counter()
+            try:
+                connection = super().connect()
+            except PoolTimeoutError:
+                telemetry.record_wait(time.perf_counter() - started, timed_out=True)
+                raise
+            telemetry.record_wait(time.perf_counter() - started)
+            return connection
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    TimedPool.__qualname__ = TimedPool.__name__
+    return TimedPool
+
+
+sync_pool_telemetry = PoolTelemetry("sync")
+async_pool_telemetry = PoolTelemetry("async")
@@ -0,0 +1,327 @@
+"""
+Read-replica routing.
+
+Public read endpoints take their session from ``get_read_db`` /
+``get_async_read_db``. Those sessions run SELECTs on a healthy replica and
+send flushes, DML and ``FOR UPDATE`` reads to the primary; once a session
+has written it stays on the primary. Requests fall back to the primary when
+
+- no replica is configured, healthy or within ``replica_max_lag_seconds``,
+- this process committed a write less than ``replica_max_lag_seconds`` ago,
+  so freshly invalidated cache entries are rebuilt from current data,
+- the client made a write recently (``cms_read_primary`` cookie), so admins
+  see their own changes on the public site.
+
+A request that reads from a replica records ``request.state.replica_max_lag``;
+the response cache does not store its response while a table it read was
+written, by any worker, less than that long ago.
+
+Replicas are checked in the background every
+``replica_health_check_interval`` seconds; a replica that fails a check or a
+query is skipped until it passes again.
+"""
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.database import async_engine, engine, get_engine_options, to_async_url
+from app.core.pool import PoolTelemetry
+
+logger = logging.getLogger(__name__)
+
+READ_PRIMARY_COOKIE = "cms_read_primary"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Replay lag in seconds; an idle but fully replayed standby reports 0
+POSTGRES_LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+
+class Replica:
+    """One read replica with its engines and last known health"""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        async_url = to_async_url(url)
+        self.telemetry = PoolTelemetry(name)
+        self.async_telemetry = PoolTelemetry(f"{name}-async")
+        self.engine = create_engine(url, echo=False, **get_engine_options(url, self.telemetry))
+        self.async_engine = create_async_engine(
+            async_url, echo=False, **get_engine_options(async_url, self.async_telemetry, is_async=True)
+        )
+        self.telemetry.instrument(self.engine)
+        self.async_telemetry.instrument(self.async_engine.sync_engine)
+        self.healthy = True
+        self.lag_seconds: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.failures = 0
+        self.reads = 0
+
+    def usable(self, max_lag: float) -> bool:
+        return self.healthy and (self.lag_seconds or 0.0) <= max_lag
+
+    def mark_healthy(self, lag_seconds: float) -> None:
+        if not self.healthy:
+            logger.info("Replica %s is healthy again", self.name)
+        self.healthy = True
+        self.lag_seconds = lag_seconds
+        self.checked_at = time.time()
+        self.last_error = None
+
+    def mark_failed(self, exc: BaseException) -> None:
+        if self.healthy:
+            logger.warning("Replica %s marked unhealthy: %s", self.name, exc)
+        self.healthy = False
+        self.checked_at = time.time()
+        self.last_error = str(exc) or type(exc).__name__
+        self.failures += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "url": self.engine.url.render_as_string(hide_password=True),
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "checked_at": self.checked_at,
+            "last_error": self.last_error,
+            "failures": self.failures,
+            "reads": self.reads,
+        }
+
+
+class ReplicaRouter:
+    """Chooses the replica for a read session and tracks replica health"""
+
+    def __init__(self, urls: List[str], max_lag: float, interval: float, timeout: float):
+        self.replicas = [Replica(f"replica-{index}", url) for index, url in enumerate(urls, 1)]
+        self.max_lag = max_lag
+        self.interval = interval
+        self.timeout = timeout
+        self.primary_reads: Dict[str, int] = {
+            "recent_write": 0,
+            "read_your_writes": 0,
+            "no_usable_replica": 0,
+        }
+        self._primary_until = 0.0
+        self._round_robin = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def note_write(self) -> None:
+        """Keep reads on the primary until replicas have had time to catch up"""
+        self._primary_until = time.monotonic() + self.max_lag
+
+    def _count_primary(self, reason: str) -> None:
+        with self._lock:
+            self.primary_reads[reason] += 1
+
+    def choose(self, request: Optional[Request] = None) -> Optional[Replica]:
+        """Replica for a read session, or None to read from the primary"""
+        if not self.replicas:
+            return None
+        if time.monotonic() < self._primary_until:
+            self._count_primary("recent_write")
+            return None
+        if request is not None and _read_primary_requested(request):
+            self._count_primary("read_your_writes")
+            return None
+        usable = [replica for replica in self.replicas if replica.usable(self.max_lag)]
+        if not usable:
+            self._count_primary("no_usable_replica")
+            return None
+        replica = usable[next(self._round_robin) % len(usable)]
+        with self._lock:
+            replica.reads += 1
+        return replica
+
+    async def _measure_lag(self, replica: Replica) -> float:
+        async with replica.async_engine.connect() as connection:
+            if connection.dialect.name == "postgresql":
+                return float((await connection.execute(POSTGRES_LAG_SQL)).scalar() or 0.0)
+            await connection.execute(text("SELECT 1"))
+            return 0.0
+
+    async def check(self, replica: Replica) -> None:
+        try:
+            lag = await asyncio.wait_for(self._measure_lag(replica), self.timeout)
+        except Exception as exc:
+            replica.mark_failed(exc)
+        else:
+            replica.mark_healthy(lag)
+
+    async def check_all(self) -> None:
+        await asyncio.gather(*(self.check(replica) for replica in self.replicas))
+
+    async def _run_health_checks(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check_all()
+
+    async def start(self) -> None:
+        """Check every replica once, then keep checking in the background"""
+        if not self.replicas or self._task is not None:
+            return
+        await self.check_all()
+        self._task = asyncio.create_task(self._run_health_checks())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            replica.engine.dispose()
+            await replica.async_engine.dispose()
+
+    def telemetries(self) -> List[PoolTelemetry]:
+        return [
+            telemetry
+            for replica in self.replicas
+            for telemetry in (replica.telemetry, replica.async_telemetry)
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "max_lag_seconds": self.max_lag,
+            "health_check_interval": self.interval,
+            "primary_reads": dict(self.primary_reads),
+            "replicas": [replica.stats() for replica in self.replicas],
+        }
+
+
+class RoutingSession(Session):
+    """Session that runs reads on ``replica_bind`` and everything else on the primary"""
+
+    def __init__(self, *args, replica_bind: Optional[Engine] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica_bind = replica_bind
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs):
+        if self.replica_bind is not None:
+            writes = self._flushing or getattr(clause, "is_dml", False)
+            if writes or getattr(clause, "_for_update_arg", None) is not None:
+                # Read our own writes for the rest of the session
+                self.replica_bind = None
+            else:
+                return self.replica_bind
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+ReadSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=engine, class_=RoutingSession
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+replica_router = ReplicaRouter(
+    settings.database_replica_urls,
+    max_lag=settings.replica_max_lag_seconds,
+    interval=settings.replica_health_check_interval,
+    timeout=settings.replica_health_check_timeout
+)
+
+
+def get_read_db(request: Request):
+    """Dependency to get a database session whose reads may go to a replica"""
+    replica = replica_router.choose(request)
+    if replica is not None:
+        request.state.replica_max_lag = replica_router.max_lag
+    db = ReadSessionLocal(replica_bind=replica.engine if replica else None)
+    try:
+        yield db
+    except DBAPIError as exc:
+        if replica is not None and db.replica_bind is not None:
+            replica.mark_failed(exc)
+        raise
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    """Dependency to get an async database session whose reads may go to a replica"""
+    replica = replica_router.choose(request)
+    if replica is not None:
+        request.state.replica_max_lag = replica_router.max_lag
+    bind = replica.async_engine.sync_engine if replica else None
+    async with AsyncReadSessionLocal(replica_bind=bind) as db:
+        try:
+            yield db
+        except DBAPIError as exc:
+            if replica is not None and db.sync_session.replica_bind is not None:
+                replica.mark_failed(exc)
+            raise
+
+
+def _read_primary_requested(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def remember_write(request: Request, response: Response) -> None:
+    """Pin the client's reads to the primary after a successful write"""
+    if replica_router.enabled and request.method not in SAFE_METHODS and response.status_code < 400:
+        window = replica_router.max_lag
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            str(time.time() + window),
+            max_age=int(window) + 1,
+            httponly=True,
+            samesite="lax"
+        )
+
+
+# A committed write makes every replica stale for up to max_lag seconds
+
+@event.listens_for(Session, "after_flush")
+def _flag_flushed_write(session, flush_context):
+    session.info["replica_wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_bulk_write(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        orm_execute_state.session.info["replica_wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _note_committed_write(session):
+    if session.info.pop("replica_wrote", False) and replica_router.enabled:
+        replica_router.note_write()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_write_flag(session):
+    session.info.pop("replica_wrote", None)
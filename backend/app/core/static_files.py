@@ -0,0 +1,381 @@
+"""
+Static file serving for uploads.
+
+Uploaded images are stored as JPEG with WebP/AVIF siblings of the same name
+(see ``app.utils.file_upload.render_image_variants``). A request for the JPEG
+is answered with the best sibling the client's ``Accept`` header allows, so
+plain ``<img src>`` tags get modern formats without changing stored URLs.
+
+Compressible documents get ``.br``/``.gz`` siblings at upload time which are
+served with ``Content-Encoding`` when the client accepts them. Responses
+support single byte ranges, carry long-lived ``immutable`` caching for
+content-addressed paths, use the ASGI zero-copy send extension when the
+server offers it and keep small hot files in memory.
+
+With remote storage the same URLs redirect to the storage service instead,
+so file bytes never pass through the API process.
+"""
+import gzip
+import os
+import shutil
+import stat
+import threading
+from collections import OrderedDict
+from mimetypes import guess_type
+from typing import Any, Dict, List, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, PlainTextResponse, RedirectResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.storage import IMMUTABLE_CACHE_CONTROL, StorageBackend
+
+NEGOTIABLE_EXTENSIONS = {".jpg", ".jpeg"}
+# Preferred alternatives, best first
+ALTERNATIVE_FORMATS = [("image/avif", ".avif"), ("image/webp", ".webp")]
+# Files worth storing precompressed; office formats newer than 2007 are zip archives already
+PRECOMPRESSIBLE_EXTENSIONS = {".txt", ".rtf", ".csv", ".json", ".xml", ".svg", ".pdf", ".doc", ".xls", ".ppt"}
+# Preferred content codings, best first
+PRECOMPRESSED_ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+# Content-addressed uploads (app.utils.blob_store) never change under the same path
+IMMUTABLE_PREFIXES = ("blobs/",)
+
+
+def accepts(accept_header: str, media_type: str) -> bool:
+    """Whether the Accept header explicitly lists media_type with a non-zero quality"""
+    for part in accept_header.split(","):
+        name, *params = [item.strip() for item in part.split(";")]
+        if name.lower() != media_type:
+            continue
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) of a single byte range. Returns None when the header
+    should be ignored (other units, several ranges, bad syntax) and raises
+    RangeNotSatisfiable when the range lies beyond the end of the file.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, separator, last = spec.strip().partition("-")
+    if not separator:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable()
+            start, end = max(size - suffix, 0), size - 1
+    except ValueError:
+        return None
+    if start < 0:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+def _brotli() -> Any:
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def _write_brotli(source_path: str, destination_path: str) -> None:
+    compressor = _brotli().Compressor(quality=9)
+    with open(source_path, "rb") as source, open(destination_path, "wb") as destination:
+        for chunk in iter(lambda: source.read(settings.upload_chunk_size), b""):
+            destination.write(compressor.process(chunk))
+        destination.write(compressor.finish())
+
+
+def _write_gzip(source_path: str, destination_path: str) -> None:
+    with open(source_path, "rb") as source, open(destination_path, "wb") as raw:
+        # mtime=0 keeps the output identical for identical input
+        with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=9, mtime=0) as destination:
+            shutil.copyfileobj(source, destination, settings.upload_chunk_size)
+
+
+def precompress(path: str) -> List[str]:
+    """
+    Write ``.br``/``.gz`` siblings of a compressible file and return their paths.
+    A sibling is only kept when it is at least 10% smaller than the original;
+    brotli is skipped when the ``brotli`` package is not installed.
+    """
+    if os.path.splitext(path)[1].lower() not in PRECOMPRESSIBLE_EXTENSIONS:
+        return []
+    size = os.path.getsize(path)
+    if size < settings.static_precompress_min_size:
+        return []
+    writers = [(".gz", _write_gzip)]
+    if _brotli() is not None:
+        writers.insert(0, (".br", _write_brotli))
+    written = []
+    for suffix, write in writers:
+        sibling_path = path + suffix
+        partial_path = f"{sibling_path}.part"
+        try:
+            write(path, partial_path)
+            if os.path.getsize(partial_path) <= size * 0.9:
+                os.replace(partial_path, sibling_path)
+                written.append(sibling_path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+    return written
+
+
+class HotFileCache:
+    """Small LRU of file contents, validated against the file's size and mtime"""
+
+    def __init__(self, max_bytes: int, max_file_size: int):
+        self.max_bytes = max_bytes
+        self.max_file_size = max_file_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[int, int, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def cacheable(self, stat_result: os.stat_result) -> bool:
+        return stat_result.st_size <= self.max_file_size and self.max_bytes > 0
+
+    def get(self, path: str, stat_result: os.stat_result) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[:2] != (stat_result.st_mtime_ns, stat_result.st_size):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, path: str, stat_result: os.stat_result, content: bytes) -> None:
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self._bytes -= len(previous[2])
+            self._entries[path] = (stat_result.st_mtime_ns, stat_result.st_size, content)
+            self._bytes += len(content)
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_file_size": self.max_file_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class StaticFileResponse(FileResponse):
+    """FileResponse with byte ranges, in-memory bodies and zero-copy sends"""
+
+    chunk_size = 256 * 1024
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.headers["accept-ranges"] = "bytes"
+        self.content: Optional[bytes] = None
+        self.byte_range: Optional[Tuple[int, int]] = None
+
+    def set_range(self, start: int, end: int) -> None:
+        self.byte_range = (start, end)
+        self.status_code = 206
+        self.headers["content-range"] = f"bytes {start}-{end}/{self.stat_result.st_size}"
+        self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        start, end = self.byte_range or (0, self.stat_result.st_size - 1)
+        count = end - start + 1
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.send_header_only or count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif self.content is not None:
+            await send({"type": "http.response.body", "body": self.content[start:end + 1], "more_body": False})
+        elif "http.response.zerocopysend" in scope.get("extensions", {}):
+            # The server copies straight from the file descriptor to the socket
+            file = await anyio.to_thread.run_sync(open, self.path, "rb")
+            try:
+                await send({"type": "http.response.zerocopysend", "file": file, "offset": start, "count": count})
+            finally:
+                await anyio.to_thread.run_sync(file.close)
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(start)
+                remaining = count
+                while remaining > 0:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    remaining = remaining - len(chunk) if chunk else 0
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if self.background is not None:
+            await self.background()
+
+
+class NegotiatingStaticFiles(StaticFiles):
+    """
+    StaticFiles for uploads: WebP/AVIF siblings of JPEG images and precompressed
+    siblings of documents when the client accepts them, byte ranges, caching
+    headers and a hot-file memory cache
+    """
+
+    def __init__(self, *args: Any, hot_cache: Optional[HotFileCache] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.hot_cache = hot_cache
+
+    async def _lookup_file(self, path: str) -> Tuple[str, Optional[os.stat_result]]:
+        """Path and stat of a regular file, or ("", None)"""
+        try:
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+        except PermissionError:
+            raise HTTPException(status_code=401)
+        if stat_result and stat.S_ISREG(stat_result.st_mode):
+            return full_path, stat_result
+        return "", None
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)
+
+        request_headers = Headers(scope=scope)
+        extension = os.path.splitext(path)[1].lower()
+        vary = []
+        full_path, stat_result = "", None
+        if extension in NEGOTIABLE_EXTENSIONS:
+            vary.append("Accept")
+            accept = request_headers.get("accept", "")
+            for media_type, alternative in ALTERNATIVE_FORMATS:
+                if accepts(accept, media_type):
+                    full_path, stat_result = await self._lookup_file(os.path.splitext(path)[0] + alternative)
+                    if stat_result:
+                        break
+        if not stat_result:
+            full_path, stat_result = await self._lookup_file(path)
+            if not stat_result:
+                # Directories, html mode and 404s
+                return await super().get_response(path, scope)
+
+        headers = {
+            "cache-control": (
+                IMMUTABLE_CACHE_CONTROL if path.startswith(IMMUTABLE_PREFIXES)
+                else f"public, max-age={settings.static_max_age}"
+            )
+        }
+        media_type = guess_type(full_path)[0] or "application/octet-stream"
+        if extension in PRECOMPRESSIBLE_EXTENSIONS:
+            vary.append("Accept-Encoding")
+            # Ranges address the identity representation
+            if "range" not in request_headers:
+                accept_encoding = request_headers.get("accept-encoding", "")
+                for coding, suffix in PRECOMPRESSED_ENCODINGS:
+                    if accepts(accept_encoding, coding):
+                        encoded_path, encoded_stat = await self._lookup_file(path + suffix)
+                        if encoded_stat:
+                            full_path, stat_result = encoded_path, encoded_stat
+                            headers["content-encoding"] = coding
+                            break
+        if vary:
+            headers["vary"] = ", ".join(vary)
+        return await self.serve_file(full_path, stat_result, scope, media_type, headers)
+
+    async def serve_file(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        media_type: str,
+        headers: Dict[str, str]
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        response = StaticFileResponse(
+            full_path, stat_result=stat_result, method=scope["method"], media_type=media_type, headers=headers
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+
+        range_header = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        if range_header and if_range in (None, response.headers["etag"], response.headers["last-modified"]):
+            try:
+                byte_range = parse_range(range_header, stat_result.st_size)
+            except RangeNotSatisfiable:
+                return Response(status_code=416, headers={"content-range": f"bytes */{stat_result.st_size}"})
+            if byte_range is not None:
+                response.set_range(*byte_range)
+
+        if self.hot_cache is not None and scope["method"] == "GET" and self.hot_cache.cacheable(stat_result):
+            content = self.hot_cache.get(full_path, stat_result)
+            if content is None:
+                content = await anyio.to_thread.run_sync(_read_file, full_path)
+                if len(content) != stat_result.st_size:
+                    # Changed since the stat; stream it from disk instead
+                    return response
+                self.hot_cache.put(full_path, stat_result, content)
+            response.content = content
+        return response
+
+
+class StorageRedirect:
+    """ASGI app answering static requests with a redirect to the storage backend's direct URL"""
+
+    def __init__(self, storage: StorageBackend):
+        self.storage = storage
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        assert scope["type"] == "http"
+        key = os.path.normpath(scope["path"].lstrip("/"))
+        if scope["method"] not in ("GET", "HEAD"):
+            response: Response = PlainTextResponse("Method Not Allowed", status_code=405)
+        elif key in (".", "..") or key.startswith("../"):
+            response = PlainTextResponse("Not Found", status_code=404)
+        else:
+            url = self.storage.url(key)
+            if url.startswith("/"):
+                # No public URL configured: hand out a short-lived signed one
+                url = self.storage.presign(key)
+            response = RedirectResponse(url, status_code=307)
+            response.headers["Cache-Control"] = "private, max-age=60"
+        await response(scope, receive, send)
+
+
+hot_files = HotFileCache(settings.static_hot_cache_max_bytes, settings.static_hot_file_max_size)
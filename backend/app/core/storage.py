@@ -0,0 +1,391 @@
+"""
+Storage backends for uploaded files.
+
+Keys are paths relative to the storage root (``blobs/ab/cd/<sha256>.jpg``).
+Drivers implement a small synchronous core; the public API is async and
+runs it in the threadpool, with ``stream`` yielding fixed-size chunks so
+large files never sit in memory. ``STORAGE_BACKEND`` selects the driver:
+
+- ``local``: files under ``upload_folder``, served by the /static mount.
+- ``s3``: any S3-compatible service (AWS, MinIO, ...). Public URLs point at
+  ``STORAGE_PUBLIC_URL`` when set; otherwise /static redirects to short-lived
+  presigned URLs so downloads bypass the API process.
+
+Remote drivers keep local copies of files tools need on disk (``local_path``)
+under ``storage_cache_dir``, bounded by ``storage_cache_max_bytes`` with
+least recently used copies evicted first. Deleting or overwriting a key
+drops its copy.
+
+Uploads are always processed in a local scratch area under ``upload_folder``
+and handed to ``put`` once complete.
+"""
+import mimetypes
+import os
+import shutil
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import AsyncIterator, BinaryIO, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+# Stored keys never change content, so their files can be cached forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def guess_content_type(key: str) -> str:
+    return mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+
+class LocalCopies:
+    """LRU-bounded directory of local copies of stored files"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _load(self) -> None:
+        """Index copies left by earlier runs, oldest first"""
+        found = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".part"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat_result = os.stat(path)
+                except OSError:
+                    continue
+                found.append((stat_result.st_mtime, os.path.relpath(path, self.directory), stat_result.st_size))
+        with self._lock:
+            for _, key, size in sorted(found):
+                if key not in self._entries:
+                    self._entries[key] = size
+                    self._bytes += size
+            self._loaded = True
+
+    def touch(self, key: str) -> Optional[str]:
+        """Path of the copy of key, marked recently used, or None when there is none"""
+        if not self._loaded:
+            self._load()
+        path = self.path(key)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        if os.path.exists(path):
+            return path
+        # Removed by another process sharing the directory
+        self._forget(key)
+        return None
+
+    def add(self, key: str) -> None:
+        """Index a copy just written to path(key), evicting the oldest over the byte cap"""
+        evicted = []
+        size = os.path.getsize(self.path(key))
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)
+            self._entries[key] = size
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._bytes -= old_size
+                self.evictions += 1
+                evicted.append(old_key)
+        for old_key in evicted:
+            self._remove_file(old_key)
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            size = self._entries.pop(key, None)
+            if size is not None:
+                self._bytes -= size
+
+    def _remove_file(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except OSError:
+            pass
+
+    def discard(self, key: str) -> None:
+        """Drop the copy of key, if any"""
+        self._forget(key)
+        self._remove_file(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
+
+
+class StorageBackend(ABC):
+    """put/get/stream/delete/presign over a flat key space"""
+
+    def __init__(self):
+        self.copies = LocalCopies(settings.storage_cache_dir, settings.storage_cache_max_bytes)
+
+    @abstractmethod
+    def _put(self, key: str, local_path: str, content_type: str) -> None:
+        """Store the local file under key; the local file is consumed"""
+
+    @abstractmethod
+    def _open(self, key: str) -> BinaryIO:
+        """Readable file object for key; raises FileNotFoundError when missing"""
+
+    @abstractmethod
+    def _exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def _delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def _fetch(self, key: str, local_path: str) -> None:
+        """Copy key to a local file"""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """Public URL for key"""
+
+    @abstractmethod
+    def presign(self, key: str, expires_in: Optional[int] = None) -> str:
+        """Time-limited URL clients can download key from directly"""
+
+    @property
+    def is_local(self) -> bool:
+        return False
+
+    async def put(self, key: str, local_path: str, content_type: Optional[str] = None) -> None:
+        await run_in_threadpool(self._put, key, local_path, content_type or guess_content_type(key))
+        # An overwritten key must not be served from its old copy
+        await run_in_threadpool(self.copies.discard, key)
+
+    async def get(self, key: str) -> bytes:
+        return await run_in_threadpool(self.read_sync, key)
+
+    async def stream(self, key: str, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+        chunk_size = chunk_size or settings.upload_chunk_size
+        handle = await run_in_threadpool(self._open, key)
+        try:
+            while True:
+                chunk = await run_in_threadpool(handle.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            await run_in_threadpool(handle.close)
+
+    async def exists(self, key: str) -> bool:
+        return await run_in_threadpool(self._exists, key)
+
+    async def delete(self, key: str) -> None:
+        await run_in_threadpool(self.delete_sync, key)
+
+    async def local_path(self, key: str) -> str:
+        """Path of a local copy of key, for tools that need a real file"""
+        path = await run_in_threadpool(self.copies.touch, key)
+        if path is None:
+            path = self.copies.path(key)
+            await run_in_threadpool(self._fetch, key, path)
+            await run_in_threadpool(self.copies.add, key)
+        return path
+
+    # Synchronous helpers for code paths that are not async
+
+    def read_sync(self, key: str) -> bytes:
+        with self._open(key) as handle:
+            return handle.read()
+
+    def exists_sync(self, key: str) -> bool:
+        return self._exists(key)
+
+    def delete_sync(self, key: str) -> None:
+        self._delete(key)
+        self.copies.discard(key)
+
+
+class LocalStorage(StorageBackend):
+    """Files under a directory on this node"""
+
+    def __init__(self, root: str):
+        super().__init__()
+        self.root = root
+
+    @property
+    def is_local(self) -> bool:
+        return True
+
+    def path(self, key: str) -> str:
+        root = os.path.realpath(self.root)
+        path = os.path.realpath(os.path.join(root, key))
+        if os.path.commonpath([path, root]) != root:
+            raise ValueError(f"Key outside storage root: {key}")
+        return path
+
+    def _put(self, key: str, local_path: str, content_type: str) -> None:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(local_path, path)
+
+    def _open(self, key: str) -> BinaryIO:
+        return open(self.path(key), "rb")
+
+    def _exists(self, key: str) -> bool:
+        return os.path.isfile(self.path(key))
+
+    def _delete(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def _fetch(self, key: str, local_path: str) -> None:
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        shutil.copyfile(self.path(key), local_path)
+
+    async def local_path(self, key: str) -> str:
+        path = self.path(key)
+        if not await run_in_threadpool(os.path.isfile, path):
+            raise FileNotFoundError(key)
+        return path
+
+    def url(self, key: str) -> str:
+        return f"/static/{key}"
+
+    def presign(self, key: str, expires_in: Optional[int] = None) -> str:
+        # Local files are served publicly by the /static mount
+        return self.url(key)
+
+
+class S3Storage(StorageBackend):
+    """Objects in an S3-compatible bucket"""
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        public_url: Optional[str] = None,
+        presign_expires: int = 3600
+    ):
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError:
+            raise RuntimeError("storage_backend 's3' requires the 'boto3' package to be installed")
+        super().__init__()
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.public_url = public_url.rstrip("/") if public_url else None
+        self.presign_expires = presign_expires
+        self._client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            # Path-style addressing works with MinIO and other self-hosted endpoints
+            config=Config(signature_version="s3v4", s3={"addressing_style": "path" if endpoint_url else "auto"})
+        )
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _is_missing(self, exc: Exception) -> bool:
+        error = getattr(exc, "response", {}).get("Error", {})
+        return error.get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    def _put(self, key: str, local_path: str, content_type: str) -> None:
+        self._client.upload_file(
+            local_path,
+            self.bucket,
+            self._key(key),
+            ExtraArgs={"ContentType": content_type, "CacheControl": IMMUTABLE_CACHE_CONTROL}
+        )
+        os.remove(local_path)
+
+    def _open(self, key: str) -> BinaryIO:
+        from botocore.exceptions import ClientError
+        try:
+            return self._client.get_object(Bucket=self.bucket, Key=self._key(key))["Body"]
+        except ClientError as exc:
+            if self._is_missing(exc):
+                raise FileNotFoundError(key)
+            raise
+
+    def _exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except ClientError as exc:
+            if self._is_missing(exc):
+                return False
+            raise
+
+    def _delete(self, key: str) -> None:
+        self._client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def _fetch(self, key: str, local_path: str) -> None:
+        from botocore.exceptions import ClientError
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        partial_path = f"{local_path}.part"
+        try:
+            self._client.download_file(self.bucket, self._key(key), partial_path)
+        except ClientError as exc:
+            if self._is_missing(exc):
+                raise FileNotFoundError(key)
+            raise
+        os.replace(partial_path, local_path)
+
+    def url(self, key: str) -> str:
+        if self.public_url:
+            return f"{self.public_url}/{self._key(key)}"
+        # /static redirects to a presigned URL
+        return f"/static/{key}"
+
+    def presign(self, key: str, expires_in: Optional[int] = None) -> str:
+        return self._client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self._key(key)},
+            ExpiresIn=expires_in or self.presign_expires
+        )
+
+
+def _create_storage() -> StorageBackend:
+    if settings.storage_backend == "s3":
+        if not settings.storage_s3_bucket:
+            raise RuntimeError("storage_s3_bucket must be set when storage_backend is 's3'")
+        return S3Storage(
+            bucket=settings.storage_s3_bucket,
+            prefix=settings.storage_s3_prefix,
+            endpoint_url=settings.storage_s3_endpoint_url,
+            region=settings.storage_s3_region,
+            access_key=settings.storage_s3_access_key,
+            secret_key=settings.storage_s3_secret_key,
+            public_url=settings.storage_public_url,
+            presign_expires=settings.storage_presign_expires
+        )
+    return LocalStorage(settings.upload_folder)
+
+
+storage = _create_storage()
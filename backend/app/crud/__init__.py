@@ -5,4 +5,6 @@ from .service import service_crud
 from .team import team_member
 from .company import company
 from .news import news
-from .contact import contact
\ No newline at end of file
+from .news_views import news_views
+from .contact import contact
+from .tag import tag
@@ -2,11 +2,27 @@ from typing import Optional, List
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import desc, asc, and_, or_, func, case
+from app.core.config import settings
+from app.core.pagination import Keyset
 from app.crud.base import CRUDBase
+from app.crud.filtered_query import FilteredQuery, Page
+from app.crud.stats import Counter, StatsSpec, stats_engine
 from app.models.contact import Contact
 from app.schemas.contact import ContactCreate, ContactUpdate, ContactFilters, ContactStats
 
 
+CONTACT_STATS = stats_engine.register(StatsSpec(
+    model=Contact,
+    counters=[
+        Counter("total_contacts", None),
+        Counter("unread_contacts", Contact.is_read == False, lambda row: row["is_read"] is False),
+        Counter("read_contacts", Contact.is_read == True, lambda row: row["is_read"] is True),
+        Counter("replied_contacts", Contact.is_replied == True, lambda row: row["is_replied"] is True),
+        Counter("pending_contacts", Contact.is_replied == False, lambda row: row["is_replied"] is False),
+    ],
+))
+
+
 class CRUDContact(CRUDBase[Contact, ContactCreate, ContactUpdate]):
     def get_contacts(
         self,
@@ -15,8 +31,11 @@ class CRUDContact(CRUDBase[Contact, ContactCreate, ContactUpdate]):
         filters: ContactFilters
     ) -> tuple[List[Contact], int]:
         """Get contacts with filtering, pagination and search"""
-        query = db.query(self.model)
-        
+        page = self.get_page(db, filters=filters)
+        return page.items, page.total
+
+    def get_page(self, db: Session, *, filters: ContactFilters) -> Page:
+        """Get a page of contacts and its total according to filters.count_mode"""
         # Apply filters
         filter_conditions = []
         
@@ -47,28 +66,24 @@ class CRUDContact(CRUDBase[Contact, ContactCreate, ContactUpdate]):
         if filters.end_date:
             filter_conditions.append(self.model.created_at <= filters.end_date)
         
-        if filter_conditions:
-            query = query.filter(and_(*filter_conditions))
-        
-        # Get total count before pagination
-        total = query.count()
-        
-        # Apply ordering
-        if filters.order_by:
-            order_column = getattr(self.model, filters.order_by, None)
-            if order_column:
-                if filters.order_desc:
-                    query = query.order_by(desc(order_column))
-                else:
-                    query = query.order_by(asc(order_column))
-        else:
+        return FilteredQuery(
+            model=self.model,
+            criteria=filter_conditions,
+            keyset=self.get_keyset(filters)
+        ).page(
+            db,
+            skip=filters.skip,
+            limit=filters.limit,
+            cursor=filters.cursor,
+            count_mode=filters.count_mode
+        )
+
+    def get_keyset(self, filters: Optional[ContactFilters] = None) -> Keyset:
+        """List order for the given filters, used for cursor pagination"""
+        if filters is None or not filters.order_by:
             # Default ordering by created_at desc
-            query = query.order_by(desc(self.model.created_at))
-        
-        # Apply pagination
-        items = query.offset(filters.skip).limit(filters.limit).all()
-        
-        return items, total
+            return Keyset(self.model, (self.model.created_at, True))
+        return Keyset.for_column(self.model, filters.order_by, filters.order_desc)
 
     def mark_as_read(self, db: Session, *, contact_id: int) -> Optional[Contact]:
         """Mark a contact as read"""
@@ -148,42 +163,21 @@ class CRUDContact(CRUDBase[Contact, ContactCreate, ContactUpdate]):
         week_start = today_start - timedelta(days=now.weekday())
         month_start = today_start.replace(day=1)
         
-        # Get basic counts
-        total_contacts = db.query(func.count(self.model.id)).scalar()
-        unread_contacts = db.query(func.count(self.model.id)).filter(
-            self.model.is_read == False
-        ).scalar()
-        read_contacts = db.query(func.count(self.model.id)).filter(
-            self.model.is_read == True
-        ).scalar()
-        replied_contacts = db.query(func.count(self.model.id)).filter(
-            self.model.is_replied == True
-        ).scalar()
-        pending_contacts = db.query(func.count(self.model.id)).filter(
-            self.model.is_replied == False
-        ).scalar()
-        
-        # Get time-based counts
-        today_contacts = db.query(func.count(self.model.id)).filter(
-            self.model.created_at >= today_start
-        ).scalar()
-        this_week_contacts = db.query(func.count(self.model.id)).filter(
-            self.model.created_at >= week_start
-        ).scalar()
-        this_month_contacts = db.query(func.count(self.model.id)).filter(
-            self.model.created_at >= month_start
-        ).scalar()
-        
-        return ContactStats(
-            total_contacts=total_contacts or 0,
-            unread_contacts=unread_contacts or 0,
-            read_contacts=read_contacts or 0,
-            replied_contacts=replied_contacts or 0,
-            pending_contacts=pending_contacts or 0,
-            today_contacts=today_contacts or 0,
-            this_week_contacts=this_week_contacts or 0,
-            this_month_contacts=this_month_contacts or 0
-        )
+        # Time-based counts depend on the current date and are always computed live
+        windows = [
+            Counter("today_contacts", self.model.created_at >= today_start),
+            Counter("this_week_contacts", self.model.created_at >= week_start),
+            Counter("this_month_contacts", self.model.created_at >= month_start),
+        ]
+        if settings.stats_materialized:
+            stats = {
+                **stats_engine.get(db, CONTACT_STATS).totals,
+                **stats_engine.compute(db, StatsSpec(model=self.model, counters=windows)).totals,
+            }
+        else:
+            spec = StatsSpec(model=self.model, counters=CONTACT_STATS.counters + windows)
+            stats = stats_engine.compute(db, spec).totals
+        return ContactStats(**stats)
 
     def bulk_mark_as_read(self, db: Session, *, contact_ids: List[int]) -> int:
         """Mark multiple contacts as read"""
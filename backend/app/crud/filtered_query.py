@@ -0,0 +1,112 @@
+"""
+Filtered list queries that produce a page and its total from one specification.
+
+Count modes:
+- ``window``: the total rides along with the page as ``COUNT(*) OVER()``, so
+  offset pages cost a single statement. Cursor pages fall back to ``exact``
+  because the keyset predicate would narrow the window.
+- ``exact``: a separate ``COUNT`` over the same filters.
+- ``estimated``: the planner's row estimate on PostgreSQL (exact below a small
+  threshold); elsewhere a count capped at ``ESTIMATE_CAP`` rows.
+- ``none``: no total at all, for infinite scroll clients.
+"""
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
+
+from app.core.pagination import CountMode, Keyset
+
+# Estimates below this many rows are replaced by an exact count
+ESTIMATE_EXACT_BELOW = 1000
+# Non-PostgreSQL estimates stop counting after this many rows
+ESTIMATE_CAP = 10000
+
+
+@dataclass
+class Page:
+    items: List[Any]
+    total: Optional[int]
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
+
+    def pages(self, limit: int) -> Optional[int]:
+        if self.total is None:
+            return None
+        return (self.total + limit - 1) // limit if limit else 0
+
+
+@dataclass
+class FilteredQuery:
+    """Model, filter criteria and ordering shared by the page and its total"""
+    model: Any
+    criteria: Sequence = field(default_factory=list)
+    keyset: Optional[Keyset] = None
+
+    def __post_init__(self):
+        if self.keyset is None:
+            self.keyset = Keyset(self.model, (getattr(self.model, "id"), False))
+
+    def query(self, db: Session, *entities) -> Query:
+        return db.query(self.model, *entities).filter(*self.criteria)
+
+    def items(
+        self, db: Session, *, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> List[Any]:
+        return self.keyset.paginate(self.query(db), skip=skip, limit=limit, cursor=cursor)
+
+    def count(self, db: Session) -> int:
+        return db.query(func.count(getattr(self.model, "id"))).filter(*self.criteria).scalar() or 0
+
+    def estimate(self, db: Session) -> tuple:
+        """Approximate total; returns (total, is_estimate)"""
+        connection = db.connection()
+        if connection.dialect.name == "postgresql":
+            compiled = self.query(db).statement.compile(dialect=connection.dialect)
+            plan = connection.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+            ).scalar()
+            rows = int(plan[0]["Plan"]["Plan Rows"])
+            if rows >= ESTIMATE_EXACT_BELOW:
+                return rows, True
+            return self.count(db), False
+
+        capped = db.query(getattr(self.model, "id")).filter(*self.criteria).limit(ESTIMATE_CAP).subquery()
+        total = db.query(func.count()).select_from(capped).scalar() or 0
+        return total, total >= ESTIMATE_CAP
+
+    def page(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        count_mode: CountMode = CountMode.WINDOW
+    ) -> Page:
+        """Fetch one page together with its total according to ``count_mode``"""
+        total, estimated = None, False
+        if count_mode == CountMode.WINDOW and not cursor:
+            rows = self.keyset.paginate(
+                self.query(db, func.count().over().label("_total")), skip=skip, limit=limit
+            )
+            items = [row[0] for row in rows]
+            if rows:
+                total = rows[0][1]
+            else:
+                # Past the last row the window has nothing to report
+                total = self.count(db) if skip else 0
+        else:
+            items = self.items(db, skip=skip, limit=limit, cursor=cursor)
+            if count_mode in (CountMode.WINDOW, CountMode.EXACT):
+                total = self.count(db)
+            elif count_mode == CountMode.ESTIMATED:
+                total, estimated = self.estimate(db)
+
+        return Page(
+            items=items,
+            total=total,
+            next_cursor=self.keyset.next_cursor(items, limit),
+            total_is_estimate=estimated
+        )
@@ -1,9 +1,12 @@
 from typing import Optional, List
 from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
+from app.crud.ordering import OrderedCollection
 from app.models.hero_banner import HeroBanner
 from app.schemas.hero_banner import HeroBannerCreate, HeroBannerUpdate
 
+BANNER_ORDER = OrderedCollection(HeroBanner, HeroBanner.order_position, start=1)
+
 
 class CRUDHeroBanner(CRUDBase[HeroBanner, HeroBannerCreate, HeroBannerUpdate]):
     def get_active_banners(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[HeroBanner]:
@@ -22,19 +25,9 @@ class CRUDHeroBanner(CRUDBase[HeroBanner, HeroBannerCreate, HeroBannerUpdate]):
             HeroBanner.is_active == True
         ).order_by(HeroBanner.order_position).first()
     
-    def reorder_banners(self, db: Session, banner_ids: List[int]) -> List[HeroBanner]:
-        """Reorder banners by updating their positions"""
-        updated_banners = []
-        for position, banner_id in enumerate(banner_ids, 1):
-            banner = self.get(db=db, id=banner_id)
-            if banner:
-                banner = self.update(
-                    db=db, 
-                    db_obj=banner, 
-                    obj_in={"order_position": position}
-                )
-                updated_banners.append(banner)
-        return updated_banners
+    def reorder_banners(self, db: Session, banner_ids: List[int]) -> Optional[List[HeroBanner]]:
+        """Give banners positions 1..N in the order of ``banner_ids``; None if an id repeats"""
+        return BANNER_ORDER.reorder(db, banner_ids)
 
 
 hero_banner_crud = CRUDHeroBanner(HeroBanner)
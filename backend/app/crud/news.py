@@ -1,21 +1,89 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc, asc, case
-from typing import List, Optional, Dict, Any, Union
+from sqlalchemy import and_, or_, func, desc, asc, case, bindparam, select, update
+from typing import Iterator, List, Optional, Dict, Any, Sequence, Tuple, Union
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from app.models.news import News
+from app.core.config import settings
+from app.models.news import News, NewsAttachment
+from app.models.tag import news_tags
 from app.schemas.news import NewsCreate, NewsUpdate, NewsImageUpdate, AnnouncementCreate, AnnouncementUpdate
+from app.core.pagination import Keyset
 from app.crud.base import CRUDBase
+from app.crud.filtered_query import CountMode, FilteredQuery, Page
+from app.crud.news_views import news_views
+from app.crud.stats import Counter, StatsSpec, Sum, stats_engine
+from app.crud.tag import parse_tags, tag as tag_crud, tag_filter
+from app.services.search_index import search_index
 import json
 
 
+# News items have no priority, announcements always carry one
+_is_news = (News.priority == None) | (News.priority == "")
+_is_announcement = (News.priority != None) & (News.priority != "")
+
+
+def _news_row(row: Dict[str, Any]) -> bool:
+    return row["priority"] is None or row["priority"] == ""
+
+
+@dataclass
+class BulkResult:
+    action: str
+    matched: int = 0
+    affected: int = 0
+    # Files of deleted articles, released by the caller once the rows are gone
+    image_urls: List[str] = field(default_factory=list)
+    document_paths: List[str] = field(default_factory=list)
+
+
+# ids per IN list in batched statements (buffered views, bulk actions)
+ID_CHUNK_SIZE = 500
+
+NEWS_STATS = stats_engine.register(StatsSpec(
+    model=News,
+    group_by="category",
+    counters=[
+        Counter("total", None),
+        Counter("total_news", _is_news, _news_row),
+        Counter("published_news", _is_news & (News.is_published == True),
+                lambda row: _news_row(row) and row["is_published"] is True),
+        Counter("featured_news", _is_news & (News.is_featured == True),
+                lambda row: _news_row(row) and row["is_featured"] is True),
+        Counter("draft_news", _is_news & (News.is_published == False),
+                lambda row: _news_row(row) and row["is_published"] is False),
+        Counter("total_announcements", _is_announcement, lambda row: not _news_row(row)),
+        Counter("published_announcements", _is_announcement & (News.is_published == True),
+                lambda row: not _news_row(row) and row["is_published"] is True),
+        Counter("draft_announcements", _is_announcement & (News.is_published == False),
+                lambda row: not _news_row(row) and row["is_published"] is False),
+        Counter("sticky_announcements", _is_announcement & (News.is_sticky == True),
+                lambda row: not _news_row(row) and row["is_sticky"] is True),
+    ],
+    sums=[Sum("total_views", News.views_count)],
+))
+
+
 class NewsCRUD(CRUDBase[News, NewsCreate, NewsUpdate]):
     
-    def get_multi_with_filters(
+    def get_keyset(
+        self,
+        *,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        category: Optional[str] = None
+    ) -> Keyset:
+        """List order for the given sort options, used for cursor pagination"""
+        keys = []
+        if order_by in News.__table__.columns:
+            keys.append((getattr(News, order_by), order_desc))
+        # Special ordering for announcements (sticky first)
+        if category == "announcements" or category == "announcement":
+            keys.extend([(News.is_sticky, True), (News.created_at, True)])
+        return Keyset(News, *keys)
+    
+    def filter_criteria(
         self,
-        db: Session,
         *,
-        skip: int = 0,
-        limit: int = 100,
         search: Optional[str] = None,
         category: Optional[str] = None,
         author: Optional[str] = None,
@@ -24,16 +92,15 @@ class NewsCRUD(CRUDBase[News, NewsCreate, NewsUpdate]):
         priority: Optional[str] = None,
         is_sticky: Optional[bool] = None,
         include_expired: bool = True,
-        order_by: str = "created_at",
-        order_desc: bool = True
-    ) -> List[News]:
-        """Get news with filters and search"""
-        query = db.query(News)
+        tags: Optional[List[str]] = None,
+        match_all_tags: bool = False
+    ) -> list:
+        """Filters shared by the news list, its count and bulk operations"""
+        criteria = []
         
-        # Apply filters
         if search:
             search_term = f"%{search}%"
-            query = query.filter(
+            criteria.append(
                 or_(
                     News.title.ilike(search_term),
                     News.excerpt.ilike(search_term),
@@ -44,126 +111,133 @@ class NewsCRUD(CRUDBase[News, NewsCreate, NewsUpdate]):
         
         if category:
             if category == "announcements":
-                query = query.filter(News.category == "announcement")
+                criteria.append(News.category == "announcement")
             elif category == "news":
-                query = query.filter(News.category != "announcement")
+                criteria.append(News.category != "announcement")
             else:
-                query = query.filter(News.category == category)
+                criteria.append(News.category == category)
         
         if author:
-            query = query.filter(News.author.ilike(f"%{author}%"))
+            criteria.append(News.author.ilike(f"%{author}%"))
         
         if is_published is not None:
-            query = query.filter(News.is_published == is_published)
+            criteria.append(News.is_published == is_published)
         
         if is_featured is not None:
-            query = query.filter(News.is_featured == is_featured)
+            criteria.append(News.is_featured == is_featured)
         
         if priority:
-            query = query.filter(News.priority == priority)
+            criteria.append(News.priority == priority)
         
         if is_sticky is not None:
-            query = query.filter(News.is_sticky == is_sticky)
+            criteria.append(News.is_sticky == is_sticky)
+        
+        if tags:
+            criteria.append(tag_filter(tags, match_all=match_all_tags))
         
         # Filter expired announcements
         if not include_expired:
             current_time = datetime.now(timezone.utc)
-            query = query.filter(
+            criteria.append(
                 or_(
                     News.expires_at.is_(None),
                     News.expires_at > current_time
                 )
             )
         
-        # Apply ordering
-        if hasattr(News, order_by):
-            order_column = getattr(News, order_by)
-            if order_desc:
-                query = query.order_by(desc(order_column))
-            else:
-                query = query.order_by(asc(order_column))
-        
-        # Special ordering for announcements (sticky first)
-        if category == "announcements" or category == "announcement":
-            query = query.order_by(desc(News.is_sticky), desc(News.created_at))
-        
-        return query.offset(skip).limit(limit).all()
+        return criteria
+
+    def filtered_query(
+        self,
+        *,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        **filters: Any
+    ) -> FilteredQuery:
+        """Query specification for the news list with the given filters and ordering"""
+        return FilteredQuery(
+            model=News,
+            criteria=self.filter_criteria(**filters),
+            keyset=self.get_keyset(order_by=order_by, order_desc=order_desc, category=filters.get("category"))
+        )
 
-    def count_with_filters(
+    def get_page_with_filters(
         self,
         db: Session,
         *,
-        search: Optional[str] = None,
-        category: Optional[str] = None,
-        author: Optional[str] = None,
-        is_published: Optional[bool] = None,
-        is_featured: Optional[bool] = None,
-        priority: Optional[str] = None,
-        is_sticky: Optional[bool] = None,
-        include_expired: bool = True
-    ) -> int:
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        count_mode: CountMode = CountMode.WINDOW,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        **filters: Any
+    ) -> Page:
+        """Get a page of news and its total in as few queries as the count mode allows"""
+        return self.filtered_query(order_by=order_by, order_desc=order_desc, **filters).page(
+            db, skip=skip, limit=limit, cursor=cursor, count_mode=count_mode
+        )
+
+    def get_multi_with_filters(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        cursor: Optional[str] = None,
+        **filters: Any
+    ) -> List[News]:
+        """Get news with filters and search"""
+        return self.filtered_query(order_by=order_by, order_desc=order_desc, **filters).items(
+            db, skip=skip, limit=limit, cursor=cursor
+        )
+
+    def count_with_filters(self, db: Session, **filters: Any) -> int:
         """Count news with filters"""
-        query = db.query(News)
-        
-        # Apply same filters as get_multi_with_filters
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                or_(
-                    News.title.ilike(search_term),
-                    News.excerpt.ilike(search_term),
-                    News.content.ilike(search_term),
-                    News.author.ilike(search_term)
-                )
-            )
-        
-        if category:
-            if category == "announcements":
-                query = query.filter(News.category == "announcement")
-            elif category == "news":
-                query = query.filter(News.category != "announcement")
-            else:
-                query = query.filter(News.category == category)
-        
-        if author:
-            query = query.filter(News.author.ilike(f"%{author}%"))
-        
-        if is_published is not None:
-            query = query.filter(News.is_published == is_published)
-        
-        if is_featured is not None:
-            query = query.filter(News.is_featured == is_featured)
-        
-        if priority:
-            query = query.filter(News.priority == priority)
-        
-        if is_sticky is not None:
-            query = query.filter(News.is_sticky == is_sticky)
-        
-        if not include_expired:
-            current_time = datetime.now(timezone.utc)
-            query = query.filter(
-                or_(
-                    News.expires_at.is_(None),
-                    News.expires_at > current_time
-                )
-            )
-        
-        return query.count()
+        return FilteredQuery(model=News, criteria=self.filter_criteria(**filters)).count(db)
 
     def get_by_slug(self, db: Session, *, slug: str) -> Optional[News]:
         """Get news by slug"""
         return db.query(News).filter(News.slug == slug).first()
 
-    def increment_views(self, db: Session, *, news_id: int) -> Optional[News]:
-        """Increment view count for news"""
-        news = db.query(News).filter(News.id == news_id).first()
-        if news:
-            current_views = getattr(news, 'views_count', 0)
-            setattr(news, 'views_count', current_views + 1)
-            db.commit()
-            db.refresh(news)
-        return news
+    def add_views(self, db: Session, counts: Dict[int, int]) -> None:
+        """Add buffered view counts to the totals and the current hour bucket, leaving updated_at alone"""
+        if not counts:
+            return
+        table = News.__table__
+        # On the connection, not the session: a view is not a content change, so it
+        # must not invalidate cached pages or keep reads on the primary
+        connection = db.connection()
+        ids = sorted(counts)
+        categories: Dict[int, Optional[str]] = {}
+        for start in range(0, len(ids), ID_CHUNK_SIZE):
+            # Locked so an article cannot be deleted before its bucket is written
+            categories.update(connection.execute(
+                select(table.c.id, table.c.category).where(
+                    table.c.id.in_(ids[start:start + ID_CHUNK_SIZE])
+                ).with_for_update()
+            ).all())
+        counts = {news_id: views for news_id, views in counts.items() if news_id in categories}
+        if not counts:
+            db.rollback()
+            return
+        connection.execute(
+            table.update().where(table.c.id == bindparam("news_id")).values(
+                views_count=func.coalesce(table.c.views_count, 0) + bindparam("views"),
+                updated_at=table.c.updated_at  # set explicitly so onupdate does not fire
+            ),
+            [{"news_id": news_id, "views": views} for news_id, views in sorted(counts.items())]
+        )
+        news_views.add_hourly(db, counts)
+        if settings.stats_materialized:
+            deltas: Dict[tuple, int] = {}
+            for news_id, views in counts.items():
+                key = (categories[news_id], "total_views")
+                deltas[key] = deltas.get(key, 0) + views
+            stats_engine.apply_deltas(db, NEWS_STATS, deltas)
+        db.commit()
 
     def get_featured(self, db: Session, *, skip: int = 0, limit: int = 5) -> List[News]:
         """Get featured news"""
@@ -239,68 +313,20 @@ class NewsCRUD(CRUDBase[News, NewsCreate, NewsUpdate]):
 
     def get_stats(self, db: Session) -> Dict[str, Any]:
         """Get news and announcement statistics"""
-        # News statistics (items without priority field or with null priority)
-        total_news = db.query(News).filter(
-            (News.priority == None) | (News.priority == "")
-        ).count()
-        published_news = db.query(News).filter(
-            News.is_published == True,
-            (News.priority == None) | (News.priority == "")
-        ).count()
-        featured_news = db.query(News).filter(
-            News.is_featured == True,
-            (News.priority == None) | (News.priority == "")
-        ).count()
-        draft_news = db.query(News).filter(
-            News.is_published == False,
-            (News.priority == None) | (News.priority == "")
-        ).count()
-        
-        # Announcement statistics (items with priority field set)
-        total_announcements = db.query(News).filter(
-            News.priority != None,
-            News.priority != ""
-        ).count()
-        published_announcements = db.query(News).filter(
-            News.is_published == True,
-            News.priority != None,
-            News.priority != ""
-        ).count()
-        draft_announcements = db.query(News).filter(
-            News.is_published == False,
-            News.priority != None,
-            News.priority != ""
-        ).count()
-        sticky_announcements = db.query(News).filter(
-            News.is_sticky == True,
-            News.priority != None,
-            News.priority != ""
-        ).count()
-        
-        # Category breakdown
-        categories = db.query(
-            News.category,
-            func.count(News.id).label('count')
-        ).group_by(News.category).all()
-        
-        # Total views
-        total_views = db.query(func.sum(News.views_count)).scalar() or 0
-        
+        result = stats_engine.get(db, NEWS_STATS)
+        stats = {name: value for name, value in result.totals.items() if name != "total"}
         return {
-            "total_news": total_news,
-            "published_news": published_news,
-            "featured_news": featured_news,
-            "draft_news": draft_news,
-            "total_announcements": total_announcements,
-            "published_announcements": published_announcements,
-            "draft_announcements": draft_announcements,
-            "sticky_announcements": sticky_announcements,
-            "total_views": total_views,
-            "categories": [{"name": cat, "count": count} for cat, count in categories],
+            **stats,
+            "categories": [
+                {"name": category, "count": values["total"]}
+                for category, values in result.groups.items()
+                if values["total"]
+            ],
         }
 
     def create_with_slug_check(self, db: Session, *, obj_in: Union[NewsCreate, AnnouncementCreate]) -> News:
         """Create news with unique slug generation"""
+        tags = tag_crud.get_or_create(db, parse_tags(obj_in.tags))
         base_slug = obj_in.slug
         slug = base_slug
         counter = 1
@@ -333,11 +359,48 @@ class NewsCRUD(CRUDBase[News, NewsCreate, NewsUpdate]):
         if hasattr(obj_in, 'is_sticky'):
             setattr(db_obj, 'is_sticky', getattr(obj_in, 'is_sticky', False))
         
+        db_obj.tag_items = tags
+        db.add(db_obj)
+        tag_crud.refresh_counts(db, [tag.id for tag in tags])
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def update(
+        self, db: Session, *, db_obj: News, obj_in: Union[NewsUpdate, AnnouncementUpdate, Dict[str, Any]]
+    ) -> News:
+        """Update news, keeping its tag rows and the tag counts in step"""
+        update_data = obj_in if isinstance(obj_in, dict) else obj_in.dict(exclude_unset=True)
+        affected_tags = set()
+        if "tags" in update_data:
+            tags = tag_crud.get_or_create(db, parse_tags(update_data["tags"]))
+            affected_tags = {tag.id for tag in db_obj.tag_items} | {tag.id for tag in tags}
+            db_obj.tag_items = tags
+        elif any(
+            field in update_data and update_data[field] != getattr(db_obj, field)
+            for field in ("is_published", "category")
+        ):
+            # Published counts only include published articles that are not announcements
+            affected_tags = {tag.id for tag in db_obj.tag_items}
+        for field, value in update_data.items():
+            if field in News.__table__.columns:
+                setattr(db_obj, field, value)
         db.add(db_obj)
+        tag_crud.refresh_counts(db, affected_tags)
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    def remove(self, db: Session, *, id: int) -> Optional[News]:
+        db_obj = db.query(News).get(id)
+        if db_obj:
+            tag_ids = [tag.id for tag in db_obj.tag_items]
+            news_views.remove_for_news(db, [id])
+            db.delete(db_obj)
+            tag_crud.refresh_counts(db, tag_ids)
+            db.commit()
+        return db_obj
+
     def update_image(self, db: Session, *, db_obj: News, obj_in: NewsImageUpdate) -> News:
         """Update news image"""
         setattr(db_obj, 'featured_image_url', obj_in.featured_image_url)
@@ -345,12 +408,50 @@ class NewsCRUD(CRUDBase[News, NewsCreate, NewsUpdate]):
         db.refresh(db_obj)
         return db_obj
 
+    def _touch(self, db: Session, news_id: int) -> None:
+        """Stamp the article as modified, so its ETags and cached pages change"""
+        db.query(News).filter(News.id == news_id).update(
+            {News.updated_at: func.now()}, synchronize_session=False
+        )
+
+    def count_attachments(self, db: Session, *, news_id: int) -> int:
+        return db.query(func.count(NewsAttachment.id)).filter(NewsAttachment.news_id == news_id).scalar()
+
+    def add_attachments(self, db: Session, *, news_id: int, attachments: List[Dict[str, Any]]) -> List[NewsAttachment]:
+        """Insert one row per file; concurrent uploads never overwrite each other"""
+        rows = [NewsAttachment(news_id=news_id, **data) for data in attachments]
+        if rows:
+            db.add_all(rows)
+            self._touch(db, news_id)
+            db.commit()
+        return rows
+
+    def remove_attachment(self, db: Session, *, news_id: int, attachment_id: str) -> Optional[NewsAttachment]:
+        """Delete one attachment row, returning it (detached) if this call removed it"""
+        attachment = db.query(NewsAttachment).filter(
+            NewsAttachment.id == attachment_id, NewsAttachment.news_id == news_id
+        ).first()
+        if attachment is None:
+            return None
+        db.expunge(attachment)
+        deleted = db.query(NewsAttachment).filter(
+            NewsAttachment.id == attachment_id
+        ).delete(synchronize_session=False)
+        if not deleted:
+            # Removed by a concurrent request, which also released the file
+            db.rollback()
+            return None
+        self._touch(db, news_id)
+        db.commit()
+        return attachment
+
     def publish(self, db: Session, *, news_id: int) -> Optional[News]:
         """Publish news"""
         news = db.query(News).filter(News.id == news_id).first()
         if news:
             setattr(news, 'is_published', True)
             setattr(news, 'published_at', datetime.now(timezone.utc))
+            tag_crud.refresh_counts(db, tag_crud.tag_ids_for_news(db, [news_id]))
             db.commit()
             db.refresh(news)
         return news
@@ -361,6 +462,7 @@ class NewsCRUD(CRUDBase[News, NewsCreate, NewsUpdate]):
         if news:
             setattr(news, 'is_published', False)
             setattr(news, 'published_at', None)
+            tag_crud.refresh_counts(db, tag_crud.tag_ids_for_news(db, [news_id]))
             db.commit()
             db.refresh(news)
         return news
@@ -385,6 +487,127 @@ class NewsCRUD(CRUDBase[News, NewsCreate, NewsUpdate]):
             db.refresh(news)
         return news
 
+    def _bulk_chunks(
+        self, db: Session, ids: Optional[Sequence[int]], criteria: Optional[list], limit: Optional[int] = None
+    ) -> Iterator[List[int]]:
+        """Existing target ids in ascending chunks, from an id list or by keyset over the filters"""
+        if limit is None:
+            yield from self._all_bulk_chunks(db, ids, criteria)
+            return
+        remaining = limit
+        for chunk in self._all_bulk_chunks(db, ids, criteria):
+            if remaining <= 0:
+                return
+            chunk = chunk[:remaining]
+            remaining -= len(chunk)
+            yield chunk
+
+    def _all_bulk_chunks(
+        self, db: Session, ids: Optional[Sequence[int]], criteria: Optional[list]
+    ) -> Iterator[List[int]]:
+        if ids is not None:
+            ordered = sorted(set(ids))
+            for start in range(0, len(ordered), ID_CHUNK_SIZE):
+                chunk = [
+                    news_id for news_id, in db.query(News.id).filter(
+                        News.id.in_(ordered[start:start + ID_CHUNK_SIZE])
+                    ).order_by(News.id)
+                ]
+                if chunk:
+                    yield chunk
+            return
+        last_id = None
+        while True:
+            query = db.query(News.id).filter(*(criteria or []))
+            if last_id is not None:
+                query = query.filter(News.id > last_id)
+            chunk = [news_id for news_id, in query.order_by(News.id).limit(ID_CHUNK_SIZE)]
+            if not chunk:
+                return
+            yield chunk
+            last_id = chunk[-1]
+
+    @staticmethod
+    def _bulk_change(action: str) -> Tuple[Any, Dict[Any, Any]]:
+        """Rows an action changes and the values it sets"""
+        if action == "publish":
+            return or_(News.is_published == False, News.is_published.is_(None)), {
+                News.is_published: True, News.published_at: datetime.now(timezone.utc)
+            }
+        if action == "unpublish":
+            return News.is_published == True, {News.is_published: False, News.published_at: None}
+        if action == "feature":
+            return or_(News.is_featured == False, News.is_featured.is_(None)), {News.is_featured: True}
+        if action == "unfeature":
+            return News.is_featured == True, {News.is_featured: False}
+        if action == "stick":
+            return and_(
+                News.category == "announcement", or_(News.is_sticky == False, News.is_sticky.is_(None))
+            ), {News.is_sticky: True}
+        if action == "unstick":
+            return News.is_sticky == True, {News.is_sticky: False}
+        raise ValueError(f"Unknown bulk action '{action}'")
+
+    def bulk_update(
+        self,
+        db: Session,
+        *,
+        action: str,
+        ids: Optional[Sequence[int]] = None,
+        criteria: Optional[list] = None
+    ) -> BulkResult:
+        """Publish, unpublish, (un)feature or (un)stick the targets, one UPDATE and commit per chunk"""
+        guard, values = self._bulk_change(action)
+        result = BulkResult(action=action)
+        for chunk in self._bulk_chunks(db, ids, criteria):
+            result.matched += len(chunk)
+            affected = db.execute(
+                update(News).where(News.id.in_(chunk), guard).values(values)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if affected and action in ("publish", "unpublish"):
+                tag_crud.refresh_counts(db, tag_crud.tag_ids_for_news(db, chunk))
+                search_index.reindex(db, News, chunk)
+            db.commit()
+            result.affected += affected
+        return result
+
+    def bulk_remove(
+        self,
+        db: Session,
+        *,
+        ids: Optional[Sequence[int]] = None,
+        criteria: Optional[list] = None,
+        limit: Optional[int] = None
+    ) -> BulkResult:
+        """
+        Delete the targets and their child rows, one transaction per chunk, at most ``limit``
+        articles; the caller releases the files
+        """
+        result = BulkResult(action="delete")
+        for chunk in self._bulk_chunks(db, ids, criteria, limit):
+            result.matched += len(chunk)
+            image_urls = [
+                url for url, in db.query(News.featured_image_url).filter(
+                    News.id.in_(chunk), News.featured_image_url.isnot(None)
+                )
+            ]
+            document_paths = [
+                path for path, in db.query(NewsAttachment.file_path).filter(NewsAttachment.news_id.in_(chunk))
+            ]
+            tag_ids = tag_crud.tag_ids_for_news(db, chunk)
+            db.query(NewsAttachment).filter(NewsAttachment.news_id.in_(chunk)).delete(synchronize_session=False)
+            db.execute(news_tags.delete().where(news_tags.c.news_id.in_(chunk)))
+            news_views.remove_for_news(db, chunk)
+            affected = db.query(News).filter(News.id.in_(chunk)).delete(synchronize_session=False)
+            tag_crud.refresh_counts(db, tag_ids)
+            search_index.unindex(db, News, chunk)
+            db.commit()
+            result.affected += affected
+            result.image_urls += image_urls
+            result.document_paths += document_paths
+        return result
+
 
 # Create instance
 news = NewsCRUD(News)
@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.news import NewsViewBucket
+
+HOUR = "hour"
+DAY = "day"
+MONTH = "month"
+GRANULARITIES = (HOUR, DAY, MONTH)
+
+
+def utc_now() -> datetime:
+    """Current time as the naive UTC datetime buckets are keyed by"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """Start of the hour, day or month containing ``moment``"""
+    if granularity == HOUR:
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == DAY:
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def months_before(moment: datetime, months: int) -> datetime:
+    """Start of the month ``months`` months before the one containing ``moment``"""
+    index = moment.year * 12 + moment.month - 1 - months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+class CRUDNewsViews:
+    """Per-article view counts in hourly, daily and monthly buckets"""
+
+    def _add(self, db: Session, granularity: str, counts: Dict[Tuple[int, datetime], int]) -> None:
+        """Add ``{(news_id, bucket_start): views}`` to existing buckets, creating missing ones"""
+        if not counts:
+            return
+        connection = db.connection()
+        table = NewsViewBucket.__table__
+        rows = [
+            {"news_id": news_id, "granularity": granularity, "bucket_start": start, "views": views}
+            for (news_id, start), views in sorted(counts.items())
+        ]
+        insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(connection.dialect.name)
+        if insert is not None:
+            statement = insert(table)
+            connection.execute(statement.on_conflict_do_update(
+                index_elements=["news_id", "granularity", "bucket_start"],
+                set_={"views": table.c.views + statement.excluded.views}
+            ), rows)
+            return
+        for row in rows:
+            key = [table.c[name] == row[name] for name in ("news_id", "granularity", "bucket_start")]
+            updated = connection.execute(
+                table.update().where(*key).values(views=table.c.views + row["views"])
+            ).rowcount
+            if not updated:
+                connection.execute(table.insert().values(**row))
+
+    def add_hourly(self, db: Session, counts: Dict[int, int], now: Optional[datetime] = None) -> None:
+        """Add buffered ``{news_id: views}`` to the current hour; the caller commits"""
+        start = bucket_start(now or utc_now(), HOUR)
+        self._add(db, HOUR, {(news_id, start): views for news_id, views in counts.items()})
+
+    def _compact(self, db: Session, source: str, target: str, before: datetime) -> int:
+        """Move ``source`` buckets starting before ``before`` into ``target`` buckets"""
+        table = NewsViewBucket.__table__
+        # DELETE ... RETURNING takes the rows exactly once, even when workers roll up together
+        moved = db.connection().execute(
+            table.delete().where(
+                table.c.granularity == source, table.c.bucket_start < before
+            ).returning(table.c.news_id, table.c.bucket_start, table.c.views)
+        ).all()
+        totals: Dict[Tuple[int, datetime], int] = {}
+        for news_id, start, views in moved:
+            key = (news_id, bucket_start(start, target))
+            totals[key] = totals.get(key, 0) + views
+        self._add(db, target, totals)
+        return len(moved)
+
+    def rollup(
+        self,
+        db: Session,
+        *,
+        hourly_retention_hours: int,
+        daily_retention_days: int,
+        monthly_retention_months: int,
+        now: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """Roll expired hours into days and days into months, then drop expired months"""
+        now = now or utc_now()
+        result = {
+            "hours_rolled_up": self._compact(
+                db, HOUR, DAY, bucket_start(now - timedelta(hours=hourly_retention_hours), DAY)
+            ),
+            "days_rolled_up": self._compact(
+                db, DAY, MONTH, bucket_start(now - timedelta(days=daily_retention_days), MONTH)
+            ),
+            "months_deleted": 0,
+        }
+        if monthly_retention_months > 0:
+            table = NewsViewBucket.__table__
+            result["months_deleted"] = db.connection().execute(table.delete().where(
+                table.c.granularity == MONTH,
+                table.c.bucket_start < months_before(now, monthly_retention_months)
+            )).rowcount
+        db.commit()
+        return result
+
+    def get_history(
+        self, db: Session, *, news_id: int, granularity: str, since: Optional[datetime] = None
+    ) -> List[NewsViewBucket]:
+        """Buckets of one article, oldest first"""
+        statement = select(NewsViewBucket).where(
+            NewsViewBucket.news_id == news_id, NewsViewBucket.granularity == granularity
+        )
+        if since is not None:
+            statement = statement.where(NewsViewBucket.bucket_start >= since)
+        return list(db.execute(statement.order_by(NewsViewBucket.bucket_start)).scalars().all())
+
+    def remove_for_news(self, db: Session, news_ids: Sequence[int]) -> None:
+        """Drop the buckets of deleted articles; the caller commits"""
+        db.query(NewsViewBucket).filter(
+            NewsViewBucket.news_id.in_(list(news_ids))
+        ).delete(synchronize_session=False)
+
+
+news_views = CRUDNewsViews()
@@ -0,0 +1,77 @@
+"""
+Ordered collections: rows displayed in the order of an integer position column.
+
+A reorder is one ``UPDATE ... SET position = CASE id WHEN ... END`` for every
+moved row, in a single transaction, followed by one SELECT of the new order.
+The statement runs through the session, so cached pages and ETags of the
+table are invalidated like any other write.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session
+
+
+class OrderedCollection:
+    """Rows of ``model`` ordered by ``position``; the first id of a reorder is shown first"""
+
+    def __init__(self, model: Any, position: Any, *, start: int = 0, descending: bool = False):
+        self.model = model
+        self.position = position
+        self.start = start
+        self.descending = descending  # lists sort by position DESC, so the first id gets the highest
+
+    @property
+    def id(self) -> Any:
+        return getattr(self.model, "id")
+
+    def positions_for(self, ids: Sequence[Any]) -> Dict[Any, int]:
+        """Positions that display ``ids`` in the given order"""
+        if self.descending:
+            return {id_: self.start + len(ids) - 1 - index for index, id_ in enumerate(ids)}
+        return {id_: self.start + index for index, id_ in enumerate(ids)}
+
+    def set_positions(self, db: Session, positions: Dict[Any, int], *criteria) -> int:
+        """Write ``{id: position}`` in one statement, returning the rows changed; the caller commits"""
+        if not positions:
+            return 0
+        return db.execute(
+            update(self.model)
+            .where(self.id.in_(list(positions)), *criteria)
+            .values({self.position: case(positions, value=self.id)})
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+    def ordered(self, db: Session, *criteria) -> List[Any]:
+        """Rows matching ``criteria`` in display order"""
+        position = self.position.desc() if self.descending else self.position.asc()
+        return list(db.execute(
+            select(self.model).where(*criteria).order_by(position, self.id)
+        ).scalars().all())
+
+    def accepts(self, db: Session, ids: Sequence[Any], *criteria, complete: bool = False) -> bool:
+        """Whether ``ids`` is a valid new order; ``complete`` locks the rows it compares against"""
+        if len(set(ids)) != len(ids):
+            return False
+        if complete:
+            existing = set(db.execute(select(self.id).where(*criteria).with_for_update()).scalars())
+            return existing == set(ids)
+        return True
+
+    def reorder(self, db: Session, ids: Sequence[Any], *criteria, complete: bool = False) -> Optional[List[Any]]:
+        """
+        Show ``ids`` in the given order among the rows matching ``criteria``.
+
+        Unknown ids are skipped. With ``complete`` the ids must name every
+        matching row exactly once. Returns the reordered rows in their new
+        order, or None (and changes nothing) when the ids repeat or, with
+        ``complete``, do not match.
+        """
+        if not self.accepts(db, ids, *criteria, complete=complete):
+            db.rollback()
+            return None
+        self.set_positions(db, self.positions_for(ids), *criteria)
+        db.commit()
+        if not ids:
+            return []
+        return self.ordered(db, self.id.in_(list(ids)), *criteria)
@@ -1,12 +1,25 @@
 from typing import Optional, List
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, func
 from app.crud.base import CRUDBase
-from app.models.product import Product
+from app.crud.ordering import OrderedCollection
+from app.models.product import Product, ProductImage
 from app.schemas.product import ProductCreate, ProductUpdate
 
+PRODUCT_ORDER = OrderedCollection(Product, Product.order_position)
+GALLERY_ORDER = OrderedCollection(ProductImage, ProductImage.position)
+
 
 class CRUDProduct(CRUDBase[Product, ProductCreate, ProductUpdate]):
+    def create(self, db: Session, *, obj_in: ProductCreate) -> Product:
+        # gallery_images is derived from product_images
+        db_obj = Product(**jsonable_encoder(obj_in, exclude={"gallery_images"}))
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
     def get_by_name(self, db: Session, *, name: str) -> Optional[Product]:
         return db.query(Product).filter(Product.name == name).first()
     
@@ -28,5 +41,75 @@ class CRUDProduct(CRUDBase[Product, ProductCreate, ProductUpdate]):
             Product.is_active == True
         ).order_by(desc(Product.created_at)).offset(skip).limit(limit).all()
 
+    def _touch(self, db: Session, product_id: int) -> None:
+        """Stamp the product as modified, so its ETags and cached pages change"""
+        db.query(Product).filter(Product.id == product_id).update(
+            {Product.updated_at: func.now()}, synchronize_session=False
+        )
+
+    def add_gallery_images(self, db: Session, *, product_id: int, image_urls: List[str]) -> List[ProductImage]:
+        """Append images after the current last position, in the given order"""
+        if not image_urls:
+            return []
+        last = db.query(func.max(ProductImage.position)).filter(
+            ProductImage.product_id == product_id
+        ).scalar()
+        start = 0 if last is None else last + 1
+        rows = [
+            ProductImage(product_id=product_id, image_url=image_url, position=start + offset)
+            for offset, image_url in enumerate(image_urls)
+        ]
+        db.add_all(rows)
+        self._touch(db, product_id)
+        db.commit()
+        return rows
+
+    def remove_gallery_image(self, db: Session, *, product_id: int, image_id: int) -> Optional[ProductImage]:
+        """Delete one gallery row, returning it (detached) if this call removed it"""
+        image = db.query(ProductImage).filter(
+            ProductImage.id == image_id, ProductImage.product_id == product_id
+        ).first()
+        if image is None:
+            return None
+        db.expunge(image)
+        deleted = db.query(ProductImage).filter(ProductImage.id == image_id).delete(synchronize_session=False)
+        if not deleted:
+            # Removed by a concurrent request, which also released the file
+            db.rollback()
+            return None
+        self._touch(db, product_id)
+        db.commit()
+        return image
+
+    def clear_gallery(self, db: Session, *, product_id: int) -> List[str]:
+        """Delete every gallery row of a product, returning the removed URLs"""
+        image_urls = [
+            image_url for image_url, in db.query(ProductImage.image_url).filter(
+                ProductImage.product_id == product_id
+            ).with_for_update()
+        ]
+        if image_urls:
+            db.query(ProductImage).filter(
+                ProductImage.product_id == product_id
+            ).delete(synchronize_session=False)
+            self._touch(db, product_id)
+        db.commit()
+        return image_urls
+
+    def reorder_products(self, db: Session, *, product_ids: List[int]) -> Optional[List[Product]]:
+        """Set order positions from ``product_ids``; None if an id repeats"""
+        return PRODUCT_ORDER.reorder(db, product_ids)
+
+    def reorder_gallery(self, db: Session, *, product_id: int, image_ids: List[int]) -> Optional[List[ProductImage]]:
+        """Set positions from ``image_ids``, which must name every gallery image once"""
+        in_gallery = ProductImage.product_id == product_id
+        if not GALLERY_ORDER.accepts(db, image_ids, in_gallery, complete=True):
+            db.rollback()
+            return None
+        GALLERY_ORDER.set_positions(db, GALLERY_ORDER.positions_for(image_ids), in_gallery)
+        self._touch(db, product_id)
+        db.commit()
+        return GALLERY_ORDER.ordered(db, in_gallery)
+
 
 product = CRUDProduct(Product)
@@ -3,32 +3,50 @@ from sqlalchemy import and_, or_, func, desc, asc
 from typing import List, Optional, Dict, Any
 from app.models.service import Service
 from app.schemas.service import ServiceCreate, ServiceUpdate, ServiceImageUpdate
+from app.core.pagination import Keyset
+from app.crud.async_base import AsyncCRUDBase
 from app.crud.base import CRUDBase
+from app.crud.filtered_query import CountMode, FilteredQuery, Page
+from app.crud.ordering import OrderedCollection
+from app.crud.stats import Counter, StatsSpec, stats_engine
 import json
 
 
+SERVICE_STATS = stats_engine.register(StatsSpec(
+    model=Service,
+    group_by="category",
+    counters=[
+        Counter("total_services", None),
+        Counter("active_services", Service.is_active == True, lambda row: row["is_active"] is True),
+        Counter("inactive_services", Service.is_active == False, lambda row: row["is_active"] is False),
+        Counter("featured_services", Service.is_featured == True, lambda row: row["is_featured"] is True),
+    ],
+))
+
+# Services list highest position first
+SERVICE_ORDER = OrderedCollection(Service, Service.order_position, descending=True)
+
+
 class ServiceCRUD(CRUDBase[Service, ServiceCreate, ServiceUpdate]):
     
-    def get_multi_with_filters(
+    def get_keyset(self, *, order_by: str = "created_at", order_desc: bool = True) -> Keyset:
+        """List order for the given sort options, used for cursor pagination"""
+        return Keyset.for_column(Service, order_by, order_desc)
+    
+    def filter_criteria(
         self,
-        db: Session,
         *,
-        skip: int = 0,
-        limit: int = 100,
         search: Optional[str] = None,
         category: Optional[str] = None,
         is_active: Optional[bool] = None,
-        is_featured: Optional[bool] = None,
-        order_by: str = "created_at",
-        order_desc: bool = True
-    ) -> List[Service]:
-        """Get services with filters and search"""
-        query = db.query(Service)
+        is_featured: Optional[bool] = None
+    ) -> list:
+        """Filters shared by the service list and its count"""
+        criteria = []
         
-        # Apply filters
         if search:
             search_term = f"%{search}%"
-            query = query.filter(
+            criteria.append(
                 or_(
                     Service.name.ilike(search_term),
                     Service.description.ilike(search_term),
@@ -37,57 +55,62 @@ class ServiceCRUD(CRUDBase[Service, ServiceCreate, ServiceUpdate]):
             )
         
         if category:
-            query = query.filter(Service.category == category)
+            criteria.append(Service.category == category)
         
         if is_active is not None:
-            query = query.filter(Service.is_active == is_active)
+            criteria.append(Service.is_active == is_active)
         
         if is_featured is not None:
-            query = query.filter(Service.is_featured == is_featured)
-        
-        # Apply ordering
-        if hasattr(Service, order_by):
-            order_column = getattr(Service, order_by)
-            if order_desc:
-                query = query.order_by(desc(order_column))
-            else:
-                query = query.order_by(asc(order_column))
+            criteria.append(Service.is_featured == is_featured)
         
-        return query.offset(skip).limit(limit).all()
+        return criteria
 
-    def get_count_with_filters(
+    def filtered_query(
+        self, *, order_by: str = "created_at", order_desc: bool = True, **filters: Any
+    ) -> FilteredQuery:
+        """Query specification for the service list with the given filters and ordering"""
+        return FilteredQuery(
+            model=Service,
+            criteria=self.filter_criteria(**filters),
+            keyset=self.get_keyset(order_by=order_by, order_desc=order_desc)
+        )
+
+    def get_page_with_filters(
         self,
         db: Session,
         *,
-        search: Optional[str] = None,
-        category: Optional[str] = None,
-        is_active: Optional[bool] = None,
-        is_featured: Optional[bool] = None
-    ) -> int:
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        count_mode: CountMode = CountMode.WINDOW,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        **filters: Any
+    ) -> Page:
+        """Get a page of services and its total in as few queries as the count mode allows"""
+        return self.filtered_query(order_by=order_by, order_desc=order_desc, **filters).page(
+            db, skip=skip, limit=limit, cursor=cursor, count_mode=count_mode
+        )
+
+    def get_multi_with_filters(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        cursor: Optional[str] = None,
+        **filters: Any
+    ) -> List[Service]:
+        """Get services with filters and search"""
+        return self.filtered_query(order_by=order_by, order_desc=order_desc, **filters).items(
+            db, skip=skip, limit=limit, cursor=cursor
+        )
+
+    def get_count_with_filters(self, db: Session, **filters: Any) -> int:
         """Get count of services with filters"""
-        query = db.query(Service)
-        
-        # Apply same filters as get_multi_with_filters
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Service.name.ilike(search_term),
-                    Service.description.ilike(search_term),
-                    Service.short_description.ilike(search_term)
-                )
-            )
-        
-        if category:
-            query = query.filter(Service.category == category)
-        
-        if is_active is not None:
-            query = query.filter(Service.is_active == is_active)
-        
-        if is_featured is not None:
-            query = query.filter(Service.is_featured == is_featured)
-        
-        return query.count()
+        return FilteredQuery(model=Service, criteria=self.filter_criteria(**filters)).count(db)
 
     def update_image(
         self, db: Session, *, service_id: int, image_url: Optional[str]
@@ -143,25 +166,14 @@ class ServiceCRUD(CRUDBase[Service, ServiceCreate, ServiceUpdate]):
 
     def get_stats(self, db: Session) -> Dict[str, Any]:
         """Get service statistics"""
-        total_services = db.query(Service).count()
-        active_services = db.query(Service).filter(Service.is_active == True).count()
-        inactive_services = db.query(Service).filter(Service.is_active == False).count()
-        featured_services = db.query(Service).filter(Service.is_featured == True).count()
-        
-        # Services by category
-        category_stats = db.query(
-            Service.category,
-            func.count(Service.id).label('count')
-        ).group_by(Service.category).all()
-        
-        services_by_category = {stat.category: stat.count for stat in category_stats if stat.category}
-        
+        result = stats_engine.get(db, SERVICE_STATS)
         return {
-            "total_services": total_services,
-            "active_services": active_services,
-            "inactive_services": inactive_services,
-            "featured_services": featured_services,
-            "services_by_category": services_by_category
+            **result.totals,
+            "services_by_category": {
+                category: values["total_services"]
+                for category, values in result.groups.items()
+                if category and values["total_services"]
+            }
         }
 
     def search_services(
@@ -200,5 +212,10 @@ class ServiceCRUD(CRUDBase[Service, ServiceCreate, ServiceUpdate]):
             )
         ).order_by(desc(Service.order_position)).limit(limit).all()
 
+    def reorder_services(self, db: Session, *, service_ids: List[int]) -> Optional[List[Service]]:
+        """Set order positions so services list in the order of ``service_ids``; None if an id repeats"""
+        return SERVICE_ORDER.reorder(db, service_ids)
+
 
 service_crud = ServiceCRUD(Service)
+async_service_crud = AsyncCRUDBase(Service)
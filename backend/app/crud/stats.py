@@ -0,0 +1,306 @@
+"""
+Shared statistics engine for dashboard counters.
+
+Every counter of a table is computed in a single conditional-aggregation
+pass (optionally grouped by one column). When ``settings.stats_materialized``
+is enabled, results are kept in the ``stats_summary`` table and maintained
+incrementally from ORM flushes, so reads no longer scan the source table.
+Rows changed or deleted without their old values loaded (e.g. set on an
+instance expired by a commit) are read back just before the flush.
+Set-based UPDATE/DELETE statements cannot be replayed as deltas; they drop
+the summary of their table, which is rebuilt on the next read.
+"""
+import json
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import case, event, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import LoaderCallableStatus, Session
+
+from app.core.config import settings
+from app.models.stats import StatsSummary
+
+BUILT_MARKER = "__built__"
+
+
+@dataclass
+class Counter:
+    """Number of rows matching ``where`` (all rows when None)"""
+    name: str
+    where: Any = None
+    # Python equivalent of ``where`` evaluated against a row state dict;
+    # required for incremental maintenance of the materialized summary
+    match: Optional[Callable[[Dict[str, Any]], bool]] = None
+
+
+@dataclass
+class Sum:
+    """Sum of a numeric column"""
+    name: str
+    column: Any
+
+
+@dataclass
+class StatsSpec:
+    model: Any
+    counters: List[Counter]
+    sums: List[Sum] = field(default_factory=list)
+    group_by: Optional[str] = None
+
+    @property
+    def table_name(self) -> str:
+        return self.model.__tablename__
+
+    @property
+    def materializable(self) -> bool:
+        return all(
+            counter.where is None or counter.match is not None
+            for counter in self.counters
+        )
+
+
+@dataclass
+class StatsResult:
+    totals: Dict[str, int]
+    groups: Dict[Any, Dict[str, int]]
+
+
+def _empty(spec: StatsSpec) -> Dict[str, int]:
+    return {name: 0 for name in [c.name for c in spec.counters] + [s.name for s in spec.sums]}
+
+
+def _fold(spec: StatsSpec, groups: Dict[Any, Dict[str, int]]) -> StatsResult:
+    totals = _empty(spec)
+    for values in groups.values():
+        for name, value in values.items():
+            totals[name] += value
+    return StatsResult(totals=totals, groups=groups)
+
+
+class StatsEngine:
+    def __init__(self):
+        self.specs: Dict[str, StatsSpec] = {}
+
+    def register(self, spec: StatsSpec) -> StatsSpec:
+        """Register a spec so its summary table is maintained on writes"""
+        self.specs[spec.table_name] = spec
+        return spec
+
+    def compute(self, db: Session, spec: StatsSpec) -> StatsResult:
+        """Compute every counter of the spec in one aggregate query"""
+        columns = []
+        for counter in spec.counters:
+            if counter.where is None:
+                columns.append(func.count().label(counter.name))
+            else:
+                columns.append(func.sum(case((counter.where, 1), else_=0)).label(counter.name))
+        for total in spec.sums:
+            columns.append(func.sum(total.column).label(total.name))
+
+        if spec.group_by:
+            group_column = getattr(spec.model, spec.group_by)
+            rows = db.execute(
+                select(group_column.label("group_key"), *columns)
+                .select_from(spec.model)
+                .group_by(group_column)
+            ).mappings().all()
+        else:
+            rows = db.execute(select(*columns).select_from(spec.model)).mappings().all()
+
+        groups = {}
+        for row in rows:
+            values = _empty(spec)
+            for name in values:
+                values[name] = int(row[name] or 0)
+            groups[row["group_key"] if spec.group_by else None] = values
+        return _fold(spec, groups)
+
+    def get(self, db: Session, spec: StatsSpec) -> StatsResult:
+        """Read stats from the materialized summary when enabled, otherwise compute them"""
+        if not (settings.stats_materialized and spec.materializable):
+            return self.compute(db, spec)
+
+        rows = db.query(StatsSummary).filter(StatsSummary.table_name == spec.table_name).all()
+        if not any(row.counter == BUILT_MARKER for row in rows):
+            return self.rebuild(db, spec)
+
+        groups: Dict[Any, Dict[str, int]] = {}
+        for row in rows:
+            if row.counter == BUILT_MARKER:
+                continue
+            values = groups.setdefault(json.loads(row.group_key), _empty(spec))
+            if row.counter in values:
+                values[row.counter] = int(row.value)
+        return _fold(spec, groups)
+
+    def rebuild(self, db: Session, spec: StatsSpec) -> StatsResult:
+        """Recompute the summary of one table from scratch"""
+        result = self.compute(db, spec)
+        db.query(StatsSummary).filter(StatsSummary.table_name == spec.table_name).delete(
+            synchronize_session=False
+        )
+        deltas = {
+            (group_key, name): value
+            for group_key, values in result.groups.items()
+            for name, value in values.items()
+        }
+        deltas[(None, BUILT_MARKER)] = 1
+        self._apply_deltas(db, spec.table_name, deltas)
+        db.commit()
+        return result
+
+    # Incremental maintenance
+
+    def _contributions(self, spec: StatsSpec, state: Dict[str, Any]) -> Dict[tuple, int]:
+        group_key = state.get(spec.group_by) if spec.group_by else None
+        contributions = {}
+        for counter in spec.counters:
+            if counter.where is None or counter.match(state):
+                contributions[(group_key, counter.name)] = 1
+        for total in spec.sums:
+            contributions[(group_key, total.name)] = state.get(total.column.key) or 0
+        return contributions
+
+    @staticmethod
+    def _state(obj: Any, previous: bool, stored: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Current or pre-flush column values of an instance; ``stored`` is the row read before the flush"""
+        if previous and stored is not None:
+            return dict(stored)
+        state = {}
+        for attr in inspect(obj).mapper.column_attrs:
+            value = getattr(obj, attr.key, None)
+            if previous:
+                history = inspect(obj).attrs[attr.key].history
+                if history.deleted:
+                    value = history.deleted[0]
+            state[attr.key] = value
+        return state
+
+    def _is_built(self, db: Session, table_name: str) -> bool:
+        return db.connection().execute(
+            select(StatsSummary.value).where(
+                StatsSummary.table_name == table_name,
+                StatsSummary.counter == BUILT_MARKER
+            )
+        ).first() is not None
+
+    def _apply_deltas(self, db: Session, table_name: str, deltas: Dict[tuple, int]) -> None:
+        dialect = db.connection().dialect.name
+        insert = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}.get(dialect)
+        table = StatsSummary.__table__
+        for (group_key, counter), delta in deltas.items():
+            if not delta:
+                continue
+            key = {"table_name": table_name, "group_key": json.dumps(group_key), "counter": counter}
+            if insert is not None:
+                statement = insert(table).values(**key, value=delta)
+                db.connection().execute(statement.on_conflict_do_update(
+                    index_elements=["table_name", "group_key", "counter"],
+                    set_={"value": table.c.value + statement.excluded.value}
+                ))
+                continue
+            updated = db.connection().execute(
+                table.update()
+                .where(*[table.c[name] == value for name, value in key.items()])
+                .values(value=table.c.value + delta)
+            ).rowcount
+            if not updated:
+                db.connection().execute(table.insert().values(**key, value=delta))
+
+    def apply_deltas(self, db: Session, spec: StatsSpec, deltas: Dict[tuple, int]) -> None:
+        """Apply ``(group_key, counter)`` deltas for writes made outside ORM flushes"""
+        if settings.stats_materialized and spec.materializable and self._is_built(db, spec.table_name):
+            self._apply_deltas(db, spec.table_name, deltas)
+
+    @staticmethod
+    def _old_values_unloaded(obj: Any) -> bool:
+        instance = inspect(obj)
+        if any(value is LoaderCallableStatus.NO_VALUE for value in instance.committed_state.values()):
+            return True
+        return any(attr.key in instance.unloaded for attr in instance.mapper.column_attrs)
+
+    def before_flush(self, session: Session) -> None:
+        """Read the stored row of changed or deleted instances whose old values were never loaded"""
+        stored = session.info.setdefault("stats_stored", {})
+        for obj in list(session.dirty) + list(session.deleted):
+            if getattr(obj, "__tablename__", None) not in self.specs or not self._old_values_unloaded(obj):
+                continue
+            instance = inspect(obj)
+            mapper = instance.mapper
+            row = session.connection().execute(
+                select(mapper.local_table).where(
+                    *[column == value for column, value in zip(mapper.primary_key, instance.identity)]
+                )
+            ).mappings().first()
+            if row is not None:
+                stored[instance] = {attr.key: row[attr.columns[0].key] for attr in mapper.column_attrs}
+
+    def after_flush(self, session: Session) -> None:
+        deltas: Dict[str, Dict[tuple, int]] = {}
+        stored = session.info.pop("stats_stored", {})
+
+        def add(spec: StatsSpec, contributions: Dict[tuple, int], sign: int) -> None:
+            table_deltas = deltas.setdefault(spec.table_name, {})
+            for key, value in contributions.items():
+                table_deltas[key] = table_deltas.get(key, 0) + sign * value
+
+        for obj in session.new:
+            spec = self.specs.get(getattr(obj, "__tablename__", None))
+            if spec is not None:
+                add(spec, self._contributions(spec, self._state(obj, previous=False)), 1)
+        for obj in session.dirty:
+            spec = self.specs.get(getattr(obj, "__tablename__", None))
+            if spec is not None and session.is_modified(obj):
+                previous = self._state(obj, previous=True, stored=stored.get(inspect(obj)))
+                add(spec, self._contributions(spec, previous), -1)
+                add(spec, self._contributions(spec, self._state(obj, previous=False)), 1)
+        for obj in session.deleted:
+            spec = self.specs.get(getattr(obj, "__tablename__", None))
+            if spec is not None:
+                previous = self._state(obj, previous=True, stored=stored.get(inspect(obj)))
+                add(spec, self._contributions(spec, previous), -1)
+
+        for table_name, table_deltas in deltas.items():
+            if self._is_built(session, table_name):
+                self._apply_deltas(session, table_name, table_deltas)
+
+
+stats_engine = StatsEngine()
+
+
+@event.listens_for(Session, "before_flush")
+def _read_unloaded_rows(session, flush_context, instances):
+    if settings.stats_materialized and stats_engine.specs:
+        stats_engine.before_flush(session)
+
+
+@event.listens_for(Session, "after_flush")
+def _maintain_stats_summary(session, flush_context):
+    if settings.stats_materialized and stats_engine.specs:
+        stats_engine.after_flush(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_stats_tables(orm_execute_state):
+    if not settings.stats_materialized:
+        return
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.local_table.name in stats_engine.specs:
+            orm_execute_state.session.info.setdefault("stats_stale", set()).add(mapper.local_table.name)
+
+
+@event.listens_for(Session, "before_commit")
+def _drop_stale_summaries(session):
+    stale = session.info.pop("stats_stale", None)
+    if stale:
+        session.connection().execute(
+            StatsSummary.__table__.delete().where(StatsSummary.table_name.in_(sorted(stale)))
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stale_summaries(session):
+    session.info.pop("stats_stale", None)
+    session.info.pop("stats_stored", None)
@@ -0,0 +1,110 @@
+import json
+import re
+from typing import Iterable, List, Optional, Sequence
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.crud.base import CRUDBase
+from app.models.news import News
+from app.models.tag import Tag, news_tags
+from app.schemas.tag import TagCreate
+
+
+def _clean(name: str) -> str:
+    return re.sub(r"\s+", " ", name).strip()[:100]
+
+
+def normalize_tag(name: str) -> str:
+    """Lookup key of a tag: case and whitespace insensitive"""
+    return _clean(name).lower()
+
+
+def parse_tags(value: Optional[str]) -> List[str]:
+    """Tag names in a tags string, which is a JSON array or comma separated (as the admin form writes it)"""
+    if not value:
+        return []
+    try:
+        parsed = json.loads(value)
+    except ValueError:
+        parsed = None
+    names = [str(name) for name in parsed] if isinstance(parsed, list) else value.split(",")
+    unique = {}
+    for name in names:
+        name = _clean(name)
+        if name and normalize_tag(name) not in unique:
+            unique[normalize_tag(name)] = name
+    return list(unique.values())
+
+
+def tag_filter(tags: Sequence[str], match_all: bool = False):
+    """Criterion selecting news tagged with any (or, with ``match_all``, every one) of ``tags``"""
+    slugs = sorted({normalize_tag(tag) for tag in tags if normalize_tag(tag)})
+    tagged = (
+        select(news_tags.c.news_id)
+        .join(Tag, Tag.id == news_tags.c.tag_id)
+        .where(Tag.slug.in_(slugs))
+    )
+    if match_all:
+        tagged = tagged.group_by(news_tags.c.news_id).having(func.count() == len(slugs))
+    return News.id.in_(tagged)
+
+
+class CRUDTag(CRUDBase[Tag, TagCreate, TagCreate]):
+    def get_by_slugs(self, db: Session, slugs: Iterable[str]) -> List[Tag]:
+        return db.query(Tag).filter(Tag.slug.in_(list(slugs))).all()
+
+    def get_or_create(self, db: Session, names: Sequence[str]) -> List[Tag]:
+        """
+        Tags for ``names``, creating missing ones in their own short transaction
+        so concurrent writers of the same new tag do not fail each other.
+        Call before the caller's transaction has written anything.
+        """
+        by_slug = {normalize_tag(name): name for name in names}
+        if not by_slug:
+            return []
+        missing = set(by_slug) - {tag.slug for tag in self.get_by_slugs(db, by_slug)}
+        if missing:
+            with Session(bind=db.get_bind()) as tag_db:
+                for slug in sorted(missing):
+                    tag_db.add(Tag(name=by_slug[slug], slug=slug, news_count=0, published_count=0))
+                    try:
+                        tag_db.commit()
+                    except IntegrityError:
+                        # Another writer created it first
+                        tag_db.rollback()
+        tags = {tag.slug: tag for tag in self.get_by_slugs(db, by_slug)}
+        return [tags[slug] for slug in by_slug]
+
+    def tag_ids_for_news(self, db: Session, news_ids: Sequence[int]) -> List[int]:
+        return [
+            tag_id for tag_id, in db.query(news_tags.c.tag_id).filter(
+                news_tags.c.news_id.in_(list(news_ids))
+            ).distinct()
+        ]
+
+    def refresh_counts(self, db: Session, tag_ids: Iterable[int]) -> None:
+        """Recount the articles of the given tags inside the caller's transaction"""
+        tag_ids = sorted(set(tag_ids))
+        if not tag_ids:
+            return
+        db.flush()
+        tagged = select(func.count()).select_from(news_tags).where(news_tags.c.tag_id == Tag.id)
+        published = (
+            select(func.count())
+            .select_from(news_tags.join(News, News.id == news_tags.c.news_id))
+            .where(news_tags.c.tag_id == Tag.id, *News.public_criteria())
+        )
+        db.execute(
+            update(Tag)
+            .where(Tag.id.in_(tag_ids))
+            .values(news_count=tagged.scalar_subquery(), published_count=published.scalar_subquery())
+            .execution_options(synchronize_session=False)
+        )
+
+    def get_cloud(self, db: Session, *, limit: int = 50, published_only: bool = True) -> List[Tag]:
+        """Most used tags, from the precomputed counts"""
+        count = Tag.published_count if published_only else Tag.news_count
+        return db.query(Tag).filter(count > 0).order_by(count.desc(), Tag.name).limit(limit).all()
+
+
+tag = CRUDTag(Tag)
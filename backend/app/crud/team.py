@@ -2,9 +2,12 @@ from typing import List, Optional, Union
 from sqlalchemy.orm import Session
 from sqlalchemy import asc, desc
 from app.crud.base import CRUDBase
+from app.crud.ordering import OrderedCollection
 from app.models.team import TeamMember
 from app.schemas.team import TeamMemberCreate, TeamMemberUpdate
 
+TEAM_ORDER = OrderedCollection(TeamMember, TeamMember.order_position)
+
 
 class CRUDTeamMember(CRUDBase[TeamMember, TeamMemberCreate, TeamMemberUpdate]):
     def get_all_members(
@@ -46,17 +49,14 @@ class CRUDTeamMember(CRUDBase[TeamMember, TeamMemberCreate, TeamMemberUpdate]):
         return db.query(TeamMember).filter(TeamMember.is_active == True).count()
 
     def update_order_positions(self, db: Session, member_orders: List[dict]) -> bool:
-        """Update order positions for multiple team members"""
+        """Update order positions for multiple team members in one statement"""
         try:
-            for item in member_orders:
-                member_id = item.get("id")
-                new_position = item.get("order_position")
-                
-                if member_id and new_position is not None:
-                    db.query(TeamMember).filter(TeamMember.id == member_id).update(
-                        {"order_position": new_position}
-                    )
-            
+            positions = {
+                int(item["id"]): int(item["order_position"])
+                for item in member_orders
+                if item.get("id") and item.get("order_position") is not None
+            }
+            TEAM_ORDER.set_positions(db, positions)
             db.commit()
             return True
         except Exception:
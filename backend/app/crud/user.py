@@ -1,11 +1,23 @@
 from typing import Optional, Dict, Any, Union
 from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
+from app.crud.stats import Counter, StatsSpec, stats_engine
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 from app.core.security import get_password_hash, verify_password
 
 
+USER_STATS = stats_engine.register(StatsSpec(
+    model=User,
+    counters=[
+        Counter("total_users", None),
+        Counter("active_users", User.is_active == True, lambda row: row["is_active"] is True),
+        Counter("inactive_users", User.is_active == False, lambda row: row["is_active"] is False),
+        Counter("admin_users", User.role == "admin", lambda row: row["role"] == "admin"),
+    ],
+))
+
+
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     def get_by_email(self, db: Session, *, email: str) -> Optional[User]:
         """Get user by email"""
@@ -66,5 +78,9 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         """Check if user is superuser/admin"""
         return str(user.role) == "admin"
 
+    def get_stats(self, db: Session) -> Dict[str, int]:
+        """Get user statistics"""
+        return stats_engine.get(db, USER_STATS).totals
+
 
 user_crud = CRUDUser(User)
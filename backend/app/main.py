@@ -1,21 +1,37 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
 import os
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine, async_engine, Base, SessionLocal
 from app.api.routes import api_router
+from app.api import images
+from app.core.compression import CompressionMiddleware, compression_stats
+from app.core.pagination import InvalidCursorError
+from app.core.serialization import FastJSONResponse
+from app.core.static_files import NegotiatingStaticFiles, StorageRedirect, hot_files
+from app.core.storage import storage
+from app.core.replicas import remember_write, replica_router
+from app.core.image_workers import image_workers
+from app.services.search_index import search_index
+from app.services.view_counter import view_counter
 
 # Create tables
 Base.metadata.create_all(bind=engine)
 
+# Create the full-text search index and populate it on first start
+if search_index.ensure_schema(engine):
+    with SessionLocal() as db:
+        search_index.rebuild(db)
+
 # Create FastAPI app
 app = FastAPI(
     title="CMS API",
     description="Content Management System API for Company Website",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware - simplified configuration
@@ -36,15 +52,60 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    """Reject malformed or tampered pagination cursors"""
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """Keep a client's public reads on the primary right after it writes"""
+    response = await call_next(request)
+    remember_write(request, response)
+    return response
+
+app.add_middleware(
+    CompressionMiddleware,
+    enabled=settings.compression_enabled,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
+    exclude_paths=settings.compression_exclude_paths,
+    stream_threshold=settings.compression_stream_threshold,
+    stats=compression_stats,
+)
+
+@app.on_event("startup")
+async def start_background_services():
+    """Check read replicas before serving and start the image workers and view flushes"""
+    await replica_router.start()
+    image_workers.start()
+    await view_counter.start()
+
+@app.on_event("shutdown")
+async def release_resources():
+    """Flush buffered views, then close pooled connections and image worker processes"""
+    await view_counter.stop()
+    await replica_router.stop()
+    await async_engine.dispose()
+    image_workers.shutdown()
+
 # Include API routes
 app.include_router(api_router, prefix="/api")
 
+# On-the-fly image transforms over the uploads folder
+app.include_router(images.router, prefix="/img", tags=["images"])
+
 # Create uploads directory if it doesn't exist
 os.makedirs(settings.upload_folder, exist_ok=True)
 
-# Mount static files
-app.mount("/static", StaticFiles(directory=settings.upload_folder), name="static")
-app.mount("/uploads", StaticFiles(directory=settings.upload_folder), name="uploads")
+# Mount static files; remote storage serves them directly via redirects
+if storage.is_local:
+    static_files = NegotiatingStaticFiles(directory=settings.upload_folder, hot_cache=hot_files)
+else:
+    static_files = StorageRedirect(storage)
+app.mount("/static", static_files, name="static")
+app.mount("/uploads", static_files, name="uploads")
 
 # Include routers (we'll create these next)
 # from app.api.v1 import auth, dashboard, hero_banner, products, services, news, team, contact, users, logs
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class Blob(Base):
+    __tablename__ = "blobs"
+
+    path = Column(String(500), primary_key=True)  # relative to the upload folder
+    sha256 = Column(String(64), nullable=False, index=True)
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String(100), nullable=True)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
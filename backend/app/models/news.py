@@ -1,6 +1,12 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime
+import json
+from datetime import timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.models.tag import Tag, news_tags
 
 
 class News(Base):
@@ -13,9 +19,8 @@ class News(Base):
     content = Column(Text, nullable=False)
     author = Column(String(255))
     category = Column(String(100))
-    tags = Column(Text)  # JSON string
+    tags = Column(Text)  # as written by clients; normalized into tag_items on every write
     featured_image_url = Column(String(500))
-    attachments = Column(Text)  # JSON string for file attachments
     is_published = Column(Boolean, default=False)
     is_featured = Column(Boolean, default=False)
     views_count = Column(Integer, default=0)
@@ -28,3 +33,77 @@ class News(Base):
     published_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Loaded with one extra SELECT ... IN per query, so list pages never load them row by row
+    attachment_items = relationship(
+        "NewsAttachment",
+        order_by="NewsAttachment.uploaded_at",
+        lazy="selectin",
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+
+    # Only used when tags are written; responses show the tags column
+    tag_items = relationship(Tag, secondary=news_tags)
+
+    @classmethod
+    def public_criteria(cls) -> list:
+        """Published regular news, as listed on the public site (announcements have their own lists)"""
+        return [cls.is_published == True, cls.category != 'announcement']
+
+    @property
+    def attachments(self) -> Optional[str]:
+        """Attachments as the JSON string the API has always returned"""
+        if not self.attachment_items:
+            return None
+        return json.dumps([item.to_dict() for item in self.attachment_items])
+
+
+class NewsAttachment(Base):
+    __tablename__ = "news_attachments"
+    __table_args__ = (
+        Index("ix_news_attachments_news_id_uploaded_at", "news_id", "uploaded_at"),
+    )
+
+    id = Column(String(36), primary_key=True)  # uuid4, the id clients delete by
+    news_id = Column(Integer, ForeignKey("news.id", ondelete="CASCADE"), nullable=False)
+    original_filename = Column(String(255), nullable=False)
+    saved_filename = Column(String(255))
+    file_path = Column(String(500), nullable=False)
+    file_size = Column(BigInteger)
+    file_type = Column(String(100))
+    file_extension = Column(String(20))
+    sha256 = Column(String(64))
+    download_url = Column(String(500))
+    uploaded_at = Column(DateTime(timezone=True), nullable=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        uploaded_at = self.uploaded_at
+        if uploaded_at is not None and uploaded_at.tzinfo is None:
+            # SQLite hands timestamps back naive; they are stored in UTC
+            uploaded_at = uploaded_at.replace(tzinfo=timezone.utc)
+        return {
+            "id": self.id,
+            "original_filename": self.original_filename,
+            "saved_filename": self.saved_filename,
+            "file_path": self.file_path,
+            "file_size": self.file_size,
+            "file_type": self.file_type,
+            "file_extension": self.file_extension,
+            "sha256": self.sha256,
+            "uploaded_at": uploaded_at.isoformat() if uploaded_at else None,
+            "download_url": self.download_url
+        }
+
+
+class NewsViewBucket(Base):
+    """Views of an article in one hour, day or month; hours are rolled up into days and days into months"""
+    __tablename__ = "news_view_buckets"
+    __table_args__ = (
+        Index("ix_news_view_buckets_granularity_start", "granularity", "bucket_start"),
+    )
+
+    news_id = Column(Integer, ForeignKey("news.id", ondelete="CASCADE"), primary_key=True)
+    granularity = Column(String(5), primary_key=True)  # hour, day, month
+    bucket_start = Column(DateTime, primary_key=True)  # naive UTC
+    views = Column(BigInteger, nullable=False, default=0)
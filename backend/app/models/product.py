@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, DECIMAL
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, DECIMAL, ForeignKey, Index
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -15,9 +16,37 @@ class Product(Base):
     features = Column(Text)  # JSON string
     specifications = Column(Text)  # JSON string
     image_url = Column(String(500))
-    gallery_images = Column(Text)  # JSON string of image URLs
     is_featured = Column(Boolean, default=False)
     is_active = Column(Boolean, default=True)
     order_position = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Loaded with one extra SELECT ... IN per query, so list pages never load them row by row
+    gallery = relationship(
+        "ProductImage",
+        order_by="[ProductImage.position, ProductImage.id]",
+        lazy="selectin",
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+
+    @property
+    def gallery_images(self):
+        """Gallery URLs as the comma-separated string the API has always returned"""
+        if not self.gallery:
+            return None
+        return ",".join(image.image_url for image in self.gallery)
+
+
+class ProductImage(Base):
+    __tablename__ = "product_images"
+    __table_args__ = (
+        Index("ix_product_images_product_id_position", "product_id", "position"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    image_url = Column(String(500), nullable=False)
+    position = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class StatsSummary(Base):
+    __tablename__ = "stats_summary"
+
+    table_name = Column(String(50), primary_key=True)
+    group_key = Column(String(255), primary_key=True)  # JSON encoded group value
+    counter = Column(String(50), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
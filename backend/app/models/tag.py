@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Table
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+# news <-> tags association; the primary key serves news -> tags lookups,
+# the (tag_id, news_id) index serves tag filters
+news_tags = Table(
+    "news_tags",
+    Base.metadata,
+    Column("news_id", Integer, ForeignKey("news.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_news_tags_tag_id_news_id", "tag_id", "news_id"),
+)
+
+
+class Tag(Base):
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False)  # as first written
+    slug = Column(String(100), unique=True, index=True, nullable=False)  # normalized, used for lookups
+    # Maintained on every write that changes a tag's articles or their published state
+    news_count = Column(Integer, nullable=False, default=0)
+    published_count = Column(Integer, nullable=False, default=0)  # articles matching News.public_criteria()
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr, HttpUrl
+from pydantic import BaseModel, EmailStr, HttpUrl, computed_field
 from typing import Optional
 from datetime import datetime
+from app.schemas.image import ImageVariants, image_variants_for
 
 
 class CompanyBase(BaseModel):
@@ -44,3 +45,13 @@ class Company(CompanyBase):
 
     class Config:
         from_attributes = True
+
+    @computed_field
+    @property
+    def logo_variants(self) -> Optional[ImageVariants]:
+        return image_variants_for(self.logo_url)
+
+    @computed_field
+    @property
+    def about_image_variants(self) -> Optional[ImageVariants]:
+        return image_variants_for(self.about_image_url)
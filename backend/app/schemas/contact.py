@@ -2,6 +2,8 @@ from typing import Optional, List, Union
 from datetime import datetime
 from pydantic import BaseModel, EmailStr
 
+from app.core.pagination import CountMode
+
 
 class ContactBase(BaseModel):
     name: str
@@ -55,10 +57,12 @@ class ContactResponse(Contact):
 
 class ContactListResponse(BaseModel):
     items: List[Contact]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
     
     class Config:
         from_attributes = True
@@ -75,6 +79,8 @@ class ContactFilters(BaseModel):
     end_date: Optional[datetime] = None
     order_by: Optional[str] = "created_at"
     order_desc: Optional[bool] = True
+    cursor: Optional[str] = None
+    count_mode: CountMode = CountMode.WINDOW
 
 
 class ContactStats(BaseModel):
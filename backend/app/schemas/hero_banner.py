@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Optional
 from pydantic import BaseModel
+from app.schemas.image import ImageVariantsMixin
 
 
 class HeroBannerBase(BaseModel):
@@ -38,7 +39,7 @@ class HeroBannerResponse(HeroBannerBase):
         from_attributes = True
 
 
-class HeroBanner(HeroBannerBase):
+class HeroBanner(HeroBannerBase, ImageVariantsMixin):
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
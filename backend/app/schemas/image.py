@@ -0,0 +1,32 @@
+from typing import Dict, List, Optional
+from pydantic import BaseModel, computed_field
+from app.utils.file_upload import get_image_variants
+
+
+class ImageRendition(BaseModel):
+    url: str
+    width: int
+    height: int
+    bytes: int
+
+
+class ImageVariants(BaseModel):
+    """Renditions of an uploaded image by format, smallest first, with srcset strings"""
+    width: int
+    height: int
+    formats: Dict[str, List[ImageRendition]]
+    srcset: Dict[str, str]
+
+
+def image_variants_for(image_url: Optional[str]) -> Optional[ImageVariants]:
+    variants = get_image_variants(image_url)
+    return ImageVariants(**variants) if variants else None
+
+
+class ImageVariantsMixin(BaseModel):
+    """Adds the renditions of ``image_url`` to a response schema"""
+
+    @computed_field
+    @property
+    def image_variants(self) -> Optional[ImageVariants]:
+        return image_variants_for(getattr(self, "image_url", None))
@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, computed_field, validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
 import re
+from app.schemas.image import ImageVariants, image_variants_for
 
 
 class NewsBase(BaseModel):
@@ -12,7 +13,7 @@ class NewsBase(BaseModel):
     category: Optional[str] = Field(None, max_length=100, description="News category")
     tags: Optional[str] = Field(None, description="Tags (JSON string)")
     featured_image_url: Optional[str] = Field(None, max_length=500, description="Featured image URL")
-    attachments: Optional[str] = Field(None, description="File attachments (JSON string)")
+    attachments: Optional[str] = Field(None, description="File attachments (JSON string, read-only; managed by the upload endpoints)")
     is_published: Optional[bool] = Field(False, description="Is published")
     is_featured: Optional[bool] = Field(False, description="Is featured news")
     published_at: Optional[datetime] = Field(None, description="Publication date")
@@ -63,7 +64,6 @@ class NewsUpdate(BaseModel):
     category: Optional[str] = Field(None, max_length=100)
     tags: Optional[str] = None
     featured_image_url: Optional[str] = Field(None, max_length=500)
-    attachments: Optional[str] = None
     is_published: Optional[bool] = None
     is_featured: Optional[bool] = None
     published_at: Optional[datetime] = None
@@ -106,13 +106,20 @@ class NewsResponse(NewsBase):
     class Config:
         from_attributes = True
 
+    @computed_field
+    @property
+    def featured_image_variants(self) -> Optional[ImageVariants]:
+        return image_variants_for(self.featured_image_url)
+
 
 class NewsListResponse(BaseModel):
     items: List[NewsResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
 
 
 class NewsStatsResponse(BaseModel):
@@ -128,6 +135,73 @@ class NewsStatsResponse(BaseModel):
     categories: List[dict]
 
 
+class NewsBulkFilter(BaseModel):
+    """The news list filters, selecting the articles a bulk action applies to"""
+    search: Optional[str] = None
+    category: Optional[str] = None
+    author: Optional[str] = None
+    is_published: Optional[bool] = None
+    is_featured: Optional[bool] = None
+    priority: Optional[str] = None
+    is_sticky: Optional[bool] = None
+    tags: Optional[List[str]] = None
+    tag_match: str = Field("any", pattern="^(any|all)$", description="Match any or all of the tags")
+    all: bool = Field(False, description="Must be true to select every article with no filter set")
+
+    def criteria_filters(self) -> dict:
+        """Keyword arguments for NewsCRUD.filter_criteria"""
+        filters = self.dict(exclude={"tag_match", "all"})
+        filters["match_all_tags"] = self.tag_match == "all"
+        return filters
+
+    def is_empty(self) -> bool:
+        # False is a filter; None, "" and [] are not
+        return all(value in (None, "", []) for value in self.dict(exclude={"tag_match", "all"}).values())
+
+
+class NewsBulkAction(BaseModel):
+    action: str = Field(..., pattern="^(publish|unpublish|feature|unfeature|stick|unstick|delete)$")
+    ids: Optional[List[int]] = Field(None, description="Articles to act on")
+    filter: Optional[NewsBulkFilter] = Field(None, description="Act on every article matching these filters instead")
+    expected_count: Optional[int] = Field(
+        None, ge=0, description="Required when deleting by filter: how many articles the filter matches"
+    )
+
+    @validator('filter', always=True)
+    def validate_target(cls, v, values):
+        if (v is None) == (values.get('ids') is None):
+            raise ValueError('Give either ids or filter')
+        if v is not None and v.is_empty() and not v.all:
+            raise ValueError('Set at least one filter, or all: true to select every article')
+        return v
+
+    @validator('expected_count', always=True)
+    def validate_expected_count(cls, v, values):
+        if v is None and values.get('action') == 'delete' and values.get('filter') is not None:
+            raise ValueError('expected_count is required when deleting by filter')
+        return v
+
+
+class NewsBulkResult(BaseModel):
+    action: str
+    matched: int
+    affected: int
+
+
+class NewsViewBucketResponse(BaseModel):
+    granularity: str
+    bucket_start: datetime
+    views: int
+
+    class Config:
+        from_attributes = True
+
+    @validator('bucket_start')
+    def mark_utc(cls, v):
+        # Buckets are stored as naive UTC
+        return v.replace(tzinfo=timezone.utc) if v.tzinfo is None else v
+
+
 # Announcement schemas (extending news with announcement-specific fields)
 class AnnouncementBase(NewsBase):
     priority: Optional[str] = Field("normal", description="Announcement priority: low, normal, high, urgent")
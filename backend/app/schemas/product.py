@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
+from app.schemas.image import ImageVariantsMixin
 
 
 class ProductBase(BaseModel):
@@ -12,7 +13,7 @@ class ProductBase(BaseModel):
     features: Optional[str] = None
     specifications: Optional[str] = None
     image_url: Optional[str] = None
-    gallery_images: Optional[str] = None
+    gallery_images: Optional[str] = None  # read-only, comma-separated; managed by the gallery endpoints
     is_featured: bool = False
     is_active: bool = True
     order_position: int = 0
@@ -31,7 +32,6 @@ class ProductUpdate(BaseModel):
     features: Optional[str] = None
     specifications: Optional[str] = None
     image_url: Optional[str] = None
-    gallery_images: Optional[str] = None
     is_featured: Optional[bool] = None
     is_active: Optional[bool] = None
     order_position: Optional[int] = None
@@ -46,10 +46,29 @@ class ProductResponse(ProductBase):
         from_attributes = True
 
 
-class Product(ProductBase):
+class Product(ProductBase, ImageVariantsMixin):
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
+
+
+class ProductImageResponse(BaseModel):
+    id: int
+    image_url: str
+    position: int
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class GalleryOrder(BaseModel):
+    image_ids: List[int]
+
+
+class ProductReorderRequest(BaseModel):
+    """Product ids in their new display order"""
+    product_ids: List[int]
@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field, validator
 from typing import Optional, List
 from datetime import datetime
 from decimal import Decimal
+from app.schemas.image import ImageVariantsMixin
 
 
 class ServiceBase(BaseModel):
@@ -48,7 +49,7 @@ class ServiceStatusUpdate(BaseModel):
     is_active: bool
 
 
-class ServiceResponse(ServiceBase):
+class ServiceResponse(ServiceBase, ImageVariantsMixin):
     id: int
     image_url: Optional[str] = None
     created_at: datetime
@@ -92,6 +93,11 @@ class ServicesListResponse(BaseModel):
     pages: int
 
 
+class ServiceReorderRequest(BaseModel):
+    """Service ids in their new display order, first shown first"""
+    service_ids: List[int]
+
+
 class ServiceStatsResponse(BaseModel):
     total_services: int
     active_services: int
@@ -0,0 +1,28 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class TagBase(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+
+
+class TagCreate(TagBase):
+    pass
+
+
+class TagResponse(TagBase):
+    id: int
+    slug: str
+    news_count: int
+    published_count: int
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class TagCloudEntry(BaseModel):
+    name: str
+    slug: str
+    count: int
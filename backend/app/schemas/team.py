@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import datetime
+from app.schemas.image import ImageVariantsMixin
 
 
 class TeamMemberBase(BaseModel):
@@ -35,7 +36,7 @@ class TeamMemberUpdate(BaseModel):
     image_url: Optional[str] = None
 
 
-class TeamMember(TeamMemberBase):
+class TeamMember(TeamMemberBase, ImageVariantsMixin):
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -0,0 +1,259 @@
+"""
+On-the-fly image transforms with a bounded disk cache.
+
+``/img/{path}`` resizes, crops and re-encodes images from upload storage.
+Results are cached on disk under a key derived from the source content and
+the transform parameters, so identical files share entries and a replaced
+file never serves a stale result. The cache is kept under
+``image_cache_max_bytes`` by evicting least recently used entries, and
+concurrent requests for the same missing entry wait on a single transform.
+"""
+import asyncio
+import hashlib
+import os
+import posixpath
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from PIL import Image, ImageOps
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.image_workers import image_workers
+from app.core.storage import storage
+from app.utils.file_upload import ALLOWED_EXTENSIONS, VARIANT_FORMATS
+
+FITS = ("inside", "contain", "cover", "fill")
+OUTPUT_FORMATS = {
+    "jpeg": ("image/jpeg", ".jpg", "JPEG"),
+    "webp": ("image/webp", ".webp", "WEBP"),
+    "avif": ("image/avif", ".avif", "AVIF"),
+    "png": ("image/png", ".png", "PNG"),
+}
+MAX_DIMENSION = 4096
+
+
+@dataclass(frozen=True)
+class Transform:
+    width: Optional[int]
+    height: Optional[int]
+    fit: str
+    format: str
+    quality: int
+
+    @property
+    def media_type(self) -> str:
+        return OUTPUT_FORMATS[self.format][0]
+
+    @property
+    def extension(self) -> str:
+        return OUTPUT_FORMATS[self.format][1]
+
+    def fingerprint(self) -> str:
+        return f"w={self.width or ''};h={self.height or ''};fit={self.fit};fmt={self.format};q={self.quality}"
+
+
+def transform_image(source_path: str, destination_path: str, transform: Transform) -> None:
+    """Resize and encode source_path into destination_path (runs in the image workers)"""
+    partial_path = f"{destination_path}.part"
+    try:
+        with Image.open(source_path) as original:
+            image = ImageOps.exif_transpose(original)
+            image.load()
+        width, height = transform.width, transform.height
+        if width and height and transform.fit == "cover":
+            image = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+        elif width and height and transform.fit == "contain":
+            image = ImageOps.pad(image.convert("RGBA"), (width, height), Image.Resampling.LANCZOS, color=(255, 255, 255, 0))
+        elif width and height and transform.fit == "fill":
+            image = image.resize((width, height), Image.Resampling.LANCZOS)
+        elif width or height:
+            # inside: scale down to fit the given box, never up
+            image.thumbnail((width or image.width, height or image.height), Image.Resampling.LANCZOS)
+
+        pillow_format = OUTPUT_FORMATS[transform.format][2]
+        if pillow_format == "JPEG" and image.mode != "RGB":
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            rgba = image.convert("RGBA")
+            background.paste(rgba, mask=rgba.split()[-1])
+            image = background
+        options: Dict[str, Any] = {}
+        if transform.format in VARIANT_FORMATS:
+            options = dict(VARIANT_FORMATS[transform.format][2])
+            options["quality"] = transform.quality
+        elif pillow_format == "PNG":
+            options = {"optimize": True}
+        image.save(partial_path, format=pillow_format, **options)
+        os.replace(partial_path, destination_path)
+    except Exception:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TransformCache:
+    """LRU-bounded disk cache of transformed images with request coalescing"""
+
+    def __init__(self, directory: str, max_bytes: int, max_digests: int = 4096):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_digests = max_digests
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._digests: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        """Index entries left by earlier runs, oldest first"""
+        found = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".part"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat_result = os.stat(path)
+                except OSError:
+                    continue
+                found.append((stat_result.st_mtime, name, stat_result.st_size))
+        for _, name, size in sorted(found):
+            self._entries[name] = size
+            self._bytes += size
+        self._loaded = True
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name[:2], name)
+
+    async def _source_digest(self, source_path: str) -> str:
+        stat_result = await run_in_threadpool(os.stat, source_path)
+        identity = (source_path, stat_result.st_size, stat_result.st_mtime_ns)
+        with self._lock:
+            digest = self._digests.get(identity)
+            if digest is not None:
+                self._digests.move_to_end(identity)
+                return digest
+        digest = await run_in_threadpool(_file_digest, source_path)
+        with self._lock:
+            self._digests[identity] = digest
+            while len(self._digests) > self.max_digests:
+                self._digests.popitem(last=False)
+        return digest
+
+    def _touch(self, name: str) -> bool:
+        with self._lock:
+            if name not in self._entries:
+                return False
+            self._entries.move_to_end(name)
+        return True
+
+    def _add(self, name: str, size: int) -> None:
+        evicted = []
+        with self._lock:
+            if name in self._entries:
+                self._bytes -= self._entries.pop(name)
+            self._entries[name] = size
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                old_name, old_size = self._entries.popitem(last=False)
+                self._bytes -= old_size
+                self.evictions += 1
+                evicted.append(old_name)
+        for old_name in evicted:
+            try:
+                os.remove(self._path(old_name))
+            except OSError:
+                pass
+
+    def _forget(self, name: str) -> None:
+        with self._lock:
+            size = self._entries.pop(name, None)
+            if size is not None:
+                self._bytes -= size
+
+    async def get(self, source_path: str, transform: Transform) -> str:
+        """Path of the cached rendering of source_path, transforming it if needed"""
+        if not self._loaded:
+            await run_in_threadpool(self._load)
+        digest = await self._source_digest(source_path)
+        name = hashlib.sha256(f"{digest}|{transform.fingerprint()}".encode()).hexdigest() + transform.extension
+        path = self._path(name)
+
+        if self._touch(name):
+            if await run_in_threadpool(os.path.exists, path):
+                with self._lock:
+                    self.hits += 1
+                return path
+            # Removed by another process sharing the cache directory
+            self._forget(name)
+
+        pending = self._pending.get(name)
+        if pending is not None:
+            with self._lock:
+                self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[name] = future
+        try:
+            with self._lock:
+                self.misses += 1
+            await run_in_threadpool(os.makedirs, os.path.dirname(path), exist_ok=True)
+            await image_workers.run(transform_image, source_path, path, transform)
+            self._add(name, (await run_in_threadpool(os.stat, path)).st_size)
+            future.set_result(path)
+            return path
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Waiters re-raise the exception; mark it retrieved for the no-waiter case
+            future.exception()
+            raise
+        finally:
+            self._pending.pop(name, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "in_progress": len(self._pending),
+            }
+
+
+async def resolve_source(path: str) -> str:
+    """Local path of a stored image (fetched from remote storage if needed), or 404"""
+    key = posixpath.normpath(path.lstrip("/"))
+    if key == ".." or key.startswith("../"):
+        raise HTTPException(status_code=404, detail="Image not found")
+    if os.path.splitext(key)[1].lower() not in ALLOWED_EXTENSIONS | {".avif"}:
+        raise HTTPException(status_code=404, detail="Image not found")
+    try:
+        return await storage.local_path(key)
+    except (FileNotFoundError, ValueError):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+
+transform_cache = TransformCache(settings.image_cache_dir, settings.image_cache_max_bytes)
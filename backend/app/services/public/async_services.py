@@ -0,0 +1,264 @@
+"""
+Async Public Services
+Non-blocking variants of the public read paths for use with AsyncSession.
+Filters and orderings are shared with the synchronous services so both
+always select and sort the same rows. Image manifests of the returned rows
+are read in the threadpool, so serializing them does not block the loop.
+"""
+from typing import List, Optional
+from sqlalchemy import desc, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.company import Company
+from app.models.hero_banner import HeroBanner
+from app.models.news import News
+from app.models.product import Product
+from app.models.service import Service
+from app.models.tag import Tag
+from app.models.team import TeamMember
+from app.services.public.hero_banner_service import PublicHeroBannerService
+from app.services.public.news_service import PublicNewsService
+from app.services.public.product_service import PublicProductService
+from app.services.public.service_service import PublicServiceService
+from app.services.public.team_service import PublicTeamService
+from app.utils.file_upload import preload_image_variants
+
+
+async def _first(db: AsyncSession, statement):
+    result = await db.execute(statement.limit(1))
+    return await preload_image_variants(result.scalars().first())
+
+
+async def _all(db: AsyncSession, statement) -> list:
+    result = await db.execute(statement)
+    return await preload_image_variants(list(result.scalars().all()))
+
+
+class AsyncPublicHeroBannerService:
+    """Async service for public hero banner operations"""
+
+    @staticmethod
+    async def get_active_banners(
+        db: AsyncSession, skip: int = 0, limit: int = 10, cursor: Optional[str] = None
+    ) -> List[HeroBanner]:
+        """Get active hero banners for public display"""
+        statement = select(HeroBanner).where(*PublicHeroBannerService.active_banners_criteria())
+        rows = await PublicHeroBannerService.active_banners_keyset().paginate_async(
+            db, statement, skip=skip, limit=limit, cursor=cursor
+        )
+        return await preload_image_variants(rows)
+
+    @staticmethod
+    async def get_banner_by_id(db: AsyncSession, banner_id: int) -> Optional[HeroBanner]:
+        """Get a specific active banner by ID"""
+        return await _first(db, select(HeroBanner).where(*PublicHeroBannerService.banner_by_id_criteria(banner_id)))
+
+    @staticmethod
+    async def get_featured_banner(db: AsyncSession) -> Optional[HeroBanner]:
+        """Get the first active banner ordered by position"""
+        return await _first(
+            db,
+            select(HeroBanner).where(
+                *PublicHeroBannerService.active_banners_criteria()
+            ).order_by(HeroBanner.order_position.asc())
+        )
+
+
+class AsyncPublicTeamService:
+    """Async service for public team member operations"""
+
+    @staticmethod
+    async def get_active_members(
+        db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> List[TeamMember]:
+        """Get active team members for public display"""
+        statement = select(TeamMember).where(*PublicTeamService.active_members_criteria())
+        rows = await PublicTeamService.active_members_keyset().paginate_async(
+            db, statement, skip=skip, limit=limit, cursor=cursor
+        )
+        return await preload_image_variants(rows)
+
+    @staticmethod
+    async def get_member_by_id(db: AsyncSession, member_id: int) -> Optional[TeamMember]:
+        """Get a specific active team member by ID"""
+        return await _first(db, select(TeamMember).where(*PublicTeamService.member_by_id_criteria(member_id)))
+
+    @staticmethod
+    async def get_members_by_department(
+        db: AsyncSession, department: str, skip: int = 0, limit: int = 50, cursor: Optional[str] = None
+    ) -> List[TeamMember]:
+        """Get active team members by department"""
+        statement = select(TeamMember).where(*PublicTeamService.department_criteria(department))
+        rows = await PublicTeamService.department_keyset().paginate_async(
+            db, statement, skip=skip, limit=limit, cursor=cursor
+        )
+        return await preload_image_variants(rows)
+
+
+class AsyncPublicCompanyService:
+    """Async service for public company information"""
+
+    @staticmethod
+    async def get_company_info(db: AsyncSession) -> Optional[Company]:
+        """Get the single company info record"""
+        return await _first(db, select(Company))
+
+
+class AsyncPublicProductService:
+    """Async service for public product operations"""
+
+    @staticmethod
+    async def get_active_products(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 20,
+        category: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> List[Product]:
+        """Get active products, optionally limited to one category"""
+        statement = select(Product).where(*PublicProductService.active_products_criteria(category))
+        rows = await PublicProductService.active_products_keyset().paginate_async(
+            db, statement, skip=skip, limit=limit, cursor=cursor
+        )
+        return await preload_image_variants(rows)
+
+    @staticmethod
+    async def get_product_by_id(db: AsyncSession, product_id: int) -> Optional[Product]:
+        """Get a specific active product by ID"""
+        return await _first(db, select(Product).where(*PublicProductService.product_by_id_criteria(product_id)))
+
+    @staticmethod
+    async def get_featured_products(db: AsyncSession, limit: int = 6) -> List[Product]:
+        """Get featured products for public display"""
+        return await _all(
+            db,
+            select(Product).where(
+                *PublicProductService.featured_products_criteria()
+            ).order_by(desc(Product.created_at)).limit(limit)
+        )
+
+
+class AsyncPublicServiceService:
+    """Async service for public service operations"""
+
+    @staticmethod
+    async def get_published_services(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 20,
+        category: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> List[Service]:
+        """Get active services, optionally limited to one category"""
+        statement = select(Service).where(*PublicServiceService.published_services_criteria(category))
+        rows = await PublicServiceService.published_services_keyset().paginate_async(
+            db, statement, skip=skip, limit=limit, cursor=cursor
+        )
+        return await preload_image_variants(rows)
+
+    @staticmethod
+    async def get_service_by_id(db: AsyncSession, service_id: int) -> Optional[Service]:
+        """Get a specific active service by ID"""
+        return await _first(db, select(Service).where(*PublicServiceService.service_by_id_criteria(service_id)))
+
+    @staticmethod
+    async def get_featured_services(db: AsyncSession, limit: int = 6) -> List[Service]:
+        """Get featured services for public display"""
+        return await _all(
+            db,
+            select(Service).where(
+                *PublicServiceService.featured_services_criteria()
+            ).order_by(desc(Service.order_position), desc(Service.created_at)).limit(limit)
+        )
+
+
+class AsyncPublicNewsService:
+    """Async service for public news operations"""
+
+    @staticmethod
+    async def get_published_news(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 10,
+        category: Optional[str] = None,
+        cursor: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        match_all_tags: bool = False
+    ) -> List[News]:
+        """Get published news for public display"""
+        statement = select(News).where(
+            *PublicNewsService.published_news_criteria(category, tags, match_all_tags)
+        )
+        rows = await PublicNewsService.published_news_keyset().paginate_async(
+            db, statement, skip=skip, limit=limit, cursor=cursor
+        )
+        return await preload_image_variants(rows)
+
+    @staticmethod
+    async def is_viewable(db: AsyncSession, news_id: int) -> bool:
+        """Whether the article or announcement has a public page, so its views may be counted"""
+        statement = select(News.id).where(*PublicNewsService.viewable_criteria(news_id)).limit(1)
+        return (await db.execute(statement)).first() is not None
+
+    @staticmethod
+    async def get_news_by_id(db: AsyncSession, news_id: int) -> Optional[News]:
+        """Get a specific published news article by ID"""
+        return await _first(db, select(News).where(*PublicNewsService.news_by_id_criteria(news_id)))
+
+    @staticmethod
+    async def get_latest_news(db: AsyncSession, limit: int = 5) -> List[News]:
+        """Get latest published news for homepage"""
+        return await _all(
+            db,
+            select(News).where(
+                *PublicNewsService.published_news_criteria()
+            ).order_by(desc(News.published_at)).limit(limit)
+        )
+
+    @staticmethod
+    async def get_featured_news(db: AsyncSession, limit: int = 3) -> List[News]:
+        """Get featured news for homepage"""
+        return await _all(
+            db,
+            select(News).where(
+                *PublicNewsService.featured_news_criteria()
+            ).order_by(desc(News.created_at)).limit(limit)
+        )
+
+    @staticmethod
+    async def get_announcements(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 10,
+        include_expired: bool = False,
+        cursor: Optional[str] = None
+    ) -> List[News]:
+        """Get published announcements for public display"""
+        statement = select(News).where(*PublicNewsService.announcements_criteria(include_expired))
+        rows = await PublicNewsService.announcements_keyset().paginate_async(
+            db, statement, skip=skip, limit=limit, cursor=cursor
+        )
+        return await preload_image_variants(rows)
+
+    @staticmethod
+    async def get_announcement_by_id(db: AsyncSession, announcement_id: int) -> Optional[News]:
+        """Get a specific published announcement by ID"""
+        return await _first(
+            db, select(News).where(*PublicNewsService.announcement_by_id_criteria(announcement_id))
+        )
+
+    @staticmethod
+    async def get_trending_news(
+        db: AsyncSession,
+        window_hours: int,
+        half_life_hours: float,
+        limit: int = 10,
+        category: Optional[str] = None
+    ) -> List[News]:
+        """Published news ranked by decayed views from the hourly view buckets"""
+        statement = PublicNewsService.trending_statement(window_hours, half_life_hours, limit, category)
+        return await _all(db, statement)
+
+    @staticmethod
+    async def get_tag_cloud(db: AsyncSession, limit: int = 50) -> List[Tag]:
+        """Tags of published articles with their precomputed counts"""
+        return list((await db.execute(PublicNewsService.tag_cloud_statement(limit))).scalars().all())
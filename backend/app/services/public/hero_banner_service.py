@@ -4,18 +4,34 @@ Handles public-facing hero banner operations with security and performance optim
 """
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from app.core.pagination import Keyset
 from app.models.hero_banner import HeroBanner
 
 
 class PublicHeroBannerService:
     """Service for public hero banner operations"""
     
+    @staticmethod
+    def active_banners_criteria() -> list:
+        """Filters selecting the banners visible on the public website"""
+        return [HeroBanner.is_active == True]
+    
+    @staticmethod
+    def banner_by_id_criteria(banner_id: int) -> list:
+        """Filters selecting a single visible banner"""
+        return [HeroBanner.id == banner_id, HeroBanner.is_active == True]
+    
+    @staticmethod
+    def active_banners_keyset() -> Keyset:
+        """Display order of the active banners"""
+        return Keyset(HeroBanner, (HeroBanner.order_position, False))
+    
     @staticmethod
     def get_active_banners(
         db: Session, 
         skip: int = 0, 
-        limit: int = 10
+        limit: int = 10,
+        cursor: Optional[str] = None
     ) -> List[HeroBanner]:
         """
         Get active hero banners for public display
@@ -25,10 +41,12 @@ class PublicHeroBannerService:
         - Ordered by display order
         """
         query = db.query(HeroBanner).filter(
-            HeroBanner.is_active == True
-        ).order_by(HeroBanner.order_position.asc())
+            *PublicHeroBannerService.active_banners_criteria()
+        )
         
-        return query.offset(skip).limit(limit).all()
+        return PublicHeroBannerService.active_banners_keyset().paginate(
+            query, skip=skip, limit=limit, cursor=cursor
+        )
     
     @staticmethod
     def get_banner_by_id(db: Session, banner_id: int) -> Optional[HeroBanner]:
@@ -37,10 +55,7 @@ class PublicHeroBannerService:
         Returns None if banner is not active or doesn't exist
         """
         return db.query(HeroBanner).filter(
-            and_(
-                HeroBanner.id == banner_id,
-                HeroBanner.is_active == True
-            )
+            *PublicHeroBannerService.banner_by_id_criteria(banner_id)
         ).first()
     
     @staticmethod
@@ -50,5 +65,5 @@ class PublicHeroBannerService:
         Returns the first active banner ordered by position
         """
         return db.query(HeroBanner).filter(
-            HeroBanner.is_active == True
+            *PublicHeroBannerService.active_banners_criteria()
         ).order_by(HeroBanner.order_position.asc()).first()
@@ -4,39 +4,153 @@ Handles public-facing news and announcement operations
 """
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, or_
-from datetime import datetime, timezone
-from app.models.news import News
+from sqlalchemy import and_, case, desc, func, or_, select
+from datetime import datetime, timedelta, timezone
+from app.core.pagination import Keyset
+from app.crud.news_views import HOUR, bucket_start, utc_now
+from app.crud.tag import tag_filter
+from app.models.news import News, NewsViewBucket
+from app.models.tag import Tag
 
 
 class PublicNewsService:
     """Service for public news operations"""
     
+    @staticmethod
+    def published_news_criteria(
+        category: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        match_all_tags: bool = False
+    ) -> list:
+        """Filters selecting the news articles visible on the public website"""
+        criteria = News.public_criteria()  # Excludes announcements
+        if category:
+            criteria.append(News.category == category)
+        if tags:
+            criteria.append(tag_filter(tags, match_all=match_all_tags))
+        return criteria
+    
+    @staticmethod
+    def news_by_id_criteria(news_id: int) -> list:
+        """Filters selecting a single published news article"""
+        return [News.id == news_id, *News.public_criteria()]
+    
+    @staticmethod
+    def featured_news_criteria() -> list:
+        """Filters selecting the featured news articles"""
+        return [
+            News.is_published == True,
+            News.is_featured == True,
+            News.category != 'announcement'
+        ]
+    
+    @staticmethod
+    def announcements_criteria(include_expired: bool = False) -> list:
+        """Filters selecting the published announcements"""
+        criteria = [
+            News.is_published == True,
+            News.category == 'announcement'
+        ]
+        if not include_expired:
+            current_time = datetime.now(timezone.utc)
+            criteria.append(
+                or_(
+                    News.expires_at.is_(None),
+                    News.expires_at > current_time
+                )
+            )
+        return criteria
+    
+    @staticmethod
+    def announcement_by_id_criteria(announcement_id: int) -> list:
+        """Filters selecting a single published announcement"""
+        return [
+            News.id == announcement_id,
+            News.is_published == True,
+            News.category == 'announcement'
+        ]
+    
+    @staticmethod
+    def viewable_criteria(news_id: int) -> list:
+        """Filters selecting a news article or announcement that has a public page"""
+        return [or_(
+            and_(*PublicNewsService.news_by_id_criteria(news_id)),
+            and_(*PublicNewsService.announcement_by_id_criteria(news_id))
+        )]
+    
+    @staticmethod
+    def tag_cloud_statement(limit: int = 50):
+        """Tags of published articles by precomputed count, most used first"""
+        return select(Tag).where(Tag.published_count > 0).order_by(
+            desc(Tag.published_count), Tag.name
+        ).limit(limit)
+    
+    @staticmethod
+    def trending_statement(
+        window_hours: int,
+        half_life_hours: float,
+        limit: int = 10,
+        category: Optional[str] = None,
+        now: Optional[datetime] = None
+    ):
+        """
+        Published articles ranked by views in the last ``window_hours`` hourly buckets,
+        each bucket weighted by 0.5 ** (age / half_life_hours); 0 disables the decay
+        """
+        now = now or utc_now()
+        current = bucket_start(now, HOUR)
+        weights = {}
+        for age in range(window_hours):
+            start = current - timedelta(hours=age)
+            elapsed = (now - start).total_seconds() / 3600
+            # Age of the middle of the bucket, or of its elapsed part for the current hour
+            hours_old = elapsed - 0.5 if age else elapsed / 2
+            weights[start] = 0.5 ** (hours_old / half_life_hours) if half_life_hours > 0 else 1.0
+        score = func.sum(
+            NewsViewBucket.views * case(weights, value=NewsViewBucket.bucket_start, else_=0.0)
+        ).label("score")
+        ranked = select(NewsViewBucket.news_id, score).where(
+            NewsViewBucket.granularity == HOUR,
+            NewsViewBucket.bucket_start >= current - timedelta(hours=window_hours - 1)
+        ).group_by(NewsViewBucket.news_id).subquery()
+        return select(News).join(ranked, ranked.c.news_id == News.id).where(
+            *PublicNewsService.published_news_criteria(category)
+        ).order_by(desc(ranked.c.score), desc(News.published_at), desc(News.id)).limit(limit)
+    
+    @staticmethod
+    def published_news_keyset() -> Keyset:
+        """Public news order, most recently published first"""
+        return Keyset(News, (News.published_at, True))
+    
+    @staticmethod
+    def announcements_keyset() -> Keyset:
+        """Public announcement order: sticky first, then most recently published"""
+        return Keyset(News, (News.is_sticky, True), (News.published_at, True))
+    
     @staticmethod
     def get_published_news(
         db: Session,
         skip: int = 0,
         limit: int = 10,
-        category: Optional[str] = None
+        category: Optional[str] = None,
+        cursor: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        match_all_tags: bool = False
     ) -> List[News]:
         """
         Get published news for public display
         Only returns news that are:
         - Published (is_published = True)
         - Published date is in the past
-        - Optionally filtered by category
+        - Optionally filtered by category and tags
         """
         query = db.query(News).filter(
-            and_(
-                News.is_published == True,
-                News.category != 'announcement'  # Exclude announcements from regular news
-            )
+            *PublicNewsService.published_news_criteria(category, tags, match_all_tags)
         )
-        
-        if category:
-            query = query.filter(News.category == category)
             
-        return query.order_by(desc(News.published_at)).offset(skip).limit(limit).all()
+        return PublicNewsService.published_news_keyset().paginate(
+            query, skip=skip, limit=limit, cursor=cursor
+        )
     
     @staticmethod
     def get_news_by_id(db: Session, news_id: int) -> Optional[News]:
@@ -45,11 +159,7 @@ class PublicNewsService:
         Returns None if news is not published or doesn't exist
         """
         return db.query(News).filter(
-            and_(
-                News.id == news_id,
-                News.is_published == True,
-                News.category != 'announcement'
-            )
+            *PublicNewsService.news_by_id_criteria(news_id)
         ).first()
     
     @staticmethod
@@ -61,10 +171,7 @@ class PublicNewsService:
         Get latest published news for homepage
         """
         return db.query(News).filter(
-            and_(
-                News.is_published == True,
-                News.category != 'announcement'
-            )
+            *PublicNewsService.published_news_criteria()
         ).order_by(desc(News.published_at)).limit(limit).all()
     
     @staticmethod
@@ -76,11 +183,7 @@ class PublicNewsService:
         Get featured news for homepage
         """
         return db.query(News).filter(
-            and_(
-                News.is_published == True,
-                News.is_featured == True,
-                News.category != 'announcement'
-            )
+            *PublicNewsService.featured_news_criteria()
         ).order_by(desc(News.created_at)).limit(limit).all()
     
     @staticmethod
@@ -88,31 +191,19 @@ class PublicNewsService:
         db: Session,
         skip: int = 0,
         limit: int = 10,
-        include_expired: bool = False
+        include_expired: bool = False,
+        cursor: Optional[str] = None
     ) -> List[News]:
         """
         Get published announcements for public display
         """
         query = db.query(News).filter(
-            and_(
-                News.is_published == True,
-                News.category == 'announcement'
-            )
+            *PublicNewsService.announcements_criteria(include_expired)
         )
         
-        if not include_expired:
-            current_time = datetime.now(timezone.utc)
-            query = query.filter(
-                or_(
-                    News.expires_at.is_(None),
-                    News.expires_at > current_time
-                )
-            )
-        
-        return query.order_by(
-            desc(News.is_sticky),
-            desc(News.published_at)
-        ).offset(skip).limit(limit).all()
+        return PublicNewsService.announcements_keyset().paginate(
+            query, skip=skip, limit=limit, cursor=cursor
+        )
     
     @staticmethod
     def get_announcement_by_id(db: Session, announcement_id: int) -> Optional[News]:
@@ -121,11 +212,7 @@ class PublicNewsService:
         Returns None if announcement is not published or doesn't exist
         """
         return db.query(News).filter(
-            and_(
-                News.id == announcement_id,
-                News.is_published == True,
-                News.category == 'announcement'
-            )
+            *PublicNewsService.announcement_by_id_criteria(announcement_id)
         ).first()
     
     @staticmethod
@@ -4,18 +4,43 @@ Handles public-facing product operations
 """
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
+from sqlalchemy import desc
+from app.core.pagination import Keyset
 from app.models.product import Product
 
 
 class PublicProductService:
     """Service for public product operations"""
     
+    @staticmethod
+    def active_products_criteria(category: Optional[str] = None) -> list:
+        """Filters selecting the products visible on the public website"""
+        criteria = [Product.is_active == True]
+        if category:
+            criteria.append(Product.category == category)
+        return criteria
+    
+    @staticmethod
+    def product_by_id_criteria(product_id: int) -> list:
+        """Filters selecting a single visible product"""
+        return [Product.id == product_id, Product.is_active == True]
+    
+    @staticmethod
+    def featured_products_criteria() -> list:
+        """Filters selecting the featured products visible on the public website"""
+        return [Product.is_active == True, Product.is_featured == True]
+    
+    @staticmethod
+    def active_products_keyset() -> Keyset:
+        """Public product order, newest first"""
+        return Keyset(Product, (Product.created_at, True))
+    
     @staticmethod
     def get_active_products(
         db: Session, 
         skip: int = 0, 
-        limit: int = 20
+        limit: int = 20,
+        cursor: Optional[str] = None
     ) -> List[Product]:
         """
         Get active products for public display
@@ -23,9 +48,12 @@ class PublicProductService:
         - Active (is_active = True)
         - Ordered by creation date (newest first)
         """
-        return db.query(Product).filter(
-            Product.is_active == True
-        ).order_by(desc(Product.created_at)).offset(skip).limit(limit).all()
+        query = db.query(Product).filter(
+            *PublicProductService.active_products_criteria()
+        )
+        return PublicProductService.active_products_keyset().paginate(
+            query, skip=skip, limit=limit, cursor=cursor
+        )
     
     @staticmethod
     def get_product_by_id(db: Session, product_id: int) -> Optional[Product]:
@@ -34,10 +62,7 @@ class PublicProductService:
         Returns None if product is not active or doesn't exist
         """
         return db.query(Product).filter(
-            and_(
-                Product.id == product_id,
-                Product.is_active == True
-            )
+            *PublicProductService.product_by_id_criteria(product_id)
         ).first()
     
     @staticmethod
@@ -45,17 +70,18 @@ class PublicProductService:
         db: Session,
         category: str,
         skip: int = 0,
-        limit: int = 20
+        limit: int = 20,
+        cursor: Optional[str] = None
     ) -> List[Product]:
         """
         Get active products by category for public display
         """
-        return db.query(Product).filter(
-            and_(
-                Product.category == category,
-                Product.is_active == True
-            )
-        ).order_by(desc(Product.created_at)).offset(skip).limit(limit).all()
+        query = db.query(Product).filter(
+            *PublicProductService.active_products_criteria(category)
+        )
+        return PublicProductService.active_products_keyset().paginate(
+            query, skip=skip, limit=limit, cursor=cursor
+        )
     
     @staticmethod
     def get_featured_products(
@@ -67,8 +93,5 @@ class PublicProductService:
         Only returns active and featured products
         """
         return db.query(Product).filter(
-            and_(
-                Product.is_active == True,
-                Product.is_featured == True
-            )
+            *PublicProductService.featured_products_criteria()
         ).order_by(desc(Product.created_at)).limit(limit).all()
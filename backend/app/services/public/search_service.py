@@ -2,87 +2,60 @@
 Public Search Service
 Handles public search operations across different content types
 """
-from typing import List, Dict, Any
+from typing import Dict, Any
 from sqlalchemy.orm import Session
-from app.services.public.news_service import PublicNewsService
-from app.services.public.product_service import PublicProductService
-from app.services.public.service_service import PublicServiceService
+from app.services.search_index import search_index
+
+# content_type query value -> indexed entity types
+CONTENT_TYPES = {
+    "all": ["news", "product", "service"],
+    "news": ["news"],
+    "products": ["product"],
+    "services": ["service"],
+}
 
 
 class PublicSearchService:
     """Service for public search operations"""
-    
+
     @staticmethod
     def search_all_content(
         db: Session,
         query: str,
         content_type: str = "all",
-        limit: int = 20
+        limit: int = 20,
+        skip: int = 0
     ) -> Dict[str, Any]:
         """
         Search across all public content types
-        Returns structured results with content type information
+        Returns ranked results with content type information, the total
+        number of matches and per-type facet counts
         """
-        results = {
+        entity_types = CONTENT_TYPES.get(content_type, CONTENT_TYPES["all"])
+        hits, total, facets = search_index.search(
+            db, query=query, entity_types=entity_types, skip=skip, limit=limit
+        )
+
+        return {
             "query": query,
-            "results": []
+            "total": total,
+            "skip": skip,
+            "limit": limit,
+            "facets": {
+                "news": facets.get("news", 0),
+                "products": facets.get("product", 0),
+                "services": facets.get("service", 0),
+            },
+            "results": [
+                {
+                    "type": hit["entity_type"],
+                    "id": hit["entity_id"],
+                    "title": hit["title"],
+                    "content": hit["summary"],
+                    "url": hit["url"],
+                    "score": hit["score"],
+                    "created_at": hit["created_at"]
+                }
+                for hit in hits
+            ]
         }
-        
-        # Calculate limits per content type if searching all
-        type_limit = limit // 3 if content_type == "all" else limit
-        
-        if content_type in ["all", "news"]:
-            news_items = PublicNewsService.search_content(
-                db, query=query, content_type="news", limit=type_limit
-            )
-            for item in news_items:
-                title = getattr(item, 'title', '') or ''
-                excerpt = getattr(item, 'excerpt', '') or ''
-                content = excerpt[:200] + "..." if excerpt and len(excerpt) > 200 else excerpt
-                results["results"].append({
-                    "type": "news",
-                    "id": item.id,
-                    "title": title,
-                    "content": content,
-                    "url": f"/news/{item.id}",
-                    "created_at": item.created_at
-                })
-        
-        if content_type in ["all", "products"]:
-            # Simple search for products
-            products = PublicProductService.get_active_products(db, skip=0, limit=type_limit)
-            for item in products:
-                name = getattr(item, 'name', '') or ''
-                description = getattr(item, 'description', '') or ''
-                if query.lower() in name.lower() or (description and query.lower() in description.lower()):
-                    content = description[:200] + "..." if description and len(description) > 200 else description
-                    results["results"].append({
-                        "type": "product",
-                        "id": item.id,
-                        "title": name,
-                        "content": content,
-                        "url": f"/products/{item.id}",
-                        "created_at": item.created_at
-                    })
-        
-        if content_type in ["all", "services"]:
-            # Simple search for services
-            services = PublicServiceService.get_published_services(db, skip=0, limit=type_limit)
-            for item in services:
-                name = getattr(item, 'name', '') or ''
-                description = getattr(item, 'description', '') or ''
-                if query.lower() in name.lower() or (description and query.lower() in description.lower()):
-                    content = description[:200] + "..." if description and len(description) > 200 else description
-                    results["results"].append({
-                        "type": "service",
-                        "id": item.id,
-                        "title": name,
-                        "content": content,
-                        "url": f"/services/{item.id}",
-                        "created_at": item.created_at
-                    })
-        
-        # Sort results by creation date (newest first)
-        results["results"].sort(key=lambda x: x["created_at"], reverse=True)
-        
-        return results
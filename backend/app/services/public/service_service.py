@@ -4,18 +4,43 @@ Handles public-facing service operations
 """
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
+from sqlalchemy import desc
+from app.core.pagination import Keyset
 from app.models.service import Service
 
 
 class PublicServiceService:
     """Service for public service operations"""
     
+    @staticmethod
+    def published_services_criteria(category: Optional[str] = None) -> list:
+        """Filters selecting the services visible on the public website"""
+        criteria = [Service.is_active == True]
+        if category:
+            criteria.append(Service.category == category)
+        return criteria
+    
+    @staticmethod
+    def service_by_id_criteria(service_id: int) -> list:
+        """Filters selecting a single visible service"""
+        return [Service.id == service_id, Service.is_active == True]
+    
+    @staticmethod
+    def featured_services_criteria() -> list:
+        """Filters selecting the featured services visible on the public website"""
+        return [Service.is_active == True, Service.is_featured == True]
+    
+    @staticmethod
+    def published_services_keyset() -> Keyset:
+        """Public service order: position, then newest first"""
+        return Keyset(Service, (Service.order_position, True), (Service.created_at, True))
+    
     @staticmethod
     def get_published_services(
         db: Session, 
         skip: int = 0, 
-        limit: int = 20
+        limit: int = 20,
+        cursor: Optional[str] = None
     ) -> List[Service]:
         """
         Get published services for public display
@@ -23,12 +48,12 @@ class PublicServiceService:
         - Active (is_active = True)
         - Ordered by position and creation date
         """
-        return db.query(Service).filter(
-            Service.is_active == True
-        ).order_by(
-            desc(Service.order_position), 
-            desc(Service.created_at)
-        ).offset(skip).limit(limit).all()
+        query = db.query(Service).filter(
+            *PublicServiceService.published_services_criteria()
+        )
+        return PublicServiceService.published_services_keyset().paginate(
+            query, skip=skip, limit=limit, cursor=cursor
+        )
     
     @staticmethod
     def get_service_by_id(db: Session, service_id: int) -> Optional[Service]:
@@ -37,10 +62,7 @@ class PublicServiceService:
         Returns None if service is not active or doesn't exist
         """
         return db.query(Service).filter(
-            and_(
-                Service.id == service_id,
-                Service.is_active == True
-            )
+            *PublicServiceService.service_by_id_criteria(service_id)
         ).first()
     
     @staticmethod
@@ -48,20 +70,18 @@ class PublicServiceService:
         db: Session,
         category: str,
         skip: int = 0,
-        limit: int = 20
+        limit: int = 20,
+        cursor: Optional[str] = None
     ) -> List[Service]:
         """
         Get active services by category for public display
         """
-        return db.query(Service).filter(
-            and_(
-                Service.category == category,
-                Service.is_active == True
-            )
-        ).order_by(
-            desc(Service.order_position), 
-            desc(Service.created_at)
-        ).offset(skip).limit(limit).all()
+        query = db.query(Service).filter(
+            *PublicServiceService.published_services_criteria(category)
+        )
+        return PublicServiceService.published_services_keyset().paginate(
+            query, skip=skip, limit=limit, cursor=cursor
+        )
     
     @staticmethod
     def get_featured_services(
@@ -73,10 +93,7 @@ class PublicServiceService:
         Only returns active and featured services
         """
         return db.query(Service).filter(
-            and_(
-                Service.is_active == True,
-                Service.is_featured == True
-            )
+            *PublicServiceService.featured_services_criteria()
         ).order_by(
             desc(Service.order_position), 
             desc(Service.created_at)
@@ -4,18 +4,44 @@ Handles public-facing team member operations
 """
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, asc
+from app.core.pagination import Keyset
 from app.models.team import TeamMember
 
 
 class PublicTeamService:
     """Service for public team member operations"""
     
+    @staticmethod
+    def active_members_criteria() -> list:
+        """Filters selecting the team members visible on the public website"""
+        return [TeamMember.is_active == True]
+    
+    @staticmethod
+    def member_by_id_criteria(member_id: int) -> list:
+        """Filters selecting a single visible team member"""
+        return [TeamMember.id == member_id, TeamMember.is_active == True]
+    
+    @staticmethod
+    def department_criteria(department: str) -> list:
+        """Filters selecting the visible team members of a department"""
+        return [TeamMember.department == department, TeamMember.is_active == True]
+    
+    @staticmethod
+    def active_members_keyset() -> Keyset:
+        """Public team order: position, then name"""
+        return Keyset(TeamMember, (TeamMember.order_position, False), (TeamMember.name, False))
+    
+    @staticmethod
+    def department_keyset() -> Keyset:
+        """Public order of a department's members"""
+        return Keyset(TeamMember, (TeamMember.order_position, False))
+    
     @staticmethod
     def get_active_members(
         db: Session, 
         skip: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None
     ) -> List[TeamMember]:
         """
         Get active team members for public display
@@ -23,12 +49,12 @@ class PublicTeamService:
         - Active (is_active = True)
         - Ordered by position and name
         """
-        return db.query(TeamMember).filter(
-            TeamMember.is_active == True
-        ).order_by(
-            asc(TeamMember.order_position), 
-            asc(TeamMember.name)
-        ).offset(skip).limit(limit).all()
+        query = db.query(TeamMember).filter(
+            *PublicTeamService.active_members_criteria()
+        )
+        return PublicTeamService.active_members_keyset().paginate(
+            query, skip=skip, limit=limit, cursor=cursor
+        )
     
     @staticmethod
     def get_member_by_id(db: Session, member_id: int) -> Optional[TeamMember]:
@@ -37,10 +63,7 @@ class PublicTeamService:
         Returns None if member is not active or doesn't exist
         """
         return db.query(TeamMember).filter(
-            and_(
-                TeamMember.id == member_id,
-                TeamMember.is_active == True
-            )
+            *PublicTeamService.member_by_id_criteria(member_id)
         ).first()
     
     @staticmethod
@@ -48,16 +71,15 @@ class PublicTeamService:
         db: Session, 
         department: str,
         skip: int = 0, 
-        limit: int = 50
+        limit: int = 50,
+        cursor: Optional[str] = None
     ) -> List[TeamMember]:
         """
         Get active team members by department for public display
         """
-        return db.query(TeamMember).filter(
-            and_(
-                TeamMember.department == department,
-                TeamMember.is_active == True
-            )
-        ).order_by(
-            asc(TeamMember.order_position)
-        ).offset(skip).limit(limit).all()
+        query = db.query(TeamMember).filter(
+            *PublicTeamService.department_criteria(department)
+        )
+        return PublicTeamService.department_keyset().paginate(
+            query, skip=skip, limit=limit, cursor=cursor
+        )
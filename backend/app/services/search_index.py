@@ -0,0 +1,317 @@
+"""
+Full-Text Search Index
+Inverted index over public news, products and services.
+
+Uses an FTS5 virtual table on SQLite and a tsvector column with a GIN index
+on PostgreSQL. Documents are written in the same transaction as the rows
+they describe, from the session flush hook at the bottom of this module.
+"""
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.models.news import News
+from app.models.product import Product
+from app.models.service import Service
+
+SUMMARY_LENGTH = 200
+
+# entity type -> (model, numeric code used to build SQLite rowids, public url prefix)
+ENTITY_TYPES = {
+    "news": (News, 1, "/news"),
+    "product": (Product, 2, "/products"),
+    "service": (Service, 3, "/services"),
+}
+MODEL_TYPES = {model: entity_type for entity_type, (model, _, _) in ENTITY_TYPES.items()}
+
+
+def _summary(value: Optional[str]) -> str:
+    value = value or ''
+    return value[:SUMMARY_LENGTH] + "..." if len(value) > SUMMARY_LENGTH else value
+
+
+def _join(*parts: Optional[str]) -> str:
+    return "\n".join(part for part in parts if part)
+
+
+def build_document(obj: Any) -> Optional[Dict[str, Any]]:
+    """Build the index document for a row, or None if the row is not publicly visible"""
+    entity_type = MODEL_TYPES.get(type(obj))
+    if entity_type == "news":
+        if not getattr(obj, 'is_published', False) or getattr(obj, 'category', None) == 'announcement':
+            return None
+        title = getattr(obj, 'title', '') or ''
+        body = _join(obj.excerpt, obj.content)
+        summary = _summary(obj.excerpt)
+    elif entity_type in ("product", "service"):
+        if not getattr(obj, 'is_active', False):
+            return None
+        title = getattr(obj, 'name', '') or ''
+        body = _join(obj.short_description, obj.description, obj.category)
+        summary = _summary(obj.description)
+    else:
+        return None
+
+    return {
+        "entity_type": entity_type,
+        "entity_id": obj.id,
+        "title": title,
+        "body": body,
+        "summary": summary,
+        "created_at": getattr(obj, 'created_at', None) or datetime.utcnow(),
+    }
+
+
+def _tokens(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())
+
+
+class SQLiteSearchBackend:
+    """FTS5 virtual table ranked with bm25"""
+
+    def ensure_schema(self, connection: Connection) -> None:
+        connection.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+            "entity_type UNINDEXED, entity_id UNINDEXED, title, body, "
+            "summary UNINDEXED, created_at UNINDEXED, "
+            "tokenize = 'porter unicode61')"
+        ))
+
+    @staticmethod
+    def _rowid(entity_type: str, entity_id: int) -> int:
+        return entity_id * 8 + ENTITY_TYPES[entity_type][1]
+
+    def upsert(self, connection: Connection, document: Dict[str, Any]) -> None:
+        self.remove(connection, document["entity_type"], document["entity_id"])
+        params = dict(document)
+        params["rowid"] = self._rowid(document["entity_type"], document["entity_id"])
+        params["created_at"] = document["created_at"].isoformat()
+        connection.execute(text(
+            "INSERT INTO search_index (rowid, entity_type, entity_id, title, body, summary, created_at) "
+            "VALUES (:rowid, :entity_type, :entity_id, :title, :body, :summary, :created_at)"
+        ), params)
+
+    def remove(self, connection: Connection, entity_type: str, entity_id: int) -> None:
+        connection.execute(
+            text("DELETE FROM search_index WHERE rowid = :rowid"),
+            {"rowid": self._rowid(entity_type, entity_id)}
+        )
+
+    def clear(self, connection: Connection) -> None:
+        connection.execute(text("DELETE FROM search_index"))
+
+    def _match(self, query: str) -> Optional[str]:
+        tokens = _tokens(query)
+        if not tokens:
+            return None
+        return " ".join(f'"{token}"*' for token in tokens)
+
+    def facets(self, connection: Connection, query: str) -> Dict[str, int]:
+        match = self._match(query)
+        if match is None:
+            return {}
+        rows = connection.execute(text(
+            "SELECT entity_type, count(*) FROM search_index "
+            "WHERE search_index MATCH :match GROUP BY entity_type"
+        ), {"match": match})
+        return {entity_type: count for entity_type, count in rows}
+
+    def search(
+        self, connection: Connection, query: str, entity_types: Sequence[str], skip: int, limit: int
+    ) -> List[Dict[str, Any]]:
+        match = self._match(query)
+        if match is None:
+            return []
+        type_params = {f"type_{i}": entity_type for i, entity_type in enumerate(entity_types)}
+        rows = connection.execute(text(
+            "SELECT entity_type, entity_id, title, summary, created_at, "
+            "bm25(search_index, 0.0, 0.0, 10.0, 1.0, 0.0, 0.0) AS score "
+            "FROM search_index WHERE search_index MATCH :match "
+            f"AND entity_type IN ({', '.join(':' + name for name in type_params)}) "
+            "ORDER BY score, created_at DESC LIMIT :limit OFFSET :skip"
+        ), {"match": match, "limit": limit, "skip": skip, **type_params}).mappings()
+        return [
+            {**row, "score": -row["score"], "created_at": datetime.fromisoformat(row["created_at"])}
+            for row in rows
+        ]
+
+
+class PostgresSearchBackend:
+    """Weighted tsvector column with a GIN index ranked with ts_rank_cd"""
+
+    config = "english"
+
+    def ensure_schema(self, connection: Connection) -> None:
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS search_documents ("
+            "entity_type VARCHAR(20) NOT NULL, "
+            "entity_id INTEGER NOT NULL, "
+            "title TEXT NOT NULL, "
+            "body TEXT, "
+            "summary TEXT, "
+            "created_at TIMESTAMPTZ, "
+            "document TSVECTOR NOT NULL, "
+            "PRIMARY KEY (entity_type, entity_id))"
+        ))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_search_documents_document "
+            "ON search_documents USING GIN (document)"
+        ))
+
+    def upsert(self, connection: Connection, document: Dict[str, Any]) -> None:
+        connection.execute(text(
+            "INSERT INTO search_documents "
+            "(entity_type, entity_id, title, body, summary, created_at, document) "
+            "VALUES (:entity_type, :entity_id, :title, :body, :summary, :created_at, "
+            f"setweight(to_tsvector('{self.config}', :title), 'A') || "
+            f"setweight(to_tsvector('{self.config}', coalesce(:body, '')), 'B')) "
+            "ON CONFLICT (entity_type, entity_id) DO UPDATE SET "
+            "title = EXCLUDED.title, body = EXCLUDED.body, summary = EXCLUDED.summary, "
+            "created_at = EXCLUDED.created_at, document = EXCLUDED.document"
+        ), document)
+
+    def remove(self, connection: Connection, entity_type: str, entity_id: int) -> None:
+        connection.execute(
+            text("DELETE FROM search_documents WHERE entity_type = :entity_type AND entity_id = :entity_id"),
+            {"entity_type": entity_type, "entity_id": entity_id}
+        )
+
+    def clear(self, connection: Connection) -> None:
+        connection.execute(text("DELETE FROM search_documents"))
+
+    def _tsquery(self, query: str) -> Optional[str]:
+        tokens = _tokens(query)
+        if not tokens:
+            return None
+        return " & ".join(f"{token}:*" for token in tokens)
+
+    def facets(self, connection: Connection, query: str) -> Dict[str, int]:
+        tsquery = self._tsquery(query)
+        if tsquery is None:
+            return {}
+        rows = connection.execute(text(
+            "SELECT entity_type, count(*) FROM search_documents "
+            f"WHERE document @@ to_tsquery('{self.config}', :tsquery) GROUP BY entity_type"
+        ), {"tsquery": tsquery})
+        return {entity_type: count for entity_type, count in rows}
+
+    def search(
+        self, connection: Connection, query: str, entity_types: Sequence[str], skip: int, limit: int
+    ) -> List[Dict[str, Any]]:
+        tsquery = self._tsquery(query)
+        if tsquery is None:
+            return []
+        rows = connection.execute(text(
+            "SELECT entity_type, entity_id, title, summary, created_at, "
+            "ts_rank_cd(document, q) AS score "
+            f"FROM search_documents, to_tsquery('{self.config}', :tsquery) AS q "
+            "WHERE document @@ q AND entity_type = ANY(:entity_types) "
+            "ORDER BY score DESC, created_at DESC LIMIT :limit OFFSET :skip"
+        ), {"tsquery": tsquery, "entity_types": list(entity_types), "limit": limit, "skip": skip}).mappings()
+        return [dict(row) for row in rows]
+
+
+class SearchIndex:
+    """Dialect-aware facade over the search backends"""
+
+    backends = {
+        "sqlite": SQLiteSearchBackend(),
+        "postgresql": PostgresSearchBackend(),
+    }
+    table_names = {
+        "sqlite": "search_index",
+        "postgresql": "search_documents",
+    }
+
+    def _backend(self, connection: Connection):
+        backend = self.backends.get(connection.dialect.name)
+        if backend is None:
+            raise RuntimeError(f"Full-text search is not supported on '{connection.dialect.name}'")
+        return backend
+
+    def ensure_schema(self, engine: Engine) -> bool:
+        """Create the index structures; returns True if they did not exist yet"""
+        table_name = self.table_names.get(engine.dialect.name)
+        created = table_name is not None and not inspect(engine).has_table(table_name)
+        with engine.begin() as connection:
+            self._backend(connection).ensure_schema(connection)
+        return created
+
+    def rebuild(self, db: Session) -> int:
+        """Re-index every publicly visible row"""
+        connection = db.connection()
+        backend = self._backend(connection)
+        backend.clear(connection)
+        indexed = 0
+        for model, _, _ in ENTITY_TYPES.values():
+            for obj in db.query(model).yield_per(500):
+                document = build_document(obj)
+                if document is not None:
+                    backend.upsert(connection, document)
+                    indexed += 1
+        db.commit()
+        return indexed
+
+    def index_objects(self, connection: Connection, objects: Iterable[Any]) -> None:
+        backend = self._backend(connection)
+        for obj in objects:
+            document = build_document(obj)
+            if document is None:
+                backend.remove(connection, MODEL_TYPES[type(obj)], obj.id)
+            else:
+                backend.upsert(connection, document)
+
+    def remove_objects(self, connection: Connection, objects: Iterable[Any]) -> None:
+        backend = self._backend(connection)
+        for obj in objects:
+            backend.remove(connection, MODEL_TYPES[type(obj)], obj.id)
+
+    def reindex(self, db: Session, model, ids: Sequence[int]) -> None:
+        """Refresh the documents of rows changed by set-based statements"""
+        if ids:
+            self.index_objects(db.connection(), db.query(model).filter(model.id.in_(ids)).all())
+
+    def unindex(self, db: Session, model, ids: Sequence[int]) -> None:
+        """Drop the documents of rows deleted by set-based statements"""
+        connection = db.connection()
+        backend = self._backend(connection)
+        for entity_id in ids:
+            backend.remove(connection, MODEL_TYPES[model], entity_id)
+
+    def search(
+        self,
+        db: Session,
+        query: str,
+        entity_types: Sequence[str],
+        skip: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], int, Dict[str, int]]:
+        """Ranked hits for a page, the total for the requested types and per-type facets"""
+        connection = db.connection()
+        backend = self._backend(connection)
+        facets = backend.facets(connection, query)
+        total = sum(facets.get(entity_type, 0) for entity_type in entity_types)
+        hits = backend.search(connection, query, entity_types, skip, limit) if total else []
+        for hit in hits:
+            hit["url"] = f"{ENTITY_TYPES[hit['entity_type']][2]}/{hit['entity_id']}"
+        return hits, total, facets
+
+
+search_index = SearchIndex()
+
+
+@event.listens_for(Session, "after_flush")
+def _update_search_index(session, flush_context):
+    changed = [obj for obj in list(session.new) + list(session.dirty) if type(obj) in MODEL_TYPES]
+    deleted = [obj for obj in session.deleted if type(obj) in MODEL_TYPES]
+    if not changed and not deleted:
+        return
+    connection = session.connection()
+    if connection.dialect.name not in SearchIndex.backends:
+        return
+    search_index.remove_objects(connection, deleted)
+    search_index.index_objects(connection, changed)
@@ -0,0 +1,193 @@
+"""
+News View Counter
+Buffers news views in memory and writes them in batches.
+
+Views are added to one of ``views_shards`` lock-protected dicts, chosen by
+news id, so requests for different articles rarely contend whether they run
+on the event loop or in the threadpool. Each shard keeps its own recorded and
+dropped totals, summed when read. Every
+``views_flush_interval`` seconds the shards are swapped out, summed and
+written with one ``views_count = views_count + n`` UPDATE per news item in a
+single executemany that leaves ``updated_at`` alone, together with the
+article's bucket for the current hour. A final flush runs on shutdown; views
+buffered when a worker is killed are lost.
+
+Every ``views_rollup_interval`` seconds hourly buckets past their retention
+are rolled up into days, days into months, and expired months are deleted.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.pool import Timings
+from app.crud.news import news
+from app.crud.news_views import news_views
+
+logger = logging.getLogger(__name__)
+
+
+class _Shard:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts: Dict[int, int] = {}
+        self.recorded = 0
+        self.dropped = 0
+
+
+class ViewCounter:
+    """Sharded in-memory view counts with periodic batched flushes"""
+
+    def __init__(self, shards: int, interval: float, max_pending_keys: int, rollup_interval: float):
+        self.shards: List[_Shard] = [_Shard() for _ in range(max(1, shards))]
+        self.interval = interval
+        self.max_pending_keys = max_pending_keys
+        self.rollup_interval = rollup_interval
+        self.last_rollup: Optional[Dict[str, Any]] = None
+        self._next_rollup = 0.0
+        self.flushed = 0
+        self.failed_flushes = 0
+        self.last_error: Optional[str] = None
+        self.flush_time = Timings()
+        self._flush_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def _shard(self, news_id: int) -> _Shard:
+        return self.shards[hash(news_id) % len(self.shards)]
+
+    @property
+    def recorded(self) -> int:
+        return sum(shard.recorded for shard in self.shards)
+
+    @property
+    def dropped(self) -> int:
+        return sum(shard.dropped for shard in self.shards)
+
+    def pending_keys(self) -> int:
+        return sum(len(shard.counts) for shard in self.shards)
+
+    def record(self, news_id: int, views: int = 1) -> bool:
+        """Buffer views for a news item; False if the buffer is full and they were dropped"""
+        shard = self._shard(news_id)
+        with shard.lock:
+            # Ids spread evenly over the shards, so each holds its share of the limit
+            if news_id not in shard.counts and len(shard.counts) * len(self.shards) >= self.max_pending_keys:
+                shard.dropped += views
+                return False
+            shard.counts[news_id] = shard.counts.get(news_id, 0) + views
+            shard.recorded += views
+        return True
+
+    def drain(self) -> Dict[int, int]:
+        """Take the buffered counts out of every shard, summed per news id"""
+        totals: Dict[int, int] = {}
+        for shard in self.shards:
+            with shard.lock:
+                counts, shard.counts = shard.counts, {}
+            for news_id, views in counts.items():
+                totals[news_id] = totals.get(news_id, 0) + views
+        return totals
+
+    def _restore(self, counts: Dict[int, int]) -> None:
+        for news_id, views in counts.items():
+            shard = self._shard(news_id)
+            with shard.lock:
+                shard.counts[news_id] = shard.counts.get(news_id, 0) + views
+
+    def flush(self) -> int:
+        """Write buffered views to the database, returning the number of views written"""
+        with self._flush_lock:
+            counts = self.drain()
+            if not counts:
+                return 0
+            started = time.perf_counter()
+            db = SessionLocal()
+            try:
+                news.add_views(db, counts)
+            except Exception as exc:
+                db.rollback()
+                # Keep the views for the next flush rather than losing them
+                self._restore(counts)
+                self.failed_flushes += 1
+                self.last_error = repr(exc)
+                logger.exception("Flushing %d buffered news views failed", sum(counts.values()))
+                return 0
+            finally:
+                db.close()
+            self.flush_time.add(time.perf_counter() - started)
+            written = sum(counts.values())
+            self.flushed += written
+            return written
+
+    def rollup(self) -> Dict[str, int]:
+        """Compact view buckets past their retention"""
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            result = news_views.rollup(
+                db,
+                hourly_retention_hours=settings.views_hourly_retention_hours,
+                daily_retention_days=settings.views_daily_retention_days,
+                monthly_retention_months=settings.views_monthly_retention_months,
+            )
+        except Exception as exc:
+            db.rollback()
+            self.last_error = repr(exc)
+            logger.exception("Rolling up news view buckets failed")
+            return {}
+        finally:
+            db.close()
+        self.last_rollup = {**result, "seconds": round(time.perf_counter() - started, 3), "at": time.time()}
+        return result
+
+    async def _run_flushes(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await run_in_threadpool(self.flush)
+            if time.monotonic() >= self._next_rollup:
+                self._next_rollup = time.monotonic() + self.rollup_interval
+                await run_in_threadpool(self.rollup)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_flushes())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write whatever is still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await run_in_threadpool(self.flush)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "flush_interval": self.interval,
+            "shards": len(self.shards),
+            "max_pending_keys": self.max_pending_keys,
+            "pending_keys": self.pending_keys(),
+            "recorded": self.recorded,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes,
+            "last_error": self.last_error,
+            "flush": self.flush_time.summary(),
+            "rollup_interval": self.rollup_interval,
+            "last_rollup": self.last_rollup,
+        }
+
+
+view_counter = ViewCounter(
+    shards=settings.views_shards,
+    interval=settings.views_flush_interval,
+    max_pending_keys=settings.views_max_pending_keys,
+    rollup_interval=settings.views_rollup_interval,
+)
@@ -0,0 +1,105 @@
+"""
+Content-addressed storage for uploads.
+
+Files are stored once per SHA-256 under ``blobs/ab/cd/<sha256><ext>`` in the
+upload folder; the two fan-out levels keep directories small. The ``blobs``
+table (one row per stored path) counts how many rows point at each blob: saving an upload adds a
+reference, deleting one releases it, and the files are removed together with
+the last reference. Both happen while the blob's row is locked: an upload
+checks whether the files are stored inside the transaction that takes its
+reference, and a release deletes them inside the transaction that drops the
+last one, so an upload never relies on files a concurrent release is about
+to remove. Paths outside ``blobs/`` predate the store and are deleted
+directly.
+"""
+import os
+import uuid
+from typing import Callable, Optional
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.blob import Blob
+
+BLOB_FOLDER = "blobs"
+
+
+def blob_path(sha256: str, extension: str) -> str:
+    """Relative path of a blob inside the upload folder"""
+    return f"{BLOB_FOLDER}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension.lower()}"
+
+
+def is_blob_path(path: str) -> bool:
+    return path.startswith(f"{BLOB_FOLDER}/")
+
+
+def incoming_path() -> str:
+    """Temporary location for an upload whose hash is not known yet"""
+    directory = os.path.join(settings.upload_folder, BLOB_FOLDER, "incoming")
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, uuid.uuid4().hex)
+
+
+def _add_reference(
+    sha256: str, path: str, size: int, content_type: Optional[str], stored: Optional[Callable[[], bool]]
+) -> bool:
+    with SessionLocal() as db:
+        for _ in range(2):
+            updated = (
+                db.query(Blob)
+                .filter(Blob.path == path)
+                .update({Blob.ref_count: Blob.ref_count + 1}, synchronize_session=False)
+            )
+            if not updated:
+                db.add(Blob(sha256=sha256, path=path, size=size, content_type=content_type, ref_count=1))
+            try:
+                db.flush()
+            except IntegrityError:
+                # Another upload of the same content created the row first
+                db.rollback()
+                continue
+            # The row is locked until the commit, so a release cannot delete the files after this check
+            present = stored() if stored is not None else True
+            db.commit()
+            return present
+    raise RuntimeError(f"Could not reference blob {path}")
+
+
+def _release_reference(path: str, remove: Optional[Callable[[], None]]) -> bool:
+    """Drop one reference; True when it was the last one and the row is gone"""
+    with SessionLocal() as db:
+        db.query(Blob).filter(Blob.path == path, Blob.ref_count > 0).update(
+            {Blob.ref_count: Blob.ref_count - 1}, synchronize_session=False
+        )
+        removed = db.query(Blob).filter(Blob.path == path, Blob.ref_count <= 0).delete(
+            synchronize_session=False
+        )
+        if removed and remove is not None:
+            # Still holding the row: an upload of the same content waits, then finds the files gone
+            remove()
+        db.commit()
+        return bool(removed)
+
+
+async def reference_blob(
+    sha256: str,
+    path: str,
+    size: int,
+    content_type: Optional[str],
+    stored: Optional[Callable[[], bool]] = None
+) -> bool:
+    """
+    Record one more row pointing at the blob, creating its entry on first use.
+    Returns ``stored()``, called while the entry is locked, so files it reports
+    present stay in place for as long as the reference is held.
+    """
+    return await run_in_threadpool(_add_reference, sha256, path, size, content_type, stored)
+
+
+def release_blob(path: str, remove: Optional[Callable[[], None]] = None) -> bool:
+    """
+    Release one reference to the blob at ``path``; True when it was the last one.
+    ``remove`` deletes the files and runs before the release commits; if it
+    raises, the reference is kept.
+    """
+    return _release_reference(path, remove)
@@ -1,8 +1,12 @@
 import os
-import uuid
 from typing import Optional, List
 from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.core.static_files import PRECOMPRESSED_ENCODINGS, precompress
+from app.core.storage import storage
+from app.utils.blob_store import blob_path, incoming_path, is_blob_path, reference_blob, release_blob
+from app.utils.upload_stream import stream_upload
 
 # Allowed document extensions
 ALLOWED_DOCUMENT_EXTENSIONS = {'.pdf', '.doc', '.docx', '.txt', '.rtf', '.odt', '.xls', '.xlsx', '.ppt', '.pptx'}
@@ -37,18 +41,11 @@ def validate_document(file: UploadFile) -> bool:
     return file.content_type in allowed_mime_types
 
 
-def generate_unique_document_filename(original_filename: str) -> str:
-    """Generate a unique filename while preserving extension"""
-    if not original_filename:
-        raise ValueError("Original filename is required")
-    
-    file_ext = os.path.splitext(original_filename)[1].lower()
-    unique_id = str(uuid.uuid4())
-    return f"{unique_id}{file_ext}"
-
-
 async def save_uploaded_document(file: UploadFile, subfolder: str = "documents") -> dict:
-    """Save uploaded document file and return file info"""
+    """
+    Save uploaded document file and return file info.
+    Documents are stored content-addressed, so ``subfolder`` no longer picks the directory.
+    """
     # Validate file
     if not validate_document(file):
         raise HTTPException(
@@ -56,49 +53,60 @@ async def save_uploaded_document(file: UploadFile, subfolder: str = "documents")
             detail=f"Invalid document file. Allowed types: {', '.join(ALLOWED_DOCUMENT_EXTENSIONS)}"
         )
     
-    # Check file size
-    file_content = await file.read()
-    if len(file_content) > MAX_DOCUMENT_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Maximum size is {MAX_DOCUMENT_SIZE // 1024 // 1024}MB."
-        )
-    
-    # Reset file pointer
-    await file.seek(0)
+    # Stream to disk in chunks, enforcing the size limit as it arrives
+    saved = await stream_upload(file, incoming_path(), MAX_DOCUMENT_SIZE)
     
-    # Create directory structure
-    upload_dir = os.path.join(settings.upload_folder, subfolder)
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    # Generate unique filename
-    unique_filename = generate_unique_document_filename(file.filename or 'document.pdf')
-    file_path = os.path.join(upload_dir, unique_filename)
-    
-    # Save file
-    with open(file_path, 'wb') as f:
-        f.write(file_content)
+    # Identical documents are stored once and shared
+    file_extension = os.path.splitext(file.filename or '')[1].lower()
+    relative_path = blob_path(saved.sha256, file_extension)
+    referenced = False
+    try:
+        stored = await reference_blob(
+            saved.sha256, relative_path, saved.size, file.content_type,
+            stored=lambda: storage.exists_sync(relative_path)
+        )
+        referenced = True
+        if not stored:
+            await storage.put(relative_path, saved.path, file.content_type)
+            if storage.is_local and settings.static_precompress:
+                await run_in_threadpool(precompress, storage.path(relative_path))
+    except Exception:
+        # Give the reference back so a failed store does not keep the blob alive
+        if referenced:
+            await run_in_threadpool(delete_document_file, relative_path)
+        raise
+    finally:
+        if os.path.exists(saved.path):
+            os.remove(saved.path)
     
     # Return file information
     return {
         "filename": file.filename,
-        "saved_filename": unique_filename,
-        "file_path": f"{subfolder}/{unique_filename}",
-        "file_size": len(file_content),
+        "saved_filename": os.path.basename(relative_path),
+        "file_path": relative_path,
+        "file_size": saved.size,
         "file_type": file.content_type,
-        "file_extension": os.path.splitext(file.filename or '')[1].lower()
+        "file_extension": file_extension,
+        "sha256": saved.sha256
     }
 
 
+def _delete_document_files(file_path: str) -> None:
+    for suffix in ("", *(suffix for _, suffix in PRECOMPRESSED_ENCODINGS)):
+        storage.delete_sync(file_path + suffix)
+
+
 def delete_document_file(file_path: str) -> bool:
-    """Delete a document file from the filesystem"""
+    """Release a document; the file is deleted once nothing references it"""
     if not file_path:
         return True
     
-    full_path = os.path.join(settings.upload_folder, file_path)
     try:
-        if os.path.exists(full_path):
-            os.remove(full_path)
+        if is_blob_path(file_path):
+            # The files go together with the last reference, in the same transaction
+            release_blob(file_path, remove=lambda: _delete_document_files(file_path))
+        else:
+            _delete_document_files(file_path)
         return True
     except Exception:
         return False
@@ -1,10 +1,21 @@
+import json
 import os
-import uuid
-from typing import Optional
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, TypeVar
 from fastapi import HTTPException, UploadFile
-from PIL import Image
+from PIL import Image, features
 import io
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import async_session
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.core.image_workers import image_workers
+from app.core.storage import storage
+from app.utils.blob_store import blob_path, incoming_path, is_blob_path, reference_blob, release_blob
+from app.utils.upload_stream import stream_upload
 
 # Allowed image extensions
 ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
@@ -12,6 +23,19 @@ ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
 MAX_WIDTH = 2048
 MAX_HEIGHT = 2048
 
+# Encoder settings per rendition format: (extension, Pillow format, save options)
+VARIANT_FORMATS = {
+    "jpeg": (".jpg", "JPEG", {"quality": 85, "optimize": True}),
+    "webp": (".webp", "WEBP", {"quality": 80, "method": 4}),
+    "avif": (".avif", "AVIF", {"quality": 60}),
+}
+
+# Model attributes holding uploaded image paths, whose renditions responses list
+IMAGE_ATTRIBUTES = ("image_url", "featured_image_url", "logo_url", "about_image_url")
+MANIFEST_CACHE_SIZE = 4096
+
+T = TypeVar("T")
+
 
 def validate_image(file: UploadFile) -> bool:
     """Validate if uploaded file is a valid image"""
@@ -26,32 +50,26 @@ def validate_image(file: UploadFile) -> bool:
     return True
 
 
-def generate_unique_filename(original_filename: str) -> str:
-    """Generate a unique filename while preserving extension"""
-    if not original_filename:
-        raise ValueError("Original filename is required")
+def _prepare_image(image: Image.Image, max_width: int, max_height: int) -> Image.Image:
+    """Flatten transparency onto white and shrink to fit the maximum dimensions"""
+    # Convert RGBA to RGB if necessary
+    if image.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
+        image = background
     
-    file_ext = os.path.splitext(original_filename)[1].lower()
-    unique_id = str(uuid.uuid4())
-    return f"{unique_id}{file_ext}"
+    # Resize if necessary
+    if image.width > max_width or image.height > max_height:
+        image.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+    return image
 
 
 def resize_image(image_data: bytes, max_width: int = MAX_WIDTH, max_height: int = MAX_HEIGHT) -> bytes:
     """Resize image if it exceeds maximum dimensions"""
     try:
-        image = Image.open(io.BytesIO(image_data))
-        
-        # Convert RGBA to RGB if necessary
-        if image.mode in ('RGBA', 'LA', 'P'):
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            if image.mode == 'P':
-                image = image.convert('RGBA')
-            background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-            image = background
-        
-        # Resize if necessary
-        if image.width > max_width or image.height > max_height:
-            image.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+        image = _prepare_image(Image.open(io.BytesIO(image_data)), max_width, max_height)
         
         # Save to bytes
         output = io.BytesIO()
@@ -61,8 +79,68 @@ def resize_image(image_data: bytes, max_width: int = MAX_WIDTH, max_height: int
         raise HTTPException(status_code=400, detail=f"Image processing failed: {str(e)}")
 
 
+def _variant_formats() -> List[str]:
+    """Configured rendition formats this Pillow build can encode; JPEG always comes first"""
+    formats = ["jpeg"] + [name for name in settings.image_variant_formats if name != "jpeg"]
+    return [name for name in formats if name in VARIANT_FORMATS and (name == "jpeg" or features.check(name))]
+
+
+def _manifest_path(image_path: str) -> str:
+    return f"{os.path.splitext(image_path)[0]}.variants.json"
+
+
+def render_image_variants(
+    source_path: str,
+    destination_path: str,
+    widths: List[int],
+    formats: List[str]
+) -> Dict[str, Any]:
+    """
+    Write the full-size JPEG to destination_path plus one rendition per width
+    and format next to it, and record them in a manifest (runs in the image workers)
+    """
+    stem = os.path.splitext(destination_path)[0]
+    written = []
+    try:
+        with Image.open(source_path) as original:
+            image = _prepare_image(original, MAX_WIDTH, MAX_HEIGHT)
+            image.load()
+        sizes = [(image.width, stem)] + [
+            (width, f"{stem}-{width}w") for width in sorted(set(widths), reverse=True) if width < image.width
+        ]
+        renditions = []
+        for width, base in sizes:
+            rendition = image if width == image.width else image.copy()
+            if rendition is not image:
+                rendition.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+            for name in formats:
+                extension, pillow_format, options = VARIANT_FORMATS[name]
+                path = destination_path if base == stem and name == "jpeg" else f"{base}{extension}"
+                rendition.save(path, format=pillow_format, **options)
+                written.append(path)
+                renditions.append({
+                    "file": os.path.basename(path),
+                    "format": name,
+                    "width": rendition.width,
+                    "height": rendition.height,
+                    "bytes": os.path.getsize(path),
+                })
+        manifest = {"width": image.width, "height": image.height, "renditions": renditions}
+        with open(_manifest_path(destination_path), "w") as f:
+            json.dump(manifest, f)
+        return manifest
+    except Exception:
+        for path in written:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+
+
 async def save_uploaded_image(file: UploadFile, subfolder: str = "products") -> str:
-    """Save uploaded image file and return the relative path"""
+    """
+    Save uploaded image file with its responsive renditions and return the relative path.
+    Images are stored content-addressed, so ``subfolder`` no longer picks the directory.
+    """
     # Validate file
     if not validate_image(file):
         raise HTTPException(
@@ -70,50 +148,223 @@ async def save_uploaded_image(file: UploadFile, subfolder: str = "products") ->
             detail="Invalid image file. Only JPG, PNG, GIF, and WebP files are allowed."
         )
     
-    # Check file size
-    file_content = await file.read()
-    if len(file_content) > settings.max_file_size:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Maximum size is {settings.max_file_size // 1024 // 1024}MB."
-        )
-    
-    # Reset file pointer
-    await file.seek(0)
-    
-    # Create directory structure
-    upload_dir = os.path.join(settings.upload_folder, subfolder)
-    os.makedirs(upload_dir, exist_ok=True)
-    
-    # Generate unique filename
-    unique_filename = generate_unique_filename(file.filename or 'image.jpg')
-    file_path = os.path.join(upload_dir, unique_filename)
+    # Stream the original to disk, enforcing the size limit as it arrives
+    original = await stream_upload(file, incoming_path(), settings.max_file_size)
     
-    # Resize image if necessary
-    resized_image = resize_image(file_content)
-    
-    # Save file
-    with open(file_path, 'wb') as f:
-        f.write(resized_image)
+    # Identical uploads share one set of renditions; the stored full-size image is always a JPEG
+    relative_path = blob_path(original.sha256, ".jpg")
+    referenced = False
+    scratch = None
+    try:
+        # The manifest is written last, so its presence means the whole set is stored
+        stored = await reference_blob(
+            original.sha256, relative_path, original.size, file.content_type,
+            stored=lambda: storage.exists_sync(_manifest_path(relative_path))
+        )
+        referenced = True
+        if not stored:
+            # Render into a private scratch directory, then hand the files to storage
+            scratch = incoming_path()
+            await run_in_threadpool(os.makedirs, scratch)
+            manifest = await image_workers.run(
+                render_image_variants,
+                original.path,
+                os.path.join(scratch, os.path.basename(relative_path)),
+                settings.image_variant_widths,
+                _variant_formats()
+            )
+            await _store_renditions(scratch, relative_path, manifest)
+            _cache_manifest(relative_path, manifest)
+        else:
+            # Stored by an earlier upload; have its manifest ready for the response
+            _forget_manifest(relative_path)
+            await run_in_threadpool(_load_manifest, relative_path)
+    except Exception as e:
+        if referenced:
+            await run_in_threadpool(delete_image_file, relative_path)
+        if isinstance(e, HTTPException):
+            raise
+        raise HTTPException(status_code=400, detail=f"Image processing failed: {str(e)}")
+    finally:
+        os.remove(original.path)
+        if scratch:
+            await run_in_threadpool(shutil.rmtree, scratch, True)
     
     # Return relative path for storing in database
-    return f"{subfolder}/{unique_filename}"
+    return relative_path
+
+
+async def _store_renditions(scratch: str, relative_path: str, manifest: Dict[str, Any]) -> None:
+    """Put rendered files into storage; the manifest goes last and marks the set complete"""
+    directory = os.path.dirname(relative_path)
+    for rendition in manifest["renditions"]:
+        await storage.put(f"{directory}/{rendition['file']}", os.path.join(scratch, rendition["file"]))
+    manifest_name = os.path.basename(_manifest_path(relative_path))
+    await storage.put(f"{directory}/{manifest_name}", os.path.join(scratch, manifest_name), "application/json")
+
+
+def _relative_image_path(image_path: str) -> str:
+    """Accept both stored relative paths and /static/ or /uploads/ URLs"""
+    for prefix in ("/static/", "/uploads/"):
+        if image_path.startswith(prefix):
+            return image_path[len(prefix):]
+    return image_path.lstrip("/")
+
+
+# Manifests by image path; None records that the image has none
+_manifests: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+_manifests_lock = threading.Lock()
+_NOT_CACHED: Any = object()
+
+
+def _cached_manifest(relative_path: str) -> Optional[Dict[str, Any]]:
+    """The cached manifest, None if the image has none, or _NOT_CACHED"""
+    with _manifests_lock:
+        manifest = _manifests.get(relative_path, _NOT_CACHED)
+        if manifest is not _NOT_CACHED:
+            _manifests.move_to_end(relative_path)
+        return manifest
+
+
+def _cache_manifest(relative_path: str, manifest: Optional[Dict[str, Any]]) -> None:
+    with _manifests_lock:
+        _manifests[relative_path] = manifest
+        _manifests.move_to_end(relative_path)
+        while len(_manifests) > MANIFEST_CACHE_SIZE:
+            _manifests.popitem(last=False)
+
+
+def _forget_manifest(relative_path: str) -> None:
+    with _manifests_lock:
+        _manifests.pop(relative_path, None)
+
+
+def _load_manifest(relative_path: str) -> Optional[Dict[str, Any]]:
+    """Read an image's manifest (blocking), caching found and missing ones alike"""
+    manifest = _cached_manifest(relative_path)
+    if manifest is not _NOT_CACHED:
+        return manifest
+    manifest = None
+    # Only content-addressed uploads have renditions; older paths are never looked up
+    if is_blob_path(relative_path):
+        try:
+            manifest = json.loads(storage.read_sync(_manifest_path(relative_path)))
+        except (OSError, ValueError):
+            pass
+    # Blob names never get new content, so the answer holds until the image is released or uploaded again
+    _cache_manifest(relative_path, manifest)
+    return manifest
+
+
+def _uncached_image_paths(rows: Iterable[Any]) -> List[str]:
+    paths = []
+    for row in rows:
+        for attribute in IMAGE_ATTRIBUTES:
+            # Loaded values only; reading an expired attribute would query again
+            image_path = vars(row).get(attribute) if row is not None else None
+            if isinstance(image_path, str) and image_path:
+                relative_path = _relative_image_path(image_path)
+                if _cached_manifest(relative_path) is _NOT_CACHED:
+                    paths.append(relative_path)
+    return paths
+
+
+def load_image_variants(rows: Iterable[Any]) -> None:
+    """Read the manifests of the images on ``rows`` that are not cached yet (blocking)"""
+    for relative_path in _uncached_image_paths(rows):
+        _load_manifest(relative_path)
+
+
+async def preload_image_variants(rows: T) -> T:
+    """Load the manifests of a row's (or list of rows') images in the threadpool and return ``rows``"""
+    if _uncached_image_paths(rows if isinstance(rows, list) else [rows]):
+        await run_in_threadpool(load_image_variants, rows if isinstance(rows, list) else [rows])
+    return rows
+
+
+_image_models: Dict[type, bool] = {}
+
+
+def _has_images(model: type) -> bool:
+    """Whether ``model`` maps any of IMAGE_ATTRIBUTES"""
+    has_images = _image_models.get(model)
+    if has_images is None:
+        columns = inspect(model).column_attrs.keys()
+        has_images = _image_models[model] = any(attribute in columns for attribute in IMAGE_ATTRIBUTES)
+    return has_images
+
+
+@event.listens_for(Session, "loaded_as_persistent")
+def _load_row_image_variants(session: Session, instance: Any) -> None:
+    """Read manifests as image-bearing rows load, so serializing a response never touches storage"""
+    if not _has_images(type(instance)) or async_session(session) is not None:
+        # Loading runs on the event loop; the async read paths call preload_image_variants instead
+        return
+    load_image_variants([instance])
+
+
+def _delete_image_set(relative_path: str) -> None:
+    directory = os.path.dirname(relative_path)
+    manifest = _load_manifest(relative_path)
+    # Manifest first: without it a new upload of the same content re-renders the set
+    keys = [_manifest_path(relative_path), relative_path]
+    if manifest:
+        keys += [f"{directory}/{rendition['file']}" if directory else rendition["file"] for rendition in manifest["renditions"]]
+    for key in dict.fromkeys(keys):
+        storage.delete_sync(key)
+    _forget_manifest(relative_path)
 
 
 def delete_image_file(image_path: str) -> bool:
-    """Delete an image file from the filesystem"""
+    """Release an image; its file and renditions are deleted once nothing references them"""
     if not image_path:
         return True
     
-    full_path = os.path.join(settings.upload_folder, image_path)
+    relative_path = _relative_image_path(image_path)
     try:
-        if os.path.exists(full_path):
-            os.remove(full_path)
+        if is_blob_path(relative_path):
+            # The files go together with the last reference, in the same transaction
+            release_blob(relative_path, remove=lambda: _delete_image_set(relative_path))
+        else:
+            _delete_image_set(relative_path)
         return True
     except Exception:
         return False
 
 
+def get_image_variants(image_path: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Renditions of an uploaded image grouped by format, with ready-made srcset strings.
+    Uses the manifest loaded with the row; images whose manifest was not loaded have none.
+    """
+    if not image_path:
+        return None
+    relative_path = _relative_image_path(image_path)
+    # Only what was loaded with the row: this runs while responses are serialized
+    manifest = _cached_manifest(relative_path)
+    if manifest is _NOT_CACHED or not manifest:
+        return None
+    
+    directory = os.path.dirname(relative_path)
+    formats: Dict[str, List[Dict[str, Any]]] = {}
+    for rendition in sorted(manifest["renditions"], key=lambda item: item["width"]):
+        formats.setdefault(rendition["format"], []).append({
+            "url": storage.url(f"{directory}/{rendition['file']}" if directory else rendition["file"]),
+            "width": rendition["width"],
+            "height": rendition["height"],
+            "bytes": rendition["bytes"],
+        })
+    return {
+        "width": manifest["width"],
+        "height": manifest["height"],
+        "formats": formats,
+        "srcset": {
+            name: ", ".join(f"{item['url']} {item['width']}w" for item in items)
+            for name, items in formats.items()
+        },
+    }
+
+
 def get_image_url(image_path: Optional[str]) -> Optional[str]:
     """Convert relative image path to full URL"""
     if not image_path:
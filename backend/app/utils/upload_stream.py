@@ -0,0 +1,64 @@
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import BinaryIO
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+
+
+@dataclass
+class StreamedFile:
+    """A spooled upload written to disk"""
+    path: str
+    size: int
+    sha256: str
+
+
+def file_too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail=f"File too large. Maximum size is {max_size // 1024 // 1024}MB."
+    )
+
+
+def _write_chunk(handle: BinaryIO, digest, chunk: bytes) -> None:
+    # hashlib releases the GIL for large buffers, so hashing runs with the write
+    digest.update(chunk)
+    handle.write(chunk)
+
+
+def _discard(handle: BinaryIO, path: str) -> None:
+    handle.close()
+    if os.path.exists(path):
+        os.remove(path)
+
+
+async def stream_upload(file: UploadFile, destination: str, max_size: int) -> StreamedFile:
+    """
+    Copy an upload to ``destination`` in fixed-size chunks, hashing it on the
+    way and aborting as soon as it exceeds ``max_size``. Disk I/O runs in the
+    threadpool and the file only appears under its final name once complete.
+    """
+    if file.size is not None and file.size > max_size:
+        raise file_too_large(max_size)
+
+    partial_path = f"{destination}.part"
+    digest = hashlib.sha256()
+    size = 0
+    handle = await run_in_threadpool(open, partial_path, "wb")
+    try:
+        while True:
+            chunk = await file.read(settings.upload_chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise file_too_large(max_size)
+            await run_in_threadpool(_write_chunk, handle, digest, chunk)
+        await run_in_threadpool(handle.close)
+        await run_in_threadpool(os.replace, partial_path, destination)
+    except BaseException:
+        await run_in_threadpool(_discard, handle, partial_path)
+        raise
+    return StreamedFile(path=destination, size=size, sha256=digest.hexdigest())
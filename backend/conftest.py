@@ -0,0 +1,72 @@
+"""
+Pytest fixtures: the app runs against a throwaway SQLite database and upload
+folder, created before ``app`` is imported so settings pick them up.
+"""
+import os
+import shutil
+import tempfile
+
+import pytest
+from sqlalchemy import text
+
+_workdir = tempfile.mkdtemp(prefix="cms-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ["UPLOAD_FOLDER"] = os.path.join(_workdir, "uploads")
+os.environ["IMAGE_CACHE_DIR"] = os.path.join(_workdir, "cache", "images")
+os.environ["STORAGE_CACHE_DIR"] = os.path.join(_workdir, "cache", "storage")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.core.cache import response_cache  # noqa: E402
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.view_counter import view_counter  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def clean_database():
+    """Every test starts from empty tables, an empty search index and a cold response cache"""
+    yield
+    view_counter.drain()
+    response_cache.clear()
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+        connection.execute(text("DELETE FROM search_index"))
+    shutil.rmtree(os.environ["UPLOAD_FOLDER"], ignore_errors=True)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def admin_headers(db):
+    db.add(User(
+        email="admin@example.com",
+        username="admin",
+        full_name="Admin",
+        hashed_password="unused",
+        role="admin",
+        is_active=True,
+        is_superuser=True
+    ))
+    db.commit()
+    return {"Authorization": f"Bearer {create_access_token({'sub': 'admin@example.com'})}"}
+
+
+def pytest_sessionfinish(session, exitstatus):
+    engine.dispose()
+    shutil.rmtree(_workdir, ignore_errors=True)
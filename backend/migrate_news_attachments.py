@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Database migration script to create the news_attachments table and backfill it
+from the JSON blobs in news.attachments
+"""
+
+import json
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, inspect, text
+from app.core.config import settings
+from app.core.database import Base
+from app.models import news  # Import to register the models
+
+
+def _parse_uploaded_at(value):
+    try:
+        uploaded_at = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return datetime.now(timezone.utc)
+    if uploaded_at.tzinfo is None:
+        uploaded_at = uploaded_at.replace(tzinfo=timezone.utc)
+    return uploaded_at
+
+
+def run_migration():
+    """Run the database migration"""
+    print("🔧 Creating news_attachments table...")
+    
+    # Create engine
+    engine = create_engine(settings.database_url)
+    
+    try:
+        Base.metadata.create_all(bind=engine, tables=[news.NewsAttachment.__table__])
+        print("✅ news_attachments table created successfully!")
+        
+        columns = {column["name"] for column in inspect(engine).get_columns("news")}
+        if "attachments" not in columns:
+            print("ℹ️  news.attachments column not found, nothing to backfill")
+            return
+        
+        with engine.begin() as conn:
+            existing = set(conn.execute(text("SELECT id FROM news_attachments")).scalars())
+            rows = conn.execute(text(
+                "SELECT id, attachments FROM news WHERE attachments IS NOT NULL AND attachments != ''"
+            )).all()
+            
+            print(f"📝 Backfilling attachments of {len(rows)} news items...")
+            inserted = skipped = 0
+            for news_id, blob in rows:
+                try:
+                    attachments = json.loads(blob)
+                except ValueError:
+                    print(f"⚠️  news {news_id}: invalid attachments JSON, skipped")
+                    continue
+                
+                values = []
+                for attachment in attachments:
+                    # Re-running the script leaves already copied attachments alone
+                    if not attachment.get("id") or not attachment.get("file_path") or attachment["id"] in existing:
+                        skipped += 1
+                        continue
+                    existing.add(attachment["id"])
+                    values.append({
+                        "id": attachment["id"],
+                        "news_id": news_id,
+                        "original_filename": attachment.get("original_filename") or attachment.get("saved_filename") or "",
+                        "saved_filename": attachment.get("saved_filename"),
+                        "file_path": attachment["file_path"],
+                        "file_size": attachment.get("file_size"),
+                        "file_type": attachment.get("file_type"),
+                        "file_extension": attachment.get("file_extension"),
+                        "sha256": attachment.get("sha256"),
+                        "download_url": attachment.get("download_url"),
+                        "uploaded_at": _parse_uploaded_at(attachment.get("uploaded_at"))
+                    })
+                
+                if values:
+                    conn.execute(news.NewsAttachment.__table__.insert(), values)
+                    inserted += len(values)
+            
+            print(f"✅ Backfilled {inserted} attachments ({skipped} skipped)")
+        
+        print("🎉 Database migration completed successfully!")
+        print("ℹ️  news.attachments is no longer read; drop the column once the backfill is verified")
+        
+    except Exception as e:
+        print(f"❌ Migration failed: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    run_migration()
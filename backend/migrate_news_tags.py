@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Database migration script to create the tags and news_tags tables and backfill
+them from the tag strings in news.tags
+"""
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import Base
+from app.crud.tag import normalize_tag, parse_tags, tag as tag_crud
+from app.models.news import News
+from app.models.tag import Tag, news_tags
+
+
+def run_migration():
+    """Run the database migration"""
+    print("🔧 Creating tags and news_tags tables...")
+    
+    # Create engine
+    engine = create_engine(settings.database_url)
+    
+    try:
+        Base.metadata.create_all(bind=engine, tables=[Tag.__table__, news_tags])
+        print("✅ Tag tables created successfully!")
+        
+        with Session(engine) as db:
+            # Articles with association rows were written by the app or an earlier run
+            tagged = set(db.execute(text("SELECT DISTINCT news_id FROM news_tags")).scalars())
+            rows = [
+                (news_id, names)
+                for news_id, value in db.query(News.id, News.tags).filter(News.tags.isnot(None), News.tags != "")
+                if news_id not in tagged and (names := parse_tags(value))
+            ]
+            print(f"📝 Backfilling tags of {len(rows)} news items...")
+            
+            all_names = {}
+            for _, names in rows:
+                for name in names:
+                    all_names.setdefault(normalize_tag(name), name)
+            tag_ids = {tag.slug: tag.id for tag in tag_crud.get_or_create(db, list(all_names.values()))}
+            
+            links = [
+                {"news_id": news_id, "tag_id": tag_ids[normalize_tag(name)]}
+                for news_id, names in rows
+                for name in names
+            ]
+            if links:
+                db.execute(news_tags.insert(), links)
+            
+            # Recount every tag so counts are right even after partial earlier runs
+            tag_crud.refresh_counts(db, [tag_id for tag_id, in db.query(Tag.id)])
+            db.commit()
+            print(f"✅ Linked {len(links)} tags across {len(rows)} news items ({len(tag_ids)} distinct tags)")
+        
+        print("🎉 Database migration completed successfully!")
+        
+    except Exception as e:
+        print(f"❌ Migration failed: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    run_migration()
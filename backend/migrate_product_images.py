@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Database migration script to create the product_images table and backfill it
+from the comma-separated products.gallery_images column
+"""
+
+from sqlalchemy import create_engine, inspect, text
+from app.core.config import settings
+from app.core.database import Base
+from app.models import product  # Import to register the models
+
+
+def run_migration():
+    """Run the database migration"""
+    print("🔧 Creating product_images table...")
+    
+    # Create engine
+    engine = create_engine(settings.database_url)
+    
+    try:
+        Base.metadata.create_all(bind=engine, tables=[product.ProductImage.__table__])
+        print("✅ product_images table created successfully!")
+        
+        columns = {column["name"] for column in inspect(engine).get_columns("products")}
+        if "gallery_images" not in columns:
+            print("ℹ️  products.gallery_images column not found, nothing to backfill")
+            return
+        
+        with engine.begin() as conn:
+            # Products that already have gallery rows were migrated by an earlier run
+            migrated = set(conn.execute(text("SELECT DISTINCT product_id FROM product_images")).scalars())
+            rows = conn.execute(text(
+                "SELECT id, gallery_images FROM products WHERE gallery_images IS NOT NULL AND gallery_images != ''"
+            )).all()
+            
+            print(f"📝 Backfilling galleries of {len(rows)} products...")
+            inserted = skipped = 0
+            for product_id, gallery in rows:
+                if product_id in migrated:
+                    skipped += 1
+                    continue
+                urls = [url.strip() for url in gallery.split(",") if url.strip()]
+                if urls:
+                    conn.execute(product.ProductImage.__table__.insert(), [
+                        {"product_id": product_id, "image_url": url, "position": position}
+                        for position, url in enumerate(urls)
+                    ])
+                    inserted += len(urls)
+            
+            print(f"✅ Backfilled {inserted} gallery images ({skipped} products already migrated)")
+        
+        print("🎉 Database migration completed successfully!")
+        print("ℹ️  products.gallery_images is no longer read; drop the column once the backfill is verified")
+        
+    except Exception as e:
+        print(f"❌ Migration failed: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,116 @@
+"""
+Tests for reference counting of content-addressed uploads
+"""
+import io
+import os
+
+from PIL import Image
+
+from app.core.config import settings
+from app.models.blob import Blob
+from app.models.news import News
+
+REPORT = ("report.txt", b"quarterly figures\n" * 200, "text/plain")
+
+
+def _news(db, slug):
+    item = News(title=slug, slug=slug, content="Body", category="news")
+    db.add(item)
+    db.commit()
+    return item.id
+
+
+def _upload(client, headers, news_id, document=REPORT):
+    response = client.post(f"/api/news/{news_id}/upload-document", files={"file": document}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["attachment"]
+
+
+def _ref_count(db, path):
+    db.expire_all()
+    blob = db.query(Blob).filter(Blob.path == path).first()
+    return blob.ref_count if blob else 0
+
+
+def _stored(path):
+    return os.path.exists(os.path.join(settings.upload_folder, path))
+
+
+def test_identical_uploads_share_one_blob(client, db, admin_headers):
+    first = _upload(client, admin_headers, _news(db, "a"))
+    second = _upload(client, admin_headers, _news(db, "b"))
+
+    assert first["file_path"] == second["file_path"]
+    assert _ref_count(db, first["file_path"]) == 2
+    assert _stored(first["file_path"])
+
+
+def test_file_stays_until_the_last_reference_goes(client, db, admin_headers):
+    first_news, second_news = _news(db, "a"), _news(db, "b")
+    first = _upload(client, admin_headers, first_news)
+    second = _upload(client, admin_headers, second_news)
+    path = first["file_path"]
+
+    response = client.delete(f"/api/news/{first_news}/attachments/{first['id']}", headers=admin_headers)
+    assert response.status_code == 200
+    assert _ref_count(db, path) == 1
+    assert _stored(path)
+
+    response = client.delete(f"/api/news/{second_news}/attachments/{second['id']}", headers=admin_headers)
+    assert response.status_code == 200
+    assert _ref_count(db, path) == 0
+    assert not _stored(path)
+    assert not any(_stored(path + suffix) for suffix in (".br", ".gz"))
+
+
+def test_deleting_news_releases_its_documents(client, db, admin_headers):
+    kept_news, deleted_news = _news(db, "a"), _news(db, "b")
+    path = _upload(client, admin_headers, kept_news)["file_path"]
+    _upload(client, admin_headers, deleted_news)
+    _upload(client, admin_headers, deleted_news)
+
+    assert _ref_count(db, path) == 3
+    assert client.delete(f"/api/news/{deleted_news}", headers=admin_headers).status_code == 200
+
+    assert _ref_count(db, path) == 1
+    assert _stored(path)
+
+
+def test_upload_after_last_release_stores_the_file_again(client, db, admin_headers):
+    news_id = _news(db, "a")
+    attachment = _upload(client, admin_headers, news_id)
+    client.delete(f"/api/news/{news_id}/attachments/{attachment['id']}", headers=admin_headers)
+    assert not _stored(attachment["file_path"])
+
+    again = _upload(client, admin_headers, news_id)
+
+    assert again["file_path"] == attachment["file_path"]
+    assert _ref_count(db, again["file_path"]) == 1
+    assert _stored(again["file_path"])
+
+
+def _png(color):
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), color).save(buffer, format="PNG")
+    return ("photo.png", buffer.getvalue(), "image/png")
+
+
+def test_deleting_a_product_releases_its_images(client, db, admin_headers):
+    response = client.post(
+        "/api/products/with-image", data={"name": "Lamp"}, files={"image": _png("red")}, headers=admin_headers
+    )
+    assert response.status_code == 200, response.text
+    product_id = response.json()["id"]
+    for color in ("green", "blue"):
+        response = client.post(
+            f"/api/products/{product_id}/gallery", files={"image": _png(color)}, headers=admin_headers
+        )
+        assert response.status_code == 200, response.text
+    paths = [blob.path for blob in db.query(Blob)]
+    assert len(paths) == 3 and all(_stored(path) for path in paths)
+
+    assert client.delete(f"/api/products/{product_id}", headers=admin_headers).status_code == 200
+
+    db.expire_all()
+    assert db.query(Blob).count() == 0
+    assert not any(_stored(path) for path in paths)
@@ -0,0 +1,34 @@
+"""
+Tests for ETag and Last-Modified validators of public endpoints
+"""
+from datetime import datetime
+
+from fastapi import Request
+
+from app.core.conditional import _item_result, is_not_modified, validator_headers
+
+
+def _request(headers=None):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/public/news/1",
+        "query_string": b"",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+    })
+
+
+def test_edits_within_one_second_change_the_etag():
+    first = _item_result(_request(), (1, datetime(2024, 5, 1, 8, 30, 0, 100)))
+    second = _item_result(_request(), (1, datetime(2024, 5, 1, 8, 30, 0, 900)))
+
+    assert first[0] != second[0]
+    assert validator_headers(*first)["Last-Modified"] == validator_headers(*second)["Last-Modified"]
+
+
+def test_if_modified_since_compares_whole_seconds():
+    etag, last_modified = _item_result(_request(), (1, datetime(2024, 5, 1, 8, 30, 0, 500000)))
+    header = validator_headers(etag, last_modified)["Last-Modified"]
+
+    assert is_not_modified(_request({"If-Modified-Since": header}), etag, last_modified)
+    assert not is_not_modified(_request({"If-None-Match": '"other"', "If-Modified-Since": header}), etag, last_modified)
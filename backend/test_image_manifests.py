@@ -0,0 +1,57 @@
+"""
+Tests for the cache of image rendition manifests read as rows load
+"""
+import pytest
+
+from app.core.storage import storage
+from app.models.news import News
+from app.models.user import User
+from app.utils import file_upload
+from app.utils.blob_store import blob_path
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Manifest reads that reach storage"""
+    seen = []
+
+    def read_sync(key):
+        seen.append(key)
+        raise FileNotFoundError(key)
+
+    monkeypatch.setattr(storage, "read_sync", read_sync)
+    monkeypatch.setattr(file_upload, "_manifests", type(file_upload._manifests)())
+    return seen
+
+
+def _load_news(db, image_path):
+    db.add(News(title="a", slug="a", content="Body", category="news", featured_image_url=image_path))
+    db.commit()
+    db.expunge_all()
+    return db.query(News).one()
+
+
+def test_missing_manifests_are_looked_up_once(db, reads):
+    path = blob_path("ab" * 32, ".jpg")
+
+    _load_news(db, path)
+    db.expunge_all()
+    db.query(News).one()
+
+    assert reads == [path.replace(".jpg", ".variants.json")]
+    assert file_upload.get_image_variants(path) is None
+
+
+def test_paths_outside_the_blob_store_never_reach_storage(db, reads):
+    _load_news(db, "news/legacy.jpg")
+
+    assert reads == []
+    assert file_upload.get_image_variants("news/legacy.jpg") is None
+
+
+def test_only_image_bearing_models_are_inspected(db, reads):
+    _load_news(db, None)
+
+    assert reads == []
+    assert file_upload._has_images(News)
+    assert not file_upload._has_images(User)
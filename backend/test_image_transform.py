@@ -0,0 +1,136 @@
+"""
+Tests for the on-the-fly image transform cache
+"""
+import asyncio
+import os
+
+import pytest
+from PIL import Image
+
+from app.core.config import settings
+from app.core.image_workers import image_workers
+from app.services.image_transform import Transform, TransformCache
+
+THUMB = Transform(width=8, height=8, fit="cover", format="png", quality=80)
+
+
+@pytest.fixture(autouse=True)
+def inline_workers(monkeypatch):
+    """Run transforms in the test process; yield once so concurrent requests overlap"""
+    async def run(func, *args):
+        await asyncio.sleep(0)
+        return func(*args)
+
+    monkeypatch.setattr(image_workers, "run", run)
+
+
+def _image(path, color):
+    Image.new("RGB", (32, 32), color).save(path, format="PNG")
+    return str(path)
+
+
+def _cache(tmp_path, max_bytes=10 * 1024 * 1024):
+    return TransformCache(str(tmp_path / "cache"), max_bytes)
+
+
+def test_second_request_is_a_hit(tmp_path):
+    cache = _cache(tmp_path)
+    source = _image(tmp_path / "a.png", "red")
+
+    async def scenario():
+        return await cache.get(source, THUMB), await cache.get(source, THUMB)
+
+    first, second = asyncio.run(scenario())
+
+    assert first == second
+    assert Image.open(first).size == (8, 8)
+    assert (cache.misses, cache.hits) == (1, 1)
+
+
+def test_identical_files_share_an_entry(tmp_path):
+    cache = _cache(tmp_path)
+    first = _image(tmp_path / "a.png", "red")
+    second = _image(tmp_path / "b.png", "red")
+
+    async def scenario():
+        return await cache.get(first, THUMB), await cache.get(second, THUMB)
+
+    paths = asyncio.run(scenario())
+
+    assert paths[0] == paths[1]
+    assert cache.stats()["entries"] == 1
+
+
+def test_concurrent_misses_wait_on_one_transform(tmp_path):
+    cache = _cache(tmp_path)
+    source = _image(tmp_path / "a.png", "red")
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get(source, THUMB) for _ in range(3)))
+
+    paths = asyncio.run(scenario())
+
+    assert len(set(paths)) == 1
+    assert cache.misses == 1
+    assert cache.coalesced == 2
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = _cache(tmp_path)
+    sources = [_image(tmp_path / f"{color}.png", color) for color in ("red", "green", "blue")]
+
+    async def render(source):
+        return await cache.get(source, THUMB)
+
+    sizes = [os.path.getsize(asyncio.run(_cache(tmp_path / "sizes").get(source, THUMB))) for source in sources]
+    cache.max_bytes = sum(sorted(sizes)[1:])  # room for any two entries, never three
+    red = asyncio.run(render(sources[0]))
+    green = asyncio.run(render(sources[1]))
+    asyncio.run(render(sources[0]))  # red is now the most recently used
+    blue = asyncio.run(render(sources[2]))
+
+    assert cache.evictions == 1
+    assert not os.path.exists(green)
+    assert os.path.exists(red) and os.path.exists(blue)
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_entries_survive_a_restart(tmp_path):
+    source = _image(tmp_path / "a.png", "red")
+    asyncio.run(_cache(tmp_path).get(source, THUMB))
+
+    cache = _cache(tmp_path)
+    asyncio.run(cache.get(source, THUMB))
+
+    assert (cache.misses, cache.hits) == (0, 1)
+
+
+def _stored_image(relative_path, color):
+    path = os.path.join(settings.upload_folder, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return _image(path, color)
+
+
+def test_only_blob_sources_are_immutable(client):
+    _stored_image("blobs/ab/cd/abcd.png", "red")
+    _stored_image("news/legacy.png", "blue")
+
+    blob = client.get("/img/blobs/ab/cd/abcd.png", params={"w": 8, "fmt": "png"})
+    legacy = client.get("/img/news/legacy.png", params={"w": 8, "fmt": "png"})
+
+    assert "immutable" in blob.headers["cache-control"]
+    assert legacy.headers["cache-control"] == f"public, max-age={settings.static_max_age}"
+
+
+def test_replaced_legacy_source_changes_the_etag(client):
+    source = _stored_image("news/legacy.png", "blue")
+    first = client.get("/img/news/legacy.png", params={"w": 8, "fmt": "png"})
+    etag = first.headers["etag"]
+
+    revalidated = client.get("/img/news/legacy.png", params={"w": 8, "fmt": "png"}, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+
+    Image.new("RGB", (48, 48), "green").save(source, format="PNG")
+    replaced = client.get("/img/news/legacy.png", params={"w": 8, "fmt": "png"}, headers={"If-None-Match": etag})
+    assert replaced.status_code == 200
+    assert replaced.headers["etag"] != etag
@@ -0,0 +1,97 @@
+"""
+Tests for bulk news actions selected by ids or by filters
+"""
+import sys
+
+import pytest
+
+from app.crud.news import news
+from app.models.news import News
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # app.crud.news names both the module and the NewsCRUD instance it exports
+    monkeypatch.setattr(sys.modules["app.crud.news"], "ID_CHUNK_SIZE", 2)
+
+
+def _news(db, count, **fields):
+    items = [
+        News(title=f"n{index}", slug=f"n{index}-{fields.get('category', 'news')}", content="Body",
+             **{"category": "news", "is_published": False, **fields})
+        for index in range(count)
+    ]
+    db.add_all(items)
+    db.commit()
+    return [item.id for item in items]
+
+
+def _published(db):
+    db.expire_all()
+    return sorted(news_id for news_id, in db.query(News.id).filter(News.is_published == True))
+
+
+def test_filter_selection_walks_every_chunk(db):
+    ids = _news(db, 5)
+    # Each chunk leaves the filter once published, so paging by offset would skip rows
+    criteria = news.filter_criteria(is_published=False)
+
+    result = news.bulk_update(db, action="publish", criteria=criteria)
+
+    assert (result.matched, result.affected) == (5, 5)
+    assert _published(db) == ids
+
+
+def test_id_selection_skips_repeats_and_unknown_ids(db):
+    ids = _news(db, 3)
+
+    result = news.bulk_update(db, action="publish", ids=[ids[2], ids[0], ids[2], 999])
+
+    assert (result.matched, result.affected) == (2, 2)
+    assert _published(db) == [ids[0], ids[2]]
+
+
+def test_affected_counts_only_rows_that_changed(db):
+    ids = _news(db, 3)
+    news.bulk_update(db, action="publish", ids=ids[:1])
+
+    result = news.bulk_update(db, action="publish", ids=ids)
+
+    assert (result.matched, result.affected) == (3, 2)
+
+
+def test_remove_stops_at_the_limit(db):
+    _news(db, 5)
+
+    result = news.bulk_remove(db, criteria=news.filter_criteria(category="news"), limit=3)
+
+    assert (result.matched, result.affected) == (3, 3)
+    assert db.query(News).count() == 2
+
+
+def test_empty_filter_needs_all(client, db, admin_headers):
+    _news(db, 3)
+
+    response = client.post("/api/news/bulk", json={"action": "publish", "filter": {}}, headers=admin_headers)
+    assert response.status_code == 422
+
+    response = client.post("/api/news/bulk", json={"action": "publish", "filter": {"all": True}}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json() == {"action": "publish", "matched": 3, "affected": 3}
+
+
+def test_filter_delete_is_confirmed_by_count(client, db, admin_headers):
+    _news(db, 3, category="press-release")
+    kept = _news(db, 2, category="event")
+    body = {"action": "delete", "filter": {"category": "press-release"}}
+
+    assert client.post("/api/news/bulk", json=body, headers=admin_headers).status_code == 422
+    response = client.post("/api/news/bulk", json={**body, "expected_count": 2}, headers=admin_headers)
+    assert response.status_code == 409
+    assert db.query(News).count() == 5
+
+    response = client.post("/api/news/bulk", json={**body, "expected_count": 3}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json() == {"action": "delete", "matched": 3, "affected": 3}
+    db.expire_all()
+    assert sorted(news_id for news_id, in db.query(News.id)) == kept
@@ -0,0 +1,77 @@
+"""
+Tests for the single-pass news statistics and their materialized summary
+"""
+import pytest
+
+from app.core.config import settings
+from app.crud.news import NEWS_STATS, news
+from app.crud.stats import stats_engine
+from app.models.news import News
+from app.models.stats import StatsSummary
+
+
+def _add(db, slug, **fields):
+    values = {"title": slug, "content": "", "priority": "", "category": "general", **fields}
+    item = News(slug=slug, **values)
+    db.add(item)
+    db.commit()
+    return item
+
+
+def _nonempty(result):
+    return result.totals, {key: values for key, values in result.groups.items() if values["total"]}
+
+
+@pytest.fixture
+def materialized(monkeypatch):
+    monkeypatch.setattr(settings, "stats_materialized", True)
+
+
+def test_counts_news_and_announcements_apart(db):
+    _add(db, "a", is_published=True, is_featured=True, views_count=5)
+    _add(db, "b", is_published=False, category="tech", views_count=2)
+    _add(db, "c", priority="high", is_published=True, is_sticky=True, category="announcement")
+
+    stats = news.get_stats(db)
+
+    assert stats["total_news"] == 2
+    assert stats["published_news"] == 1
+    assert stats["featured_news"] == 1
+    assert stats["draft_news"] == 1
+    assert stats["total_announcements"] == 1
+    assert stats["published_announcements"] == 1
+    assert stats["sticky_announcements"] == 1
+    assert stats["total_views"] == 7
+    assert sorted((c["name"], c["count"]) for c in stats["categories"]) == [
+        ("announcement", 1), ("general", 1), ("tech", 1)
+    ]
+
+
+def test_summary_follows_orm_writes(db, materialized):
+    first = _add(db, "a", is_published=False)
+    news.get_stats(db)  # builds the summary
+
+    _add(db, "b", is_published=True)
+    first.is_published = True
+    first.category = "tech"
+    db.commit()
+
+    assert _nonempty(stats_engine.get(db, NEWS_STATS)) == _nonempty(stats_engine.compute(db, NEWS_STATS))
+
+    db.delete(first)
+    db.commit()
+
+    assert _nonempty(stats_engine.get(db, NEWS_STATS)) == _nonempty(stats_engine.compute(db, NEWS_STATS))
+    assert news.get_stats(db)["published_news"] == 1
+
+
+def test_bulk_update_drops_the_summary(db, materialized):
+    _add(db, "a", is_published=False)
+    news.get_stats(db)
+    assert db.query(StatsSummary).count() > 0
+
+    db.query(News).update({News.is_published: True}, synchronize_session=False)
+    db.commit()
+
+    assert db.query(StatsSummary).count() == 0
+    assert news.get_stats(db)["published_news"] == 1
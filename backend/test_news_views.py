@@ -0,0 +1,79 @@
+"""
+Tests for hourly, daily and monthly news view buckets
+"""
+from datetime import datetime, timedelta
+
+from app.crud.news_views import DAY, HOUR, MONTH, news_views
+from app.models.news import News
+
+NOW = datetime(2024, 6, 15, 12, 30)
+RETENTION = {"hourly_retention_hours": 48, "daily_retention_days": 60, "monthly_retention_months": 12}
+
+
+def _news(db):
+    item = News(title="a", slug="a", content="Body", category="news")
+    db.add(item)
+    db.commit()
+    return item.id
+
+
+def _history(db, news_id, granularity):
+    return [(bucket.bucket_start, bucket.views) for bucket in news_views.get_history(
+        db, news_id=news_id, granularity=granularity
+    )]
+
+
+def _add(db, news_id, moment, views):
+    news_views.add_hourly(db, {news_id: views}, now=moment)
+    db.commit()
+
+
+def test_views_in_one_hour_share_a_bucket(db):
+    news_id = _news(db)
+    _add(db, news_id, NOW, 2)
+    _add(db, news_id, NOW + timedelta(minutes=20), 3)
+    _add(db, news_id, NOW + timedelta(hours=1), 1)
+
+    assert _history(db, news_id, HOUR) == [(datetime(2024, 6, 15, 12), 5), (datetime(2024, 6, 15, 13), 1)]
+
+
+def test_rollup_moves_hours_into_days_and_days_into_months(db):
+    news_id = _news(db)
+    _add(db, news_id, datetime(2024, 6, 10, 8), 1)
+    _add(db, news_id, datetime(2024, 6, 10, 20), 2)
+    _add(db, news_id, NOW, 4)  # within the hourly retention
+
+    result = news_views.rollup(db, now=NOW, **RETENTION)
+
+    assert result == {"hours_rolled_up": 2, "days_rolled_up": 0, "months_deleted": 0}
+    assert _history(db, news_id, HOUR) == [(datetime(2024, 6, 15, 12), 4)]
+    assert _history(db, news_id, DAY) == [(datetime(2024, 6, 10), 3)]
+
+    later = NOW + timedelta(days=90)
+    news_views.rollup(db, now=later, **RETENTION)
+
+    assert _history(db, news_id, HOUR) == []
+    assert _history(db, news_id, DAY) == []
+    assert _history(db, news_id, MONTH) == [(datetime(2024, 6, 1), 7)]
+
+
+def test_rollup_adds_to_existing_buckets(db):
+    news_id = _news(db)
+    _add(db, news_id, datetime(2024, 6, 1, 8), 1)
+    news_views.rollup(db, now=NOW, **RETENTION)
+    _add(db, news_id, datetime(2024, 6, 1, 9), 2)  # a late flush into an already rolled up day
+
+    news_views.rollup(db, now=NOW, **RETENTION)
+
+    assert _history(db, news_id, DAY) == [(datetime(2024, 6, 1), 3)]
+
+
+def test_expired_months_are_deleted(db):
+    news_id = _news(db)
+    _add(db, news_id, datetime(2023, 1, 5, 8), 1)
+    _add(db, news_id, datetime(2024, 1, 5, 8), 2)
+
+    result = news_views.rollup(db, now=NOW, **RETENTION)
+
+    assert result["months_deleted"] == 1
+    assert _history(db, news_id, MONTH) == [(datetime(2024, 1, 1), 2)]
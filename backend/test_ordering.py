@@ -0,0 +1,92 @@
+"""
+Tests for reordering rows of ordered collections
+"""
+from app.crud.ordering import OrderedCollection
+from app.crud.product import product
+from app.models.hero_banner import HeroBanner
+from app.models.product import Product, ProductImage
+from app.models.service import Service
+
+BANNERS = OrderedCollection(HeroBanner, HeroBanner.order_position, start=1)
+
+
+def _banners(db, count):
+    items = [HeroBanner(title=f"b{index}", order_position=index) for index in range(count)]
+    db.add_all(items)
+    db.commit()
+    return [item.id for item in items]
+
+
+def _gallery(db):
+    item = Product(name="Lamp")
+    db.add(item)
+    db.flush()
+    images = [ProductImage(product_id=item.id, image_url=f"img{index}.jpg", position=index) for index in range(3)]
+    db.add_all(images)
+    db.commit()
+    return item.id, [image.id for image in images]
+
+
+def _positions(db, column, ids):
+    db.expire_all()
+    return [getattr(db.get(column.class_, id_), column.key) for id_ in ids]
+
+
+def test_reorder_shows_ids_in_the_given_order(db):
+    first, second, third = _banners(db, 3)
+
+    rows = BANNERS.reorder(db, [third, first, second])
+
+    assert [row.id for row in rows] == [third, first, second]
+    assert _positions(db, HeroBanner.order_position, [third, first, second]) == [1, 2, 3]
+
+
+def test_descending_collections_give_the_first_id_the_highest_position(db):
+    services = [Service(name=f"s{index}") for index in range(3)]
+    db.add_all(services)
+    db.commit()
+    ids = [service.id for service in services]
+    order = OrderedCollection(Service, Service.order_position, descending=True)
+
+    rows = order.reorder(db, [ids[1], ids[2], ids[0]])
+
+    assert [row.id for row in rows] == [ids[1], ids[2], ids[0]]
+    assert _positions(db, Service.order_position, [ids[1], ids[2], ids[0]]) == [2, 1, 0]
+
+
+def test_repeated_ids_change_nothing(db):
+    ids = _banners(db, 2)
+
+    assert BANNERS.reorder(db, [ids[1], ids[1], ids[0]]) is None
+    assert _positions(db, HeroBanner.order_position, ids) == [0, 1]
+
+
+def test_complete_order_must_name_every_row_once(db):
+    product_id, image_ids = _gallery(db)
+    first, second, third = image_ids
+
+    assert product.reorder_gallery(db, product_id=product_id, image_ids=[third, first]) is None
+    assert product.reorder_gallery(db, product_id=product_id, image_ids=[third, first, second, 999]) is None
+    assert _positions(db, ProductImage.position, image_ids) == [0, 1, 2]
+
+    gallery = product.reorder_gallery(db, product_id=product_id, image_ids=[third, first, second])
+
+    assert [image.id for image in gallery] == [third, first, second]
+
+
+def test_gallery_of_another_product_is_rejected(db):
+    product_id, _ = _gallery(db)
+    _, other_images = _gallery(db)
+
+    assert product.reorder_gallery(db, product_id=product_id, image_ids=other_images) is None
+
+
+def test_reorder_endpoint_rejects_duplicates(client, db, admin_headers):
+    ids = _banners(db, 2)
+
+    response = client.post("/api/hero-banners/reorder", json={"banner_ids": [ids[0], ids[0]]}, headers=admin_headers)
+    assert response.status_code == 400
+
+    response = client.post("/api/hero-banners/reorder", json={"banner_ids": [ids[1], ids[0]]}, headers=admin_headers)
+    assert response.status_code == 200
+    assert [banner["id"] for banner in response.json()] == [ids[1], ids[0]]
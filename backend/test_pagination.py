@@ -0,0 +1,93 @@
+"""
+Tests for signed keyset cursors and NULL handling in keyset pagination
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.pagination import InvalidCursorError, Keyset, decode_cursor, encode_cursor
+from app.models.news import News
+
+
+def _tamper(cursor: str) -> str:
+    body, mac = cursor.split(".", 1)
+    return f"{body[:-1]}{'A' if body[-1] != 'A' else 'B'}.{mac}"
+
+
+def _pages(db, keyset: Keyset, limit: int):
+    """Walk every page with cursors, returning the ids page by page"""
+    pages, cursor = [], None
+    while True:
+        items = keyset.paginate(db.query(News), limit=limit, cursor=cursor)
+        pages.append([item.id for item in items])
+        cursor = keyset.next_cursor(items, limit)
+        if cursor is None:
+            return pages
+
+
+@pytest.fixture
+def dated_news(db):
+    """Six articles: four with publish dates (two sharing one) and two never published"""
+    start = datetime(2024, 1, 1, 12, 0, 0)
+    dates = [start, start + timedelta(days=1), None, start + timedelta(days=1), None, start + timedelta(days=3)]
+    items = [
+        News(title=f"n{index}", slug=f"n{index}", content="Body", category="news",
+             is_published=True, published_at=published_at)
+        for index, published_at in enumerate(dates)
+    ]
+    db.add_all(items)
+    db.commit()
+    return items
+
+
+def test_cursor_round_trip():
+    values = [datetime(2024, 5, 1, 8, 30), None, 42]
+
+    assert decode_cursor(encode_cursor("published_at:desc,id:desc", values), "published_at:desc,id:desc") == values
+
+
+def test_tampered_cursor_is_rejected():
+    cursor = encode_cursor("id:asc", [10])
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(_tamper(cursor), "id:asc")
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor.split(".")[0] + ".forged", "id:asc")
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor", "id:asc")
+
+
+def test_cursor_is_bound_to_its_ordering():
+    cursor = encode_cursor("title:asc,id:asc", ["b", 3])
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, "title:desc,id:desc")
+
+
+@pytest.mark.parametrize("descending, expected", [
+    (True, [[5, 3], [1, 0], [4, 2], []]),
+    (False, [[0, 1], [3, 5], [2, 4], []]),
+])
+def test_nulls_sort_last_across_pages(db, dated_news, descending, expected):
+    keyset = Keyset(News, (News.published_at, descending))
+
+    pages = _pages(db, keyset, limit=2)
+
+    assert pages == [[dated_news[index].id for index in page] for page in expected]
+
+
+def test_page_boundary_inside_null_run(db, dated_news):
+    keyset = Keyset(News, (News.published_at, False))
+
+    pages = _pages(db, keyset, limit=5)
+
+    assert [len(page) for page in pages] == [5, 1]
+    assert pages[1] == [dated_news[4].id]
+
+
+def test_endpoint_rejects_tampered_cursor(client, dated_news):
+    response = client.get("/api/public/news", params={"limit": 2})
+    cursor = response.headers["x-next-cursor"]
+
+    assert client.get("/api/public/news", params={"limit": 2, "cursor": cursor}).status_code == 200
+    assert client.get("/api/public/news", params={"limit": 2, "cursor": _tamper(cursor)}).status_code == 400
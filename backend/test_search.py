@@ -0,0 +1,75 @@
+"""
+Tests for the full-text search index behind /api/public/search
+"""
+from app.models.news import News
+from app.models.product import Product
+from app.services.public.search_service import PublicSearchService
+
+
+def _news(db, title, **fields):
+    values = {"content": "", "category": "news", "is_published": True, **fields}
+    item = News(title=title, slug=title.lower().replace(" ", "-"), **values)
+    db.add(item)
+    db.commit()
+    return item
+
+
+def test_title_matches_rank_above_body_matches(db):
+    body_hit = _news(db, title="Quarterly update", content="We migrated the billing service")
+    title_hit = _news(db, title="Billing migration", content="Details inside")
+
+    result = PublicSearchService.search_all_content(db, "billing")
+
+    assert [hit["id"] for hit in result["results"]] == [title_hit.id, body_hit.id]
+    assert result["total"] == 2
+    assert result["facets"] == {"news": 2, "products": 0, "services": 0}
+
+
+def test_prefix_and_stemmed_matches(db):
+    item = _news(db, title="Deploying containers", content="")
+
+    assert [hit["id"] for hit in PublicSearchService.search_all_content(db, "deploy")["results"]] == [item.id]
+    assert [hit["id"] for hit in PublicSearchService.search_all_content(db, "contain")["results"]] == [item.id]
+
+
+def test_unpublished_and_announcements_are_not_indexed(db):
+    _news(db, title="Draft launch", is_published=False)
+    _news(db, title="Launch announcement", category="announcement")
+
+    assert PublicSearchService.search_all_content(db, "launch")["total"] == 0
+
+
+def test_index_follows_updates_and_deletes(db):
+    item = _news(db, title="Spring sale")
+    item.is_published = False
+    db.commit()
+    assert PublicSearchService.search_all_content(db, "spring")["total"] == 0
+
+    item.is_published = True
+    item.title = "Autumn sale"
+    db.commit()
+    assert PublicSearchService.search_all_content(db, "spring")["total"] == 0
+    assert PublicSearchService.search_all_content(db, "autumn")["total"] == 1
+
+    db.delete(item)
+    db.commit()
+    assert PublicSearchService.search_all_content(db, "autumn")["total"] == 0
+
+
+def test_content_type_filter_keeps_all_facets(db):
+    _news(db, title="Widget news")
+    db.add(Product(name="Widget", description="A widget", is_active=True))
+    db.commit()
+
+    result = PublicSearchService.search_all_content(db, "widget", content_type="products")
+
+    assert [hit["type"] for hit in result["results"]] == ["product"]
+    assert result["total"] == 1
+    assert result["facets"] == {"news": 1, "products": 1, "services": 0}
+
+
+def test_punctuation_only_query_returns_nothing(client):
+    response = client.get("/api/public/search", params={"q": "%%"})
+
+    assert response.status_code == 200
+    assert response.json()["results"] == []
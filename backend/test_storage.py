@@ -0,0 +1,99 @@
+"""
+Tests for the S3 storage driver, against moto's in-process S3 stand-in
+"""
+import asyncio
+import os
+
+import pytest
+
+from app.core.config import settings
+from app.core.storage import LocalCopies, S3Storage
+
+moto = pytest.importorskip("moto")
+boto3 = pytest.importorskip("boto3")
+
+
+@pytest.fixture
+def s3(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "storage_cache_dir", str(tmp_path / "copies"))
+    with moto.mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="uploads")
+        yield S3Storage(
+            bucket="uploads", prefix="cms", region="us-east-1", access_key="test", secret_key="test"
+        )
+
+
+def _put(storage, tmp_path, key, data):
+    local = tmp_path / "upload"
+    local.write_bytes(data)
+    asyncio.run(storage.put(key, str(local)))
+    assert not local.exists()
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_round_trip_under_the_prefix(s3, tmp_path):
+    _put(s3, tmp_path, "blobs/ab/cd/file.txt", b"hello")
+
+    assert asyncio.run(s3.exists("blobs/ab/cd/file.txt"))
+    assert asyncio.run(s3.get("blobs/ab/cd/file.txt")) == b"hello"
+    head = s3._client.head_object(Bucket="uploads", Key="cms/blobs/ab/cd/file.txt")
+    assert head["ContentType"] == "text/plain"
+    assert "immutable" in head["CacheControl"]
+    assert "cms/blobs/ab/cd/file.txt" in s3.presign("blobs/ab/cd/file.txt")
+
+    asyncio.run(s3.delete("blobs/ab/cd/file.txt"))
+
+    assert not asyncio.run(s3.exists("blobs/ab/cd/file.txt"))
+    with pytest.raises(FileNotFoundError):
+        s3.read_sync("blobs/ab/cd/file.txt")
+
+
+def test_stream_yields_chunks(s3, tmp_path):
+    _put(s3, tmp_path, "doc.bin", b"x" * 10)
+
+    async def collect():
+        return [chunk async for chunk in s3.stream("doc.bin", chunk_size=4)]
+
+    assert asyncio.run(collect()) == [b"xxxx", b"xxxx", b"xx"]
+
+
+def test_local_copy_follows_deletes_and_overwrites(s3, tmp_path):
+    _put(s3, tmp_path, "news/legacy.jpg", b"old")
+    path = asyncio.run(s3.local_path("news/legacy.jpg"))
+    assert _read(path) == b"old"
+
+    _put(s3, tmp_path, "news/legacy.jpg", b"new")
+    assert _read(asyncio.run(s3.local_path("news/legacy.jpg"))) == b"new"
+
+    s3.delete_sync("news/legacy.jpg")
+    assert s3.copies.stats()["entries"] == 0
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(s3.local_path("news/legacy.jpg"))
+
+
+def test_local_copies_are_bounded(s3, tmp_path):
+    s3.copies.max_bytes = 8
+    for key in ("a", "b", "c"):
+        _put(s3, tmp_path, key, b"1234")
+    a = asyncio.run(s3.local_path("a"))
+    b = asyncio.run(s3.local_path("b"))
+    asyncio.run(s3.local_path("a"))  # a is now the most recently used
+    c = asyncio.run(s3.local_path("c"))
+
+    stats = s3.copies.stats()
+    assert (stats["entries"], stats["bytes"], stats["evictions"]) == (2, 8, 1)
+    assert [path for path in (a, b, c) if not os.path.exists(path)] == [b]
+
+
+def test_copies_left_by_an_earlier_run_are_indexed(tmp_path):
+    (tmp_path / "blobs").mkdir()
+    (tmp_path / "blobs" / "old.jpg").write_bytes(b"12345")
+
+    copies = LocalCopies(str(tmp_path), max_bytes=100)
+
+    assert copies.touch("blobs/old.jpg") == str(tmp_path / "blobs" / "old.jpg")
+    assert copies.stats()["bytes"] == 5
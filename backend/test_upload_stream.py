@@ -0,0 +1,56 @@
+"""
+Tests for streaming uploads to disk with a size limit
+"""
+import asyncio
+import hashlib
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.core.config import settings
+from app.utils.upload_stream import stream_upload
+
+
+def _upload(data: bytes, size=None) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename="upload.bin", size=size)
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(settings, "upload_chunk_size", 4)
+
+
+def test_writes_file_and_hash(tmp_path):
+    data = b"0123456789abcdef!"
+    destination = str(tmp_path / "out.bin")
+
+    streamed = asyncio.run(stream_upload(_upload(data), destination, max_size=1024))
+
+    assert streamed.size == len(data)
+    assert streamed.sha256 == hashlib.sha256(data).hexdigest()
+    assert open(destination, "rb").read() == data
+    assert [path.name for path in tmp_path.iterdir()] == ["out.bin"]
+
+
+def test_oversized_stream_is_discarded(tmp_path):
+    destination = tmp_path / "out.bin"
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(stream_upload(_upload(b"x" * 10), str(destination), max_size=9))
+
+    assert error.value.status_code == 400
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_declared_size_is_rejected_before_reading(tmp_path):
+    with pytest.raises(HTTPException):
+        asyncio.run(stream_upload(_upload(b"x", size=100), str(tmp_path / "out.bin"), max_size=10))
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_exact_limit_is_accepted(tmp_path):
+    streamed = asyncio.run(stream_upload(_upload(b"x" * 8), str(tmp_path / "out.bin"), max_size=8))
+
+    assert streamed.size == 8
@@ -0,0 +1,92 @@
+"""
+Tests for the sharded in-memory news view counter
+"""
+from app.crud.news_views import HOUR, news_views
+from app.models.news import News
+from app.services.view_counter import ViewCounter, view_counter
+
+
+def _counter(shards=4, max_pending_keys=100):
+    return ViewCounter(shards=shards, interval=60, max_pending_keys=max_pending_keys, rollup_interval=3600)
+
+
+def _news(db, slug, **fields):
+    item = News(title=slug, slug=slug, content="Body", **{"category": "news", "views_count": 0, **fields})
+    db.add(item)
+    db.commit()
+    return item
+
+
+def test_views_of_one_article_stay_in_one_shard():
+    counter = _counter()
+    for news_id in (1, 2, 3, 4, 5):
+        counter.record(news_id)
+        counter.record(news_id, 2)
+
+    assert sum(len(shard.counts) for shard in counter.shards) == 5
+    assert counter.drain() == {news_id: 3 for news_id in (1, 2, 3, 4, 5)}
+    assert counter.drain() == {}
+
+
+def test_totals_sum_every_shard():
+    counter = _counter(shards=2, max_pending_keys=2)
+    # One key per shard fills the buffer; views of buffered ids are still counted
+    assert counter.record(2) and counter.record(3)
+    assert counter.record(2, 4)
+    assert not counter.record(4, 5)
+    assert not counter.record(5)
+
+    stats = counter.stats()
+    assert stats["recorded"] == 6
+    assert stats["dropped"] == 6
+    assert stats["pending_keys"] == 2
+    assert stats["shards"] == 2
+
+
+def test_flush_adds_views_without_touching_updated_at(db):
+    item = _news(db, "a", views_count=10)
+    updated_at = item.updated_at
+    counter = _counter()
+    counter.record(item.id, 3)
+    counter.record(item.id)
+    counter.record(item.id + 1000)  # deleted article: ignored
+
+    assert counter.flush() == 5
+    db.refresh(item)
+
+    assert item.views_count == 14
+    assert item.updated_at == updated_at
+    assert [bucket.views for bucket in news_views.get_history(db, news_id=item.id, granularity=HOUR)] == [4]
+    assert counter.pending_keys() == 0
+    assert counter.flush() == 0
+
+
+def test_failed_flush_keeps_the_views(db, monkeypatch):
+    item = _news(db, "a")
+    counter = _counter()
+    counter.record(item.id, 2)
+
+    def fail(db, counts):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr("app.services.view_counter.news.add_views", fail)
+    assert counter.flush() == 0
+    assert counter.failed_flushes == 1
+    monkeypatch.undo()
+
+    assert counter.flush() == 2
+    db.refresh(item)
+    assert item.views_count == 2
+
+
+def test_beacon_counts_only_public_articles(client, db):
+    published = _news(db, "a", is_published=True)
+    draft = _news(db, "b")
+    announcement = _news(db, "c", category="announcement", is_published=True)
+
+    assert client.post(f"/api/public/news/{published.id}/view").status_code == 204
+    assert client.post(f"/api/public/news/{announcement.id}/view").status_code == 204
+    assert client.post(f"/api/public/news/{draft.id}/view").status_code == 404
+    assert client.post("/api/public/news/999/view").status_code == 404
+
+    assert view_counter.drain() == {published.id: 1, announcement.id: 1}